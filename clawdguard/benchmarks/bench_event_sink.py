@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+ClawdGuard - Event Sink Benchmark
+activity.jsonl throughput: open/write/close per event vs. the batched EventSink
+
+Usage:
+    python benchmarks/bench_event_sink.py [--events 50000] [--rate 10000]
+"""
+
+import argparse
+import json
+import sys
+import tempfile
+import time
+from dataclasses import asdict
+from datetime import datetime
+from pathlib import Path
+
+# Add parent to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from monitors.activity import ActivityEvent
+from monitors.sink import EventSink
+
+
+def make_records(count: int):
+    records = []
+    for i in range(count):
+        event = ActivityEvent(
+            timestamp=datetime.utcnow().isoformat() + "Z",
+            event_type="exec",
+            details={"command": f"ls -la /root/clawd/memory/{i}", "exit_code": 0, "duration_ms": i % 50}
+        )
+        records.append(asdict(event))
+    return records
+
+
+def legacy_write(path: Path, record):
+    # What ActivityMonitor.log_event used to do for every event
+    with open(path, 'a') as f:
+        f.write(json.dumps(record) + "\n")
+
+
+def max_throughput(write, records) -> float:
+    start = time.perf_counter()
+    for record in records:
+        write(record)
+    return len(records) / (time.perf_counter() - start)
+
+
+def paced_cpu(write, records, rate: int) -> float:
+    """CPU seconds spent per wall second while writing at a fixed rate"""
+    interval = 1.0 / rate
+    start_wall, start_cpu = time.perf_counter(), time.process_time()
+    next_due = start_wall
+    for record in records:
+        write(record)
+        next_due += interval
+        delay = next_due - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+    wall = time.perf_counter() - start_wall
+    return (time.process_time() - start_cpu) / wall
+
+
+def main():
+    parser = argparse.ArgumentParser(description="ClawdGuard event sink benchmark")
+    parser.add_argument("--events", type=int, default=50000, help="Events for the max-throughput run")
+    parser.add_argument("--rate", type=int, default=10000, help="Events/sec for the paced run")
+    args = parser.parse_args()
+    
+    records = make_records(args.events)
+    paced = records[:args.rate * 2]  # two seconds at the target rate
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        legacy_path = Path(tmp) / "legacy.jsonl"
+        legacy_rate = max_throughput(lambda r: legacy_write(legacy_path, r), records)
+        legacy_cpu = paced_cpu(lambda r: legacy_write(legacy_path, r), paced, args.rate)
+        
+        print(f"{'writer':<22} {'max events/s':>14} {f'CPU @ {args.rate}/s':>14}")
+        print(f"{'open/write/close':<22} {legacy_rate:>14,.0f} {legacy_cpu:>13.0%}")
+        
+        for fsync in ("never", "interval", "flush"):
+            sink = EventSink(Path(tmp) / f"sink-{fsync}.jsonl", fsync=fsync)
+            sink_rate = max_throughput(sink.write, records)
+            sink.flush()
+            sink_cpu = paced_cpu(sink.write, paced, args.rate)
+            sink.close()
+            print(f"{f'EventSink fsync={fsync}':<22} {sink_rate:>14,.0f} {sink_cpu:>13.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+ClawdGuard - Line Parsing Benchmark
+Command extraction over session-style JSONL: decode + json.loads on every
+line vs. the byte-level fast path and optional JSON backend
+
+Usage:
+    python benchmarks/bench_line_parse.py [--lines 20000] [--body-kb 20]
+"""
+
+import argparse
+import json
+import random
+import re
+import sys
+import time
+from pathlib import Path
+
+# Add parent to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from monitors.lineparse import JSON_BACKEND, extract_command
+
+WORDS = ["the", "memory", "file", "agent", "clawd", "session", "result", "error", "ok", "token",
+         "deploy", "config", "λ", "café", "✓", "path", "/root/clawd", "value", "done", "retry"]
+
+COMMANDS = ["ls -la /root/clawd", "git status --short", "cat /root/clawd/SOUL.md", "python3 scripts/run.py"]
+
+
+def text(rng: random.Random, size: int) -> str:
+    words = []
+    length = 0
+    while length < size:
+        word = rng.choice(WORDS)
+        words.append(word)
+        length += len(word) + 1
+    return " ".join(words)
+
+
+def make_lines(count: int, body_kb: int, seed: int = 7):
+    """A session-log mix: big messages and tool output, a few exec records"""
+    rng = random.Random(seed)
+    lines = []
+    for i in range(count):
+        kind = rng.random()
+        ts = f"2026-01-01T00:00:{i % 60:02d}Z"
+        if kind < 0.10:
+            record = {"timestamp": ts, "command": rng.choice(COMMANDS), "exit_code": 0}
+        elif kind < 0.45:
+            record = {"timestamp": ts, "type": "message", "role": rng.choice(["user", "assistant"]),
+                      "content": [{"type": "text", "text": text(rng, body_kb * 1024)}]}
+        elif kind < 0.90:
+            record = {"timestamp": ts, "type": "tool_result", "tool": "read",
+                      "output": text(rng, body_kb * 1024 * 2)}
+        else:
+            record = {"timestamp": ts, "type": "tool_call", "tool": "exec",
+                      "input": {"command": rng.choice(COMMANDS)}, "note": text(rng, 512)}
+        lines.append((json.dumps(record, ensure_ascii=False) + "\n").encode())
+    return lines
+
+
+def legacy_extract(raw: bytes):
+    # What LogWatcher.scan_lines + the old scan_exec_log did for every line
+    log_line = raw.decode('utf-8', errors='replace').strip()
+    if log_line.startswith('{'):
+        try:
+            data = json.loads(log_line)
+            return data.get('command', '')
+        except json.JSONDecodeError:
+            return None
+    match = re.search(r'\[EXEC\]\s*(.+)', log_line)
+    if match:
+        return match.group(1)
+    return log_line
+
+
+def throughput(extract, lines):
+    start = time.perf_counter()
+    commands = [extract(line) for line in lines]
+    elapsed = time.perf_counter() - start
+    return commands, len(lines) / elapsed, sum(map(len, lines)) / elapsed / 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description="ClawdGuard line parsing benchmark")
+    parser.add_argument("--lines", type=int, default=20000, help="Session lines to parse")
+    parser.add_argument("--body-kb", type=int, default=20, help="Approximate message body size in KB")
+    args = parser.parse_args()
+    
+    lines = make_lines(args.lines, args.body_kb)
+    print(f"{len(lines)} lines, {sum(map(len, lines)) / 1e6:.0f} MB, JSON backend: {JSON_BACKEND}")
+    
+    legacy, legacy_rate, legacy_mb = throughput(legacy_extract, lines)
+    fast, fast_rate, fast_mb = throughput(extract_command, lines)
+    assert [c or None for c in legacy] == [c or None for c in fast], "extraction differs"
+    
+    print(f"{'parser':<22} {'lines/s':>10} {'MB/s':>8}")
+    print(f"{'decode + json.loads':<22} {legacy_rate:>10,.0f} {legacy_mb:>8,.0f}")
+    print(f"{'lineparse':<22} {fast_rate:>10,.0f} {fast_mb:>8,.0f}")
+    print(f"speedup: {fast_rate / legacy_rate:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+ClawdGuard - Rule Set Benchmark
+Lines/sec for the merged RuleSet vs. the old one-regex-at-a-time loop
+
+Usage:
+    python benchmarks/bench_ruleset.py [--lines 20000]
+"""
+
+import argparse
+import random
+import re
+import sys
+import time
+from pathlib import Path
+
+# Add parent to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from core.ruleset import Rule, RuleSet
+
+TOOLS = ["curl", "wget", "nc", "python", "ruby", "perl", "php", "bash", "ssh", "scp", "socat", "openssl"]
+FLAGS = ["--post-file", "-d", "--data", "-e", "-c", "-rsocket", "-x", "--upload-file"]
+TARGETS = ["/dev/tcp", "/etc/shadow", ".ssh/id_", "credentials", "token", "password", "api_key"]
+
+BENIGN = [
+    "ls -la /root/clawd",
+    "cat /root/clawd/SOUL.md",
+    "git status --short",
+    "python3 scripts/send-email.py --to jon@example.com",
+    "grep -n TODO memory/2026-02-01.md",
+    "npm run build --prefix voice-server",
+    "echo 'hello world'",
+    "find /root/clawd/memory -name '*.md' -mtime -1",
+]
+
+
+def make_rules(count: int, seed: int = 7):
+    rng = random.Random(seed)
+    rules = []
+    for i in range(count):
+        tool, flag, target = rng.choice(TOOLS), rng.choice(FLAGS), rng.choice(TARGETS)
+        pattern = f"{re.escape(tool)}\\s+{re.escape(flag)}.*{re.escape(target)}{i}"
+        rules.append(Rule(
+            vuln_id=f"BENCH-{i}",
+            name=f"bench_{i}",
+            description="synthetic rule",
+            severity="high",
+            pattern=pattern,
+            source="bench"
+        ))
+    return rules
+
+
+def make_lines(count: int, rules, malicious_ratio: float = 0.01, seed: int = 11):
+    rng = random.Random(seed)
+    lines = []
+    for _ in range(count):
+        if rng.random() < malicious_ratio:
+            rule = rng.choice(rules)
+            i = rule.vuln_id.split("-")[1]
+            tool, rest = rule.pattern.split("\\s+", 1)
+            flag = rest.split(".*")[0].replace("\\", "")
+            target = rest.split(".*")[1].replace("\\", "")
+            lines.append(f"{tool.replace(chr(92), '')} {flag} http://x {target}")
+        else:
+            lines.append(rng.choice(BENIGN))
+    return lines
+
+
+def loop_scan(rules, line):
+    hits = []
+    for rule in rules:
+        match = rule.compiled.search(line)
+        if match:
+            hits.append((rule, match))
+    return hits
+
+
+def measure(fn, lines) -> float:
+    start = time.perf_counter()
+    for line in lines:
+        fn(line)
+    return len(lines) / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="ClawdGuard rule set benchmark")
+    parser.add_argument("--lines", type=int, default=20000, help="Lines scanned per run")
+    args = parser.parse_args()
+    
+    print(f"{'rules':>6} {'loop lines/s':>14} {'ruleset lines/s':>16} {'speedup':>8}")
+    for count in (10, 100, 1000):
+        rules = make_rules(count)
+        lines = make_lines(args.lines, rules)
+        ruleset = RuleSet(rules)
+        
+        # Both engines must agree before the numbers mean anything
+        for line in lines[:2000]:
+            assert [r.vuln_id for r, _ in ruleset.scan(line)] == [r.vuln_id for r, _ in loop_scan(rules, line)]
+        
+        loop_rate = measure(lambda line: loop_scan(rules, line), lines)
+        set_rate = measure(ruleset.scan, lines)
+        print(f"{count:>6} {loop_rate:>14,.0f} {set_rate:>16,.0f} {set_rate / loop_rate:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
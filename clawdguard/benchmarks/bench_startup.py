@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+ClawdGuard - CLI Startup Benchmark
+Wall time of each clawdguard.py subcommand as a fresh process, as cron runs
+it, and which ClawdGuard modules it ends up importing
+
+Usage:
+    python benchmarks/bench_startup.py [--runs 10] [--commands "canary check" "status"]
+"""
+
+import argparse
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).parent.parent
+ENTRY = ROOT / "clawdguard.py"
+
+# Read-mostly commands; scan and watch touch offsets and logs, pass them explicitly
+DEFAULT_COMMANDS = ["--help", "canary status", "canary check", "rules status", "config-check", "status", "report"]
+
+
+def time_command(argv, runs: int) -> float:
+    """Median wall milliseconds over runs"""
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run(argv, cwd=ROOT, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def project_imports(args) -> list:
+    """ClawdGuard modules imported by one run, from -X importtime"""
+    result = subprocess.run([sys.executable, "-X", "importtime", str(ENTRY), *args],
+                            cwd=ROOT, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+    modules = []
+    for line in result.stderr.splitlines():
+        name = line.rsplit("|", 1)[-1].strip()
+        if name.startswith(("core.", "monitors.")):
+            modules.append(name)
+    return modules
+
+
+def main():
+    parser = argparse.ArgumentParser(description="ClawdGuard CLI startup benchmark")
+    parser.add_argument("--runs", type=int, default=10, help="Runs per command (median is reported)")
+    parser.add_argument("--commands", nargs="+", default=DEFAULT_COMMANDS, help="Subcommands to time, each quoted")
+    args = parser.parse_args()
+    
+    interpreter = time_command([sys.executable, "-c", "pass"], args.runs)
+    print(f"{'command':<16} {'median ms':>10} {'over python':>12}  modules")
+    print(f"{'(python -c pass)':<16} {interpreter:>10.1f} {'':>12}")
+    
+    for command in args.commands:
+        argv = command.split()
+        elapsed = time_command([sys.executable, str(ENTRY), *argv], args.runs)
+        modules = project_imports(argv)
+        print(f"{command:<16} {elapsed:>10.1f} {elapsed - interpreter:>12.1f}  {len(modules)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -7,54 +7,59 @@ Main entry point for the ClawdGuard security system.
 Usage:
     python clawdguard.py status        # Show current status
     python clawdguard.py scan          # Run a single scan
+    python clawdguard.py scan --backfill --workers 4  # Scan a log backlog in parallel
     python clawdguard.py watch         # Start daemon mode
+    python clawdguard.py serve         # Answer pre-exec checks on a Unix socket
     python clawdguard.py config-check  # Check Clawdbot config for vulnerabilities
     python clawdguard.py canary setup  # Set up canary files
     python clawdguard.py canary check  # Check canary files
     python clawdguard.py report        # Generate security report
+    python clawdguard.py store import  # Load existing JSONL logs into the store
+    python clawdguard.py rules compile # Precompile vulns.json for faster startup
 """
 
 import argparse
 import json
 import sys
-from datetime import datetime
+import time
+from datetime import datetime, timedelta
 from pathlib import Path
 
 # Ensure imports work
 sys.path.insert(0, str(Path(__file__).parent))
 
-from core.patterns import PatternMatcher
-from core.alert import AlertManager, send_immediate_alert
-from core.canary import CanarySystem
-from monitors.activity import ActivityMonitor
-from monitors.watcher import LogWatcher
+# Each command imports only the components it uses: `canary check` runs
+# from cron and shouldn't pay for the matcher, alert store or baseline.
+# benchmarks/bench_startup.py times every command.
 
 
 def cmd_status(args):
     """Show ClawdGuard status"""
-    config_path = Path(__file__).parent / "config" / "clawdguard.json"
+    from core.canary import CanarySystem
+    from core.config import ConfigService
+    from core.patterns import PatternMatcher
+    from monitors.activity import ActivityMonitor
+    
+    config_service = ConfigService.shared()
     
     print("🛡️ ClawdGuard Status")
     print("=" * 50)
     
     # Load config
-    try:
-        with open(config_path, 'r') as f:
-            config = json.load(f)
-        
-        mode = config.get('mode', 'unknown')
-        learning_until = config.get('learning_until', 'N/A')
-        
-        print(f"\n📊 Mode: {mode.upper()}")
-        if mode == 'learning':
-            print(f"   Learning until: {learning_until}")
-        
-    except FileNotFoundError:
+    if not config_service.path.exists():
         print("⚠️ Config not found")
         return
     
+    config = config_service.get()
+    mode = config.get('mode', 'unknown')
+    learning_until = config.get('learning_until', 'N/A')
+    
+    print(f"\n📊 Mode: {mode.upper()}")
+    if mode == 'learning':
+        print(f"   Learning until: {learning_until}")
+    
     # Activity stats
-    monitor = ActivityMonitor()
+    monitor = ActivityMonitor(read_only=True)
     summary = monitor.get_summary()
     
     print(f"\n📈 Activity (since {summary.get('session_start', 'unknown')}):")
@@ -79,7 +84,7 @@ def cmd_status(args):
     print(f"   Alerts: {canary_status.get('total_alerts', 0)}")
     
     # Vulnerability database
-    matcher = PatternMatcher()
+    matcher = PatternMatcher.shared()
     print(f"\n📚 Vulnerability Database:")
     print(f"   Known vulnerabilities: {len(matcher.vulns)}")
     print(f"   Exploit patterns: {len(matcher.exploit_patterns)}")
@@ -89,6 +94,14 @@ def cmd_status(args):
 
 def cmd_scan(args):
     """Run a single security scan"""
+    if args.backfill:
+        cmd_backfill(args)
+        return
+    
+    from core.canary import CanarySystem
+    from core.patterns import PatternMatcher
+    from monitors.watcher import LogWatcher
+    
     print("🔍 Running security scan...")
     
     watcher = LogWatcher()
@@ -96,10 +109,10 @@ def cmd_scan(args):
     
     # Also check canaries
     canary = CanarySystem()
-    canary_alerts = canary.check_canaries()
+    canary_alerts = canary.check_canaries() + canary.verify_canaries()
     
     # Check config
-    matcher = PatternMatcher()
+    matcher = PatternMatcher.shared()
     config_threats = matcher.check_config()
     
     total_issues = len(threats) + len(canary_alerts) + len(config_threats)
@@ -119,17 +132,54 @@ def cmd_scan(args):
             print(f"   ⚙️ [{threat.level.value}] {threat.name}")
 
 
+def cmd_backfill(args):
+    """Scan the unread backlog of logs across a process pool"""
+    from monitors.backfill import backfill
+    from monitors.watcher import LogWatcher
+    
+    watcher = LogWatcher()
+    print(f"🔍 Backfilling {watcher.log_dir} with {args.workers or 'all'} worker(s)...")
+    
+    result = backfill(watcher, workers=args.workers, chunk_bytes=int(args.chunk_mb * 1024 * 1024))
+    
+    print(f"   Files: {result.files} ({result.chunks} chunks, {result.bytes / 1e6:.1f} MB)")
+    print(f"   Lines: {result.lines} in {result.seconds:.2f}s ({result.lines_per_sec:,.0f} lines/sec)")
+    
+    if result.threats:
+        print(f"\n⚠️ Found {len(result.threats)} actionable threat(s):")
+        for threat in result.threats:
+            print(f"   🔴 [{threat.level.value}] {threat.name}")
+    else:
+        print("✅ No actionable threats in backlog")
+
+
 def cmd_watch(args):
     """Start daemon mode"""
+    from monitors.watcher import LogWatcher
+    
     watcher = LogWatcher()
-    watcher.run_daemon(interval=args.interval)
+    if args.use_async:
+        from monitors.async_watcher import run_async_daemon
+        run_async_daemon(watcher, interval=args.interval, use_inotify=not args.poll)
+    else:
+        watcher.run_daemon(interval=args.interval, use_inotify=not args.poll)
+
+
+def cmd_serve(args):
+    """Run the scan server"""
+    from monitors.watcher import LogWatcher
+    from monitors.scan_server import run_scan_server
+    
+    run_scan_server(LogWatcher(), socket_path=args.socket)
 
 
 def cmd_config_check(args):
     """Check Clawdbot config for vulnerabilities"""
+    from core.patterns import PatternMatcher
+    
     print("⚙️ Checking Clawdbot configuration...")
     
-    matcher = PatternMatcher()
+    matcher = PatternMatcher.shared()
     threats = matcher.check_config()
     
     if not threats:
@@ -144,7 +194,7 @@ def cmd_config_check(args):
             print(f"\n   bind: {gateway.get('bind', 'not set')}")
             print(f"   auth.mode: {gateway.get('auth', {}).get('mode', 'not set')}")
             print(f"   trustedProxies: {gateway.get('trustedProxies', 'not set')}")
-            
+        
         except Exception as e:
             print(f"   (Could not read config: {e})")
     else:
@@ -159,15 +209,19 @@ def cmd_config_check(args):
 
 def cmd_canary(args):
     """Manage canary files"""
+    from core.canary import CanarySystem
+    
     canary = CanarySystem()
     
     if args.canary_action == "setup":
         canary.setup_default_canaries()
         print("✅ Canary files set up")
-        
+    
     elif args.canary_action == "check":
-        alerts = canary.check_canaries()
+        alerts = canary.check_canaries() + canary.verify_canaries()
         if alerts:
+            from core.alert import send_immediate_alert
+            
             print(f"🚨 {len(alerts)} CANARY ALERT(S)!")
             for alert in alerts:
                 print(f"   [{alert['severity']}] {alert['type']}: {alert['path']}")
@@ -177,11 +231,13 @@ def cmd_canary(args):
                     level=alert['severity'],
                     title="🍯 Canary File Triggered!",
                     description=f"Canary file was {alert['type']}",
-                    details=f"Path: {alert['path']}"
+                    details=f"Path: {alert['path']}",
+                    key=f"canary:{alert['path']}",
+                    urgent=True
                 )
         else:
             print("✅ All canaries intact")
-            
+    
     elif args.canary_action == "status":
         status = canary.get_status()
         print(json.dumps(status, indent=2))
@@ -189,13 +245,20 @@ def cmd_canary(args):
 
 def cmd_report(args):
     """Generate security report"""
+    from core.alert import AlertManager
+    from core.canary import CanarySystem
+    from core.patterns import PatternMatcher
+    from core.store import iso_days_ago
+    from core.tail import tail_jsonl
+    from monitors.activity import ActivityMonitor
+    
     print("📋 ClawdGuard Security Report")
     print(f"   Generated: {datetime.utcnow().isoformat()}Z")
     print("=" * 50)
     
     # Config check
     print("\n## Configuration Security")
-    matcher = PatternMatcher()
+    matcher = PatternMatcher.shared()
     config_threats = matcher.check_config()
     
     if config_threats:
@@ -211,7 +274,7 @@ def cmd_report(args):
     
     # Activity summary
     print("\n## Activity Baseline")
-    monitor = ActivityMonitor()
+    monitor = ActivityMonitor(read_only=True)
     summary = monitor.get_summary()
     print(f"   Events recorded: {summary.get('total_events', 0)}")
     
@@ -223,22 +286,105 @@ def cmd_report(args):
     print(f"   Historical alerts: {status.get('total_alerts', 0)}")
     
     # Recent threats
+    store = AlertManager.shared().store
     threats_log = Path(__file__).parent / "logs" / "threats.jsonl"
-    if threats_log.exists():
+    recent = store.recent("threats", 10) if store else []
+    if recent:
+        counts = store.counts_by_level("threats", since=iso_days_ago(7))
         print("\n## Recent Threats")
-        with open(threats_log, 'r') as f:
-            lines = f.readlines()[-10:]
-            for line in lines:
-                try:
-                    t = json.loads(line)
-                    print(f"   [{t['level']}] {t['name']} - {t.get('action', 'unknown')}")
-                except:
-                    pass
+        if counts:
+            print("   Last 7 days: " + ", ".join(f"{level} {n}" for level, n in sorted(counts.items())))
+        for t in recent:
+            print(f"   [{t['level']}] {t['name']} - {t.get('action') or 'unknown'}")
+    elif threats_log.exists():
+        # No store, or one that hasn't been filled from the log yet
+        print("\n## Recent Threats")
+        for t in tail_jsonl(threats_log, 10):
+            print(f"   [{t.get('level')}] {t.get('name')} - {t.get('action', 'unknown')}")
     
     print("\n" + "=" * 50)
     print("Report complete.")
 
 
+def cmd_digest(args):
+    """Show (or send) the daily alert digest"""
+    from core.alert import AlertManager
+    
+    manager = AlertManager.shared()
+    if not manager.daily_levels():
+        print("ℹ️ No threat level is set to \"alert\": \"daily\" in clawdguard.json")
+        return
+    
+    if args.send:
+        digest = manager.send_daily_digest(force=True)
+        print("✅ Digest queued" if digest else "✅ Nothing to report")
+        return
+    
+    since = (datetime.utcnow() - timedelta(hours=args.hours)).isoformat() + "Z" if args.hours else None
+    digest = manager.build_daily_digest(since=since)
+    if digest:
+        print(manager.format_message(digest))
+    else:
+        print("✅ Nothing to report")
+
+
+def cmd_store(args):
+    """Import, query and prune the threat/alert store"""
+    from core.alert import AlertManager
+    from core.store import iso_days_ago
+    
+    store = AlertManager.shared().store
+    if store is None:
+        print("⚠️ Event store is disabled (store.enabled in clawdguard.json)")
+        return
+    
+    if args.store_action == "import":
+        for table, added in store.import_logs().items():
+            print(f"✅ {table}.jsonl: {added} new row(s)")
+    
+    elif args.store_action == "prune":
+        days = args.days or store_retention_days()
+        removed = store.prune(days)
+        print(f"✅ Removed {removed['threats']} threat(s) and {removed['alerts']} alert(s) older than {days} days")
+    
+    elif args.store_action == "query":
+        since = args.since or (iso_days_ago(args.days) if args.days else None)
+        rows = store.query(args.table, since=since, until=args.until, level=args.level,
+                           vuln_id=args.vuln, limit=args.limit)
+        for row in reversed(rows):
+            if args.table == "threats":
+                print(f"{row['timestamp']}  [{row['level']}] {row['vuln_id']} {row['name']} - {row['matched']}")
+            else:
+                print(f"{row['timestamp']}  [{row['level']}] {row['title']}")
+        print(f"({len(rows)} row(s))")
+
+
+def cmd_rules(args):
+    """Compile vulns.json into the rule bundle, or show whether it is current"""
+    from core.patterns import DEFAULT_VULN_DB_PATH, PatternMatcher
+    from core.rulebundle import bundle_path_for, load_bundle
+    
+    bundle_path = bundle_path_for(DEFAULT_VULN_DB_PATH)
+    
+    if args.rules_action == "compile":
+        start = time.perf_counter()
+        compiled = PatternMatcher.compile_bundle(str(DEFAULT_VULN_DB_PATH), bundle_path)
+        elapsed = (time.perf_counter() - start) * 1000
+        print(f"✅ Compiled {len(compiled.command_rules)} command and {len(compiled.content_rules)} content rule(s) "
+              f"to {bundle_path} in {elapsed:.1f}ms")
+    
+    elif args.rules_action == "status":
+        with open(DEFAULT_VULN_DB_PATH, 'rb') as f:
+            _, reason = load_bundle(str(DEFAULT_VULN_DB_PATH), f.read(), bundle_path)
+        print(f"   Bundle: {bundle_path}")
+        print(f"   State: {reason or 'current'}")
+
+
+def store_retention_days() -> float:
+    from core.config import ConfigService
+    return ConfigService.shared().get().get("store", {}).get("retention_days", 90)
+
+
 def main():
     parser = argparse.ArgumentParser(
         description="🛡️ ClawdGuard - Security Firewall for Clawdbot",
@@ -248,9 +394,12 @@ Examples:
   %(prog)s status           Show current security status
   %(prog)s scan             Run a single security scan
   %(prog)s watch            Start continuous monitoring
+  %(prog)s serve            Vet commands before Clawdbot runs them
   %(prog)s config-check     Check Clawdbot configuration
   %(prog)s canary setup     Set up honeypot canary files
   %(prog)s report           Generate security report
+  %(prog)s store query --days 1 --level critical
+  %(prog)s rules compile    Precompile the vulnerability database
         """
     )
     
@@ -260,11 +409,20 @@ Examples:
     subparsers.add_parser("status", help="Show ClawdGuard status")
     
     # Scan
-    subparsers.add_parser("scan", help="Run a single security scan")
+    scan_parser = subparsers.add_parser("scan", help="Run a single security scan")
+    scan_parser.add_argument("--backfill", action="store_true", help="Scan the unread log backlog in parallel")
+    scan_parser.add_argument("--workers", type=int, default=None, help="Backfill worker processes (default: CPU count)")
+    scan_parser.add_argument("--chunk-mb", type=float, default=16, help="Backfill split size for large files, in MB")
     
     # Watch
     watch_parser = subparsers.add_parser("watch", help="Start daemon mode")
     watch_parser.add_argument("--interval", type=float, default=5.0, help="Scan interval in seconds")
+    watch_parser.add_argument("--poll", action="store_true", help="Poll every interval instead of using inotify")
+    watch_parser.add_argument("--async", dest="use_async", action="store_true", help="Run the asyncio daemon (concurrent tailers and alert dispatch)")
+    
+    # Serve
+    serve_parser = subparsers.add_parser("serve", help="Answer pre-exec checks on a Unix socket")
+    serve_parser.add_argument("--socket", help="Socket path (default: logs/scan.sock)")
     
     # Config check
     subparsers.add_parser("config-check", help="Check Clawdbot config")
@@ -276,6 +434,26 @@ Examples:
     # Report
     subparsers.add_parser("report", help="Generate security report")
     
+    # Digest
+    digest_parser = subparsers.add_parser("digest", help="Show or send the daily alert digest")
+    digest_parser.add_argument("--send", action="store_true", help="Queue the digest now and reset its window")
+    digest_parser.add_argument("--hours", type=float, help="Preview the last N hours instead of since the last digest")
+    
+    # Store
+    store_parser = subparsers.add_parser("store", help="Query the threat/alert store")
+    store_parser.add_argument("store_action", choices=["import", "query", "prune"])
+    store_parser.add_argument("--table", choices=["threats", "alerts"], default="threats")
+    store_parser.add_argument("--since", help="ISO timestamp lower bound")
+    store_parser.add_argument("--until", help="ISO timestamp upper bound (exclusive)")
+    store_parser.add_argument("--days", type=float, help="Query: last N days; prune: keep N days")
+    store_parser.add_argument("--level", help="Only this level (critical, high, ...)")
+    store_parser.add_argument("--vuln", help="Only this vuln_id")
+    store_parser.add_argument("--limit", type=int, default=50, help="Max rows to show")
+    
+    # Rules
+    rules_parser = subparsers.add_parser("rules", help="Manage the compiled rule bundle")
+    rules_parser.add_argument("rules_action", choices=["compile", "status"])
+    
     args = parser.parse_args()
     
     if args.command == "status":
@@ -284,12 +462,20 @@ Examples:
         cmd_scan(args)
     elif args.command == "watch":
         cmd_watch(args)
+    elif args.command == "serve":
+        cmd_serve(args)
     elif args.command == "config-check":
         cmd_config_check(args)
     elif args.command == "canary":
         cmd_canary(args)
     elif args.command == "report":
         cmd_report(args)
+    elif args.command == "digest":
+        cmd_digest(args)
+    elif args.command == "store":
+        cmd_store(args)
+    elif args.command == "rules":
+        cmd_rules(args)
     else:
         parser.print_help()
 
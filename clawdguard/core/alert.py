@@ -4,13 +4,24 @@ ClawdGuard - Alert System
 Sends notifications via WhatsApp, email, etc.
 """
 
+import atexit
 import json
 import subprocess
-from datetime import datetime
+import sys
+import threading
+from datetime import datetime, timedelta
 from pathlib import Path
-from typing import Optional
+from typing import Dict, List, Optional
 from dataclasses import dataclass
 
+# Add parent to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from core.config import ConfigService
+from core.coalesce import AlertCoalescer, TokenBucket, build_coalesced_digest, build_daily_digest
+from core.persist import atomic_write_json
+from core.store import EventStore
+
 @dataclass
 class Alert:
     level: str
@@ -18,35 +29,87 @@ class Alert:
     description: str
     details: str
     timestamp: str = None
+    key: str = None       # what the alert is about, for coalescing; defaults to the title
+    urgent: bool = False  # never held back (canary trips)
     
     def __post_init__(self):
         if not self.timestamp:
             self.timestamp = datetime.utcnow().isoformat() + "Z"
 
 class AlertManager:
+    _shared = {}
+    _shared_lock = threading.Lock()
+    
     def __init__(self, config_path: str = None):
         self.config_path = config_path or str(Path(__file__).parent.parent / "config" / "clawdguard.json")
-        self.config = self.load_config()
+        self.config_service = ConfigService.shared(self.config_path)
         self.alert_log_path = Path(__file__).parent.parent / "logs" / "alerts.jsonl"
+        self.digest_state_path = Path(__file__).parent.parent / "logs" / "digest_state.json"
+        self.store = EventStore.from_config(self.config)
+        
+        # Repeats inside a window are counted, not sent; each channel
+        # has its own token bucket
+        self.coalescer = AlertCoalescer()
+        self.buckets: Dict[str, TokenBucket] = {}
+        self.options_version = None
+        self.lock = threading.Lock()
+        self.apply_options()
+        
+        # Don't lose held-back repeats when a short-lived command exits
+        atexit.register(self.flush, True)
     
-    def load_config(self) -> dict:
-        try:
-            with open(self.config_path, 'r') as f:
-                return json.load(f)
-        except FileNotFoundError:
-            return {"alerts": {"whatsapp": True}}
+    @classmethod
+    def shared(cls, config_path: str = None) -> "AlertManager":
+        """One manager per config file, so coalescing and rate limits are process-wide"""
+        key = str(Path(config_path or Path(__file__).parent.parent / "config" / "clawdguard.json").resolve())
+        with cls._shared_lock:
+            if key not in cls._shared:
+                cls._shared[key] = cls(key)
+            return cls._shared[key]
+    
+    @property
+    def config(self) -> dict:
+        return self.config_service.get()
+    
+    def apply_options(self):
+        """
+        (Re)apply the "alerting" section if the config changed since it
+        was last applied. Open coalescing groups are kept, and a channel
+        whose limits are unchanged keeps its tokens.
+        """
+        config = self.config
+        if self.options_version == self.config_service.version:
+            return
+        self.options_version = self.config_service.version
+        
+        options = config.get("alerting", {})
+        self.coalescer.window = options.get("coalesce_window", 300)
+        buckets = {}
+        for channel, limits in options.get("channels", {"whatsapp": {}}).items():
+            rate, burst = limits.get("rate_per_minute", 2), limits.get("burst", 5)
+            bucket = self.buckets.get(channel)
+            if bucket is None or bucket.rate != rate / 60.0 or bucket.burst != burst:
+                bucket = TokenBucket(rate, burst)
+            buckets[channel] = bucket
+        self.buckets = buckets
+        self.digest_interval = options.get("daily_digest_hours", 24) * 3600
     
     def log_alert(self, alert: Alert):
         """Log alert to file"""
+        record = {
+            "timestamp": alert.timestamp,
+            "level": alert.level,
+            "title": alert.title,
+            "description": alert.description,
+            "details": alert.details
+        }
+        
         self.alert_log_path.parent.mkdir(parents=True, exist_ok=True)
         with open(self.alert_log_path, 'a') as f:
-            f.write(json.dumps({
-                "timestamp": alert.timestamp,
-                "level": alert.level,
-                "title": alert.title,
-                "description": alert.description,
-                "details": alert.details
-            }) + "\n")
+            f.write(json.dumps(record) + "\n")
+        
+        if self.store:
+            self.store.add_alert(record)
     
     def format_message(self, alert: Alert) -> str:
         """Format alert for messaging"""
@@ -108,25 +171,140 @@ _Time: {alert.timestamp}_"""
         
         if alert_type == 'immediate':
             # Send immediately via WhatsApp
-            return self.send_whatsapp(alert)
+            return self.deliver(alert)
         elif alert_type == 'session':
             # Queue for session notification
-            return self.send_whatsapp(alert)
+            return self.deliver(alert)
         elif alert_type == 'daily':
             # Just log, will be included in daily digest
             return True
         
         return True
+    
+    def deliver(self, alert: Alert, channel: str = "whatsapp") -> bool:
+        """
+        Send unless it repeats a recent alert or the channel is over its
+        rate. Critical and urgent alerts always go out at once.
+        """
+        if alert.level == "critical" or alert.urgent:
+            return self.send_whatsapp(alert)
+        
+        key = alert.key or alert.title
+        with self.lock:
+            self.apply_options()
+            if not self.coalescer.offer(alert.level, key, alert.description, alert.details, title=alert.title):
+                return True
+            bucket = self.buckets.get(channel)
+            if bucket and not bucket.take():
+                self.coalescer.hold(alert.level, key, alert.description, alert.details)
+                return True
+        return self.send_whatsapp(alert)
+    
+    def flush(self, force: bool = False):
+        """
+        Send a digest of repeats whose window has closed (all of them if
+        force), and the daily digest when it's due. Called every watcher
+        tick and at exit.
+        """
+        with self.lock:
+            self.apply_options()
+            groups = self.coalescer.due(force=force)
+            bucket = self.buckets.get("whatsapp")
+            if groups and (force or not bucket or bucket.take()):
+                self.coalescer.reported(groups)
+            else:
+                groups = []
+            self.coalescer.expire()
+        
+        if groups:
+            self.send_whatsapp(Alert(*build_coalesced_digest(groups, self.coalescer.window)))
+        
+        if not force:
+            self.send_daily_digest()
+    
+    def daily_levels(self) -> List[str]:
+        """Levels configured for the daily digest rather than a message"""
+        return [level for level, options in self.config.get('threat_levels', {}).items()
+                if options.get('alert') == 'daily']
+    
+    def daily_records(self, since: str, levels: List[str]) -> List[Dict]:
+        """Logged alerts at the given levels since a timestamp"""
+        if self.store:
+            return [record for level in levels for record in self.store.query("alerts", since=since, level=level)]
+        
+        records = []
+        try:
+            with open(self.alert_log_path, 'r') as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue
+                    if record.get("level") in levels and record.get("timestamp", "") >= since:
+                        records.append(record)
+        except FileNotFoundError:
+            pass
+        return records
+    
+    def build_daily_digest(self, since: str = None) -> Optional[Alert]:
+        """Digest of daily-level alerts since the last digest (or one interval)"""
+        levels = self.daily_levels()
+        if not levels:
+            return None
+        since = since or self.last_digest() or \
+            (datetime.utcnow() - timedelta(seconds=self.digest_interval)).isoformat() + "Z"
+        digest = build_daily_digest(self.daily_records(since, levels), since)
+        return Alert(*digest) if digest else None
+    
+    def last_digest(self) -> Optional[str]:
+        if not hasattr(self, "_last_digest"):
+            try:
+                with open(self.digest_state_path, 'r') as f:
+                    self._last_digest = json.load(f).get("last_digest")
+            except (FileNotFoundError, json.JSONDecodeError):
+                self._last_digest = None
+        return self._last_digest
+    
+    def send_daily_digest(self, force: bool = False) -> Optional[Alert]:
+        """
+        Queue the daily digest if a full interval has passed since the
+        last. The first run only starts the clock, so a fresh install
+        waits a full interval instead of sending one on its first tick.
+        """
+        if not self.daily_levels():
+            return None
+        
+        now = datetime.utcnow()
+        last = self.last_digest()
+        if not force:
+            if last is None:
+                self.record_digest(now)
+                return None
+            if now - datetime.fromisoformat(last.rstrip("Z")) < timedelta(seconds=self.digest_interval):
+                return None
+        
+        digest = self.build_daily_digest(since=last)
+        if digest:
+            self.send_whatsapp(digest)
+        self.record_digest(now)
+        return digest
+    
+    def record_digest(self, when: datetime):
+        self._last_digest = when.isoformat() + "Z"
+        atomic_write_json(self.digest_state_path, {"last_digest": self._last_digest})
 
 
-def send_immediate_alert(level: str, title: str, description: str, details: str = ""):
+def send_immediate_alert(level: str, title: str, description: str, details: str = "",
+                         key: str = None, urgent: bool = False):
     """Convenience function for sending an alert"""
-    manager = AlertManager()
+    manager = AlertManager.shared()
     alert = Alert(
         level=level,
         title=title,
         description=description,
-        details=details
+        details=details,
+        key=key,
+        urgent=urgent
     )
     return manager.send_alert(alert)
 
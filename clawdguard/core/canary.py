@@ -7,35 +7,111 @@ Honeypot files that trigger alerts when accessed
 import json
 import os
 import stat
+import sys
 from datetime import datetime
 from pathlib import Path
-from typing import List, Dict
+from typing import List, Dict, Optional, Tuple
 import hashlib
 
+# Add parent to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from core.config import ConfigService
+from core.persist import atomic_write_json
+from core.tail import tail_jsonl
+
+# Reading a canary to verify it shouldn't look like an access
+O_NOATIME = getattr(os, "O_NOATIME", 0)
+
+
+def file_fingerprint(file_stat: os.stat_result) -> List[int]:
+    """Cheap change signals; ctime can't be set back the way mtime can with touch"""
+    return [file_stat.st_size, file_stat.st_mtime_ns, file_stat.st_ctime_ns, file_stat.st_ino]
+
+
+def hash_file(path: Path, legacy: bool = False) -> Tuple[str, Optional[str], bool]:
+    """
+    (blake2b digest, md5 digest if legacy, whether atime was left alone).
+    md5 is only computed to check canaries created before the switch.
+    """
+    try:
+        fd = os.open(path, os.O_RDONLY | O_NOATIME)
+        noatime = bool(O_NOATIME)
+    except PermissionError:
+        # O_NOATIME needs us to own the file
+        fd = os.open(path, os.O_RDONLY)
+        noatime = False
+    
+    digest = hashlib.blake2b(digest_size=32)
+    md5 = hashlib.md5() if legacy else None
+    with os.fdopen(fd, 'rb') as f:
+        for block in iter(lambda: f.read(64 * 1024), b""):
+            digest.update(block)
+            if md5:
+                md5.update(block)
+    return digest.hexdigest(), md5.hexdigest() if md5 else None, noatime
+
+
 class CanarySystem:
     def __init__(self, config_path: str = None):
         self.config_path = config_path or str(Path(__file__).parent.parent / "config" / "clawdguard.json")
-        self.config = self.load_config()
+        self.config_service = ConfigService.shared(self.config_path)
         self.state_path = Path(__file__).parent.parent / "logs" / "canary_state.json"
+        self.alerts_path = Path(__file__).parent.parent / "logs" / "canary_alerts.jsonl"
+        self.state_signature = None
         self.state = self.load_state()
+        self.hashed: List[str] = []  # Canaries read by the last verify_canaries()
     
-    def load_config(self) -> dict:
-        try:
-            with open(self.config_path, 'r') as f:
-                return json.load(f)
-        except FileNotFoundError:
-            return {"canary_files": []}
+    @property
+    def config(self) -> dict:
+        return self.config_service.get()
     
     def load_state(self) -> dict:
-        if self.state_path.exists():
-            with open(self.state_path, 'r') as f:
-                return json.load(f)
-        return {"canaries": {}, "alerts": []}
+        """Read the state file; no writes, so any process can read it safely"""
+        self.state_signature = self.file_signature()
+        self.unmigrated: List[Dict] = []
+        if not self.state_path.exists():
+            return {"canaries": {}, "alert_count": 0}
+        
+        with open(self.state_path, 'r') as f:
+            state = json.load(f)
+        
+        # Older state kept every alert inline; they move to the JSONL log
+        # on the next save
+        if "alerts" in state:
+            self.unmigrated = state.pop("alerts")
+            state["alert_count"] = state.get("alert_count", 0) + len(self.unmigrated)
+        
+        return state
     
     def save_state(self):
-        self.state_path.parent.mkdir(parents=True, exist_ok=True)
-        with open(self.state_path, 'w') as f:
-            json.dump(self.state, f, indent=2)
+        """
+        Replace the state file atomically: the daemon and cron both read
+        it, and must never see it half-written.
+        """
+        if self.unmigrated:
+            self.append_alerts(self.unmigrated)
+            self.unmigrated = []
+        atomic_write_json(self.state_path, self.state, indent=2)
+        self.state_signature = self.file_signature()
+    
+    def file_signature(self) -> Optional[Tuple]:
+        try:
+            st = os.stat(self.state_path)
+        except FileNotFoundError:
+            return None
+        return (st.st_mtime_ns, st.st_size, st.st_ino)
+    
+    def refresh_state(self) -> bool:
+        """
+        Re-read the state file if another process (e.g. `canary setup`)
+        changed it, so a long-running daemon doesn't save over it.
+        True if it was reloaded.
+        """
+        if self.file_signature() == self.state_signature:
+            return False
+        self.state = self.load_state()
+        return True
     
     def create_canary(self, path: str, content: str = None) -> bool:
         """Create a canary file"""
@@ -62,7 +138,8 @@ class CanarySystem:
             "created": datetime.utcnow().isoformat(),
             "initial_atime": file_stat.st_atime,
             "initial_mtime": file_stat.st_mtime,
-            "content_hash": hashlib.md5(content.encode()).hexdigest()
+            "digest": hashlib.blake2b(content.encode(), digest_size=32).hexdigest(),
+            "fingerprint": file_fingerprint(file_stat)
         }
         
         self.save_state()
@@ -112,11 +189,18 @@ MIIEvgIBADANBgkqhkiG9w0BAQEFAASCBKgwggSkAgEAAoIBAQC7fake
 # If you see this in logs, an unauthorized access attempt was detected
 """
     
-    def check_canaries(self) -> List[Dict]:
-        """Check if any canary files have been accessed"""
+    def check_canaries(self, paths: List[str] = None, advance: bool = False) -> List[Dict]:
+        """
+        Check if any canary files (or just those in paths) have been
+        accessed. With advance, the recorded atime/mtime move up to what
+        was just seen, so a daemon calling this every tick alerts once per
+        access rather than forever.
+        """
         alerts = []
         
         for path_str, initial_state in self.state.get("canaries", {}).items():
+            if paths is not None and path_str not in paths:
+                continue
             canary_path = Path(path_str)
             
             if not canary_path.exists():
@@ -150,7 +234,10 @@ MIIEvgIBADANBgkqhkiG9w0BAQEFAASCBKgwggSkAgEAAoIBAQC7fake
                         "timestamp": datetime.utcnow().isoformat(),
                         "severity": "critical"
                     })
-                    
+                
+                if advance:
+                    self.advance(path_str, current_stat)
+            
             except Exception as e:
                 alerts.append({
                     "type": "error",
@@ -161,12 +248,98 @@ MIIEvgIBADANBgkqhkiG9w0BAQEFAASCBKgwggSkAgEAAoIBAQC7fake
                 })
         
         # Record alerts
+        self.record_alerts(alerts)
+        
+        return alerts
+    
+    def verify_canaries(self, paths: List[str] = None) -> List[Dict]:
+        """
+        Check canary contents against their recorded digest. A canary is
+        only read when its size, mtime, ctime or inode differ from the
+        last verified fingerprint, so on an untouched set this costs one
+        stat per canary and can run every tick. Paths read are left in
+        self.hashed so a live monitor can discount its own access.
+        """
+        alerts = []
+        self.hashed = []
+        changed = False
+        
+        for path_str, initial_state in self.state.get("canaries", {}).items():
+            if paths is not None and path_str not in paths:
+                continue
+            
+            try:
+                file_stat = os.stat(path_str)
+            except FileNotFoundError:
+                # Reported as deleted by check_canaries
+                continue
+            except OSError:
+                continue
+            fingerprint = file_fingerprint(file_stat)
+            if fingerprint == initial_state.get("fingerprint"):
+                continue
+            
+            legacy = "digest" not in initial_state
+            try:
+                digest, md5, noatime = hash_file(Path(path_str), legacy=legacy)
+            except OSError as e:
+                alerts.append({
+                    "type": "error",
+                    "path": path_str,
+                    "error": str(e),
+                    "timestamp": datetime.utcnow().isoformat(),
+                    "severity": "high"
+                })
+                continue
+            self.hashed.append(path_str)
+            
+            if legacy:
+                intact = md5 == initial_state.get("content_hash")
+                if intact:
+                    # Verified once against md5; blake2b from here on
+                    initial_state["digest"] = digest
+            else:
+                intact = digest == initial_state["digest"]
+            
+            if not intact:
+                alerts.append({
+                    "type": "tampered",
+                    "path": path_str,
+                    "timestamp": datetime.utcnow().isoformat(),
+                    "severity": "critical"
+                })
+            
+            # The digest stays the original, so a tampered canary is reported
+            # again if it changes again, but not on every tick in between
+            initial_state["fingerprint"] = fingerprint
+            if not noatime and file_stat.st_atime <= initial_state["initial_atime"]:
+                # Only our own read can have bumped atime, so don't report
+                # it as an access. An atime already past the recorded one
+                # (read, then touched) is left for check_canaries, and
+                # mtime never moves here.
+                initial_state["initial_atime"] = max(initial_state["initial_atime"], os.stat(path_str).st_atime)
+            changed = True
+        
         if alerts:
-            self.state["alerts"].extend(alerts)
+            self.record_alerts(alerts)
+        elif changed:
             self.save_state()
         
         return alerts
     
+    def advance(self, path_str: str, file_stat: os.stat_result):
+        """Move a canary's recorded times up to file_stat so they aren't reported again"""
+        initial_state = self.state["canaries"][path_str]
+        initial_state["initial_atime"] = max(initial_state["initial_atime"], file_stat.st_atime)
+        initial_state["initial_mtime"] = max(initial_state["initial_mtime"], file_stat.st_mtime)
+    
+    def record_alerts(self, alerts: List[Dict]):
+        """Add alerts to the history and count"""
+        if alerts:
+            self.append_alerts(alerts)
+            self.state["alert_count"] = self.state.get("alert_count", 0) + len(alerts)
+            self.save_state()
+    
     def setup_default_canaries(self):
         """Set up canaries from config"""
         canary_paths = self.config.get("canary_files", [
@@ -180,13 +353,22 @@ MIIEvgIBADANBgkqhkiG9w0BAQEFAASCBKgwggSkAgEAAoIBAQC7fake
             if expanded not in self.state.get("canaries", {}):
                 self.create_canary(path)
     
+    def append_alerts(self, alerts: List[Dict]):
+        """Alert history lives in canary_alerts.jsonl, not the state file"""
+        if not alerts:
+            return
+        self.alerts_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.alerts_path, 'a') as f:
+            f.write("".join(json.dumps(alert) + "\n" for alert in alerts))
+    
     def get_status(self) -> Dict:
         """Get canary system status"""
         return {
             "total_canaries": len(self.state.get("canaries", {})),
             "canary_paths": list(self.state.get("canaries", {}).keys()),
-            "total_alerts": len(self.state.get("alerts", [])),
-            "recent_alerts": self.state.get("alerts", [])[-5:]
+            "total_alerts": self.state.get("alert_count", 0),
+            # Legacy inline alerts show here until a save moves them to the log
+            "recent_alerts": (self.unmigrated + tail_jsonl(self.alerts_path, 5))[-5:]
         }
 
 
@@ -204,20 +386,20 @@ def main():
     if args.action == "setup":
         canary.setup_default_canaries()
         print("✅ Default canaries set up")
-        
+    
     elif args.action == "check":
-        alerts = canary.check_canaries()
+        alerts = canary.check_canaries() + canary.verify_canaries()
         if alerts:
             print(f"🚨 {len(alerts)} CANARY ALERT(S):")
             for alert in alerts:
                 print(f"   [{alert['severity']}] {alert['type']}: {alert['path']}")
         else:
             print("✅ No canary alerts")
-            
+    
     elif args.action == "status":
         status = canary.get_status()
         print(json.dumps(status, indent=2))
-        
+    
     elif args.action == "create":
         if args.path:
             canary.create_canary(args.path)
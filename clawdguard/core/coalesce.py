@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+ClawdGuard - Alert Coalescing
+Token buckets, windowed grouping of repeated alerts, and digest building
+"""
+
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Tuple
+
+LEVEL_ORDER = ["low", "medium", "high", "critical"]
+
+
+def highest_level(levels: Iterable[str]) -> str:
+    return max(levels, key=lambda level: LEVEL_ORDER.index(level) if level in LEVEL_ORDER else -1)
+
+
+class TokenBucket:
+    """rate_per_minute tokens refill continuously, up to burst"""
+    
+    def __init__(self, rate_per_minute: float = 2.0, burst: int = 5):
+        self.rate = rate_per_minute / 60.0
+        self.burst = burst
+        self.tokens = float(burst)
+        self.last = time.monotonic()
+    
+    def refill(self, now: float = None):
+        now = time.monotonic() if now is None else now
+        self.tokens = min(self.burst, self.tokens + (now - self.last) * self.rate)
+        self.last = now
+    
+    def take(self, now: float = None) -> bool:
+        self.refill(now)
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return True
+        return False
+
+
+@dataclass
+class AlertGroup:
+    level: str
+    key: str
+    title: str
+    opened: float
+    suppressed: int = 0
+    descriptions: List[str] = field(default_factory=list)
+    details: List[str] = field(default_factory=list)
+    unlisted: int = 0  # repeats whose details didn't fit in the sample
+
+
+class AlertCoalescer:
+    """
+    Groups alerts by (level, key), where the key names what the alert is
+    about (a vuln_id and the matched text, say) rather than its title,
+    so repeats of one finding fold together but different findings
+    under the same title don't. The first alert of a group goes out at
+    once and opens a window of window seconds; repeats inside the window
+    are only counted, keeping a sample of their distinct descriptions
+    and details. Once a window closes, every group with repeats is
+    reported together in one digest.
+    """
+    
+    def __init__(self, window: float = 300.0, max_descriptions: int = 3, max_details: int = 5):
+        self.window = window
+        self.max_descriptions = max_descriptions
+        self.max_details = max_details
+        self.groups: Dict[Tuple[str, str], AlertGroup] = {}
+    
+    def offer(self, level: str, key: str, description: str = "", details: str = "",
+              title: str = None, now: float = None) -> bool:
+        """True if this alert should be sent now, False if it was absorbed"""
+        now = time.monotonic() if now is None else now
+        group = self.groups.get((level, key))
+        if group is None or now - group.opened >= self.window and not group.suppressed:
+            self.groups[(level, key)] = AlertGroup(level, key, title or key, now)
+            return True
+        self.absorb(group, description, details)
+        return False
+    
+    def absorb(self, group: AlertGroup, description: str = "", details: str = ""):
+        group.suppressed += 1
+        if description and description not in group.descriptions and len(group.descriptions) < self.max_descriptions:
+            group.descriptions.append(description)
+        if details and details not in group.details:
+            if len(group.details) < self.max_details:
+                group.details.append(details)
+            else:
+                group.unlisted += 1
+    
+    def hold(self, level: str, key: str, description: str = "", details: str = ""):
+        """Count an alert that was due to go out but had no token"""
+        self.absorb(self.groups[(level, key)], description, details)
+    
+    def due(self, now: float = None, force: bool = False) -> List[AlertGroup]:
+        """Groups whose window has closed with repeats to report"""
+        now = time.monotonic() if now is None else now
+        return [group for group in self.groups.values()
+                if group.suppressed and (force or now - group.opened >= self.window)]
+    
+    def expire(self, now: float = None):
+        """Forget quiet groups whose window has closed"""
+        now = time.monotonic() if now is None else now
+        for key, group in list(self.groups.items()):
+            if not group.suppressed and now - group.opened >= self.window:
+                del self.groups[key]
+    
+    def reported(self, groups: List[AlertGroup]):
+        """Close the windows of groups that just went out in a digest"""
+        for group in groups:
+            self.groups.pop((group.level, group.key), None)
+
+
+def build_coalesced_digest(groups: List[AlertGroup], window: float) -> Tuple[str, str, str, str]:
+    """(level, title, description, details) for a digest of repeated alerts"""
+    total = sum(group.suppressed for group in groups)
+    lines = []
+    for group in sorted(groups, key=lambda g: (-LEVEL_ORDER.index(g.level) if g.level in LEVEL_ORDER else 0, -g.suppressed)):
+        lines.append(f"• {group.suppressed}× [{group.level}] {group.title}")
+        for description in group.descriptions:
+            lines.append(f"    {description}")
+        for details in group.details:
+            lines.append("      " + details.replace("\n", "\n      "))
+        if group.unlisted:
+            lines.append(f"      … and {group.unlisted} more not shown")
+    return (
+        highest_level(group.level for group in groups),
+        f"🛡️ {total} repeated alert(s) held back",
+        "\n".join(lines),
+        f"Repeats and rate-limited alerts, grouped over {int(window)}s windows"
+    )
+
+
+def build_daily_digest(records: List[Dict], since: str, top: int = 10) -> Optional[Tuple[str, str, str, str]]:
+    """
+    (level, title, description, details) summarising alert records from
+    alerts.jsonl / the store since the given timestamp, or None if quiet.
+    """
+    if not records:
+        return None
+    
+    by_level = Counter(record.get("level", "unknown") for record in records)
+    by_title = Counter((record.get("level", "unknown"), record.get("title", "")) for record in records)
+    
+    counts = ", ".join(f"{by_level[level]} {level}" for level in reversed(LEVEL_ORDER) if by_level.get(level))
+    lines = [f"{len(records)} alert(s): {counts}", ""]
+    for (level, title), count in by_title.most_common(top):
+        lines.append(f"• {count}× [{level}] {title}")
+    if len(by_title) > top:
+        lines.append(f"• … and {len(by_title) - top} more kinds")
+    
+    return (
+        highest_level(by_level),
+        "📋 ClawdGuard daily digest",
+        "\n".join(lines),
+        f"Since {since}"
+    )
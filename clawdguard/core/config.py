@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+ClawdGuard - Config Service
+One cached, hot-reloading copy of clawdguard.json per process
+"""
+
+import copy
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+DEFAULT_CONFIG_PATH = Path(__file__).parent.parent / "config" / "clawdguard.json"
+
+# In effect while clawdguard.json doesn't exist
+DEFAULT_CONFIG = {"alerts": {"whatsapp": True}, "canary_files": []}
+
+class ConfigService:
+    """
+    Holds the parsed config and re-reads it only when the file changes
+    (mtime, size or inode), checking at most every check_interval
+    seconds. A reload swaps in a new dict rather than mutating the old
+    one, so a caller holding a reference always sees a consistent
+    snapshot. If an edit leaves the file unparsable, the last good
+    config stays in effect.
+
+    Components share an instance via ConfigService.shared(path) instead
+    of each opening and parsing the file themselves.
+    
+    Most keys apply on the next read. Those that size or open something
+    when a component is built need a restart: activity_log, baseline,
+    dedup, store, content_scan, canary_enabled, path_policy.cache_size,
+    async and server.
+    The alerting section is re-applied by AlertManager when it changes.
+    """
+    
+    _shared: Dict[str, "ConfigService"] = {}
+    _shared_lock = threading.Lock()
+    
+    def __init__(self, path: str = None, check_interval: float = 1.0):
+        self.path = Path(path or DEFAULT_CONFIG_PATH)
+        self.check_interval = check_interval
+        
+        self.data: Dict = {}
+        self.signature: Optional[Tuple] = None
+        self.version = 0
+        self.last_check = time.monotonic()
+        self.lock = threading.Lock()
+        self.reload()
+    
+    @classmethod
+    def shared(cls, path: str = None) -> "ConfigService":
+        """The process-wide service for path (default config/clawdguard.json)"""
+        key = str(Path(path or DEFAULT_CONFIG_PATH).resolve())
+        with cls._shared_lock:
+            service = cls._shared.get(key)
+            if service is None:
+                service = cls._shared[key] = cls(key)
+            return service
+    
+    def get(self) -> Dict:
+        """Current config, reloaded first if the file has changed"""
+        now = time.monotonic()
+        if now - self.last_check >= self.check_interval:
+            self.last_check = now
+            self.refresh()
+        return self.data
+    
+    def file_signature(self) -> Optional[Tuple]:
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return (st.st_mtime_ns, st.st_size, st.st_ino)
+    
+    def refresh(self) -> bool:
+        """Reload if the file changed since the last load; True if it did"""
+        if self.file_signature() == self.signature:
+            return False
+        return self.reload()
+    
+    def reload(self) -> bool:
+        with self.lock:
+            signature = self.file_signature()
+            if signature is None:
+                self.data, self.signature = copy.deepcopy(DEFAULT_CONFIG), None
+                self.version += 1
+                return True
+            
+            try:
+                with open(self.path, 'r') as f:
+                    data = json.load(f)
+            except (OSError, json.JSONDecodeError) as e:
+                print(f"⚠️ Keeping previous config, cannot load {self.path}: {e}")
+                # Don't retry until the file changes again
+                self.signature = signature
+                return False
+            
+            self.data, self.signature = data, signature
+            self.version += 1
+            return True
@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+ClawdGuard - Config Check Engine
+config_check rules compiled to lookups on the parsed Clawdbot config
+"""
+
+import json
+import re
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+# A key that must (or must not) exist, whatever its value
+PRESENT = object()
+
+PATH_TOKEN = re.compile(r"\.?([^.\[\]]+)|\[(\d+)\]")
+
+
+@dataclass
+class ConfigRule:
+    vuln: Dict
+    kind: str                   # "must_have" or "must_not_have"
+    text: str                   # the rule as written in vulns.json
+    path: Optional[Tuple] = None  # keys/indexes from the root, when json_path is given
+    key: Optional[str] = None     # otherwise, a key found anywhere in the tree
+    value: Any = PRESENT
+
+
+def parse_json_path(json_path: str) -> Tuple:
+    """"$.gateway.auth.mode" / "gateway.trustedProxies[0]" -> ("gateway", "auth", "mode")"""
+    if json_path.startswith("$"):
+        json_path = json_path[1:]
+    parts = []
+    for name, index in PATH_TOKEN.findall(json_path):
+        parts.append(int(index) if index else name)
+    return tuple(parts)
+
+
+def parse_snippet(text: str) -> Optional[Tuple[str, Any]]:
+    """
+    (key, value) for a rule written as a JSON fragment, e.g.
+    '"bind": "loopback"', or (key, PRESENT) for a bare key name.
+    None if it is neither, and can only be matched as text.
+    """
+    try:
+        fragment = json.loads("{" + text + "}")
+    except json.JSONDecodeError:
+        fragment = None
+    if isinstance(fragment, dict) and len(fragment) == 1:
+        return next(iter(fragment.items()))
+    if re.fullmatch(r"[A-Za-z_][\w-]*", text):
+        return text, PRESENT
+    return None
+
+
+def compile_rules(vulns: List[Dict]) -> List[ConfigRule]:
+    """
+    One rule per must_have/must_not_have. Rules keep their legacy text
+    form ('"bind": "loopback"', or a bare key name), which is matched
+    against a key of that name anywhere in the config. With "json_path"
+    in the config_check, the fragment's value (or the key's presence, if
+    it names the last path component) is checked at that path instead;
+    a non-string must_have is taken as the value itself.
+    """
+    rules = []
+    for vuln in vulns:
+        check = vuln.get('config_check')
+        if not check:
+            continue
+        path = parse_json_path(check['json_path']) if check.get('json_path') else None
+        for kind in ("must_not_have", "must_have"):
+            if kind not in check:
+                continue
+            expected = check[kind]
+            if not isinstance(expected, str):
+                rules.append(ConfigRule(vuln, kind, json.dumps(expected), path=path, value=expected))
+                continue
+            
+            snippet = parse_snippet(expected)
+            if snippet is None:
+                rules.append(ConfigRule(vuln, kind, expected))
+            elif path is None:
+                rules.append(ConfigRule(vuln, kind, expected, key=snippet[0], value=snippet[1]))
+            elif snippet[1] is PRESENT and path and snippet[0] != path[-1]:
+                # A plain string value, not a key name
+                rules.append(ConfigRule(vuln, kind, expected, path=path, value=expected))
+            else:
+                rules.append(ConfigRule(vuln, kind, expected, path=path, value=snippet[1]))
+    return rules
+
+
+class ConfigTree:
+    """A parsed config with every key indexed, built once per check"""
+    
+    def __init__(self, data: Any):
+        self.data = data
+        self.keys: Dict[str, List[Any]] = {}
+        self.index(data)
+    
+    def index(self, node: Any):
+        stack = [node]
+        while stack:
+            node = stack.pop()
+            if isinstance(node, dict):
+                for key, value in node.items():
+                    self.keys.setdefault(key, []).append(value)
+                    stack.append(value)
+            elif isinstance(node, list):
+                stack.extend(node)
+    
+    def lookup(self, path: Tuple) -> List[Any]:
+        node = self.data
+        for part in path:
+            try:
+                node = node[part]
+            except (KeyError, IndexError, TypeError):
+                return []
+        return [node]
+    
+    def values(self, rule: ConfigRule) -> List[Any]:
+        """Values the rule applies to: at its path, or under its key anywhere"""
+        if rule.path is not None:
+            return self.lookup(rule.path)
+        return self.keys.get(rule.key, [])
+
+
+def value_matches(found: Any, expected: Any) -> bool:
+    if expected is PRESENT:
+        return True
+    if found == expected:
+        return True
+    return isinstance(found, list) and not isinstance(expected, list) and expected in found
+
+
+def violated(rule: ConfigRule, tree: Optional[ConfigTree], raw: str) -> bool:
+    """Whether the config breaks the rule; unparsed configs fall back to text search"""
+    if tree is None or (rule.path is None and rule.key is None):
+        present = rule.text in raw
+    else:
+        present = any(value_matches(found, rule.value) for found in tree.values(rule))
+    return present if rule.kind == "must_not_have" else not present
+
+
+def evaluate(rules: List[ConfigRule], raw: str) -> List[ConfigRule]:
+    """Rules the config text violates, parsed once for all of them"""
+    try:
+        tree = ConfigTree(json.loads(raw))
+    except json.JSONDecodeError:
+        # e.g. JSON5 comments; the old substring checks are all we can do
+        tree = None
+    return [rule for rule in rules if violated(rule, tree, raw)]
@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+ClawdGuard - Path Policy
+Sensitive-path globs compiled once into a combined regex, with cached verdicts
+"""
+
+import os
+import posixpath
+import re
+from collections import OrderedDict
+from typing import Dict, List, Tuple
+
+
+def glob_to_regex(glob: str) -> str:
+    """
+    Regex source for one sensitive-path glob.
+
+    An entry without wildcards matches anywhere in the path, as
+    sensitive_paths always has: "credentials" also catches
+    credentials_backup, and ".env" catches .env.local. Otherwise:
+
+        *    any run of characters within one path component
+        ?    one character within a component
+        [..] a character class ([!..] negated), parsed as fnmatch does,
+             matching within a component
+        **   any number of whole components, including none
+
+    A wildcard glob starting with / or ~/ is anchored at the root; any
+    other may start at any component boundary. Its match ends at a
+    component boundary but covers everything beneath, so "*.pem" matches
+    key.pem and keys.pem/x, not key.pem.bak. ~ also matches the expanded
+    home directory. Paths are made absolute before matching (see
+    PathPolicy.match), so anchored globs still catch relative paths.
+    """
+    home = f"(?:~|{re.escape(os.path.expanduser('~'))})/"
+    if not any(c in glob for c in "*?["):
+        if glob.startswith("~/"):
+            return home + re.escape(glob[2:])
+        return re.escape(glob)
+    
+    out = []
+    if glob.startswith("~/"):
+        out.append("^" + home)
+        rest = glob[2:]
+    elif glob.startswith("/"):
+        out.append("^/")
+        rest = glob[1:]
+    else:
+        out.append("(?:^|/)")
+        rest = glob
+    
+    i = 0
+    while i < len(rest):
+        c = rest[i]
+        if rest.startswith("**", i):
+            i += 2
+            if rest.startswith("/", i):
+                i += 1
+                out.append("(?:[^/]*/)*")  # **/ : zero or more directories
+            else:
+                out.append(".*")
+            continue
+        if c == "*":
+            out.append("[^/]*")
+        elif c == "?":
+            out.append("[^/]")
+        elif c == "[":
+            # A "]" right after "[" or "[!" is part of the class
+            end = i + 1
+            if end < len(rest) and rest[end] == "!":
+                end += 1
+            if end < len(rest) and rest[end] == "]":
+                end += 1
+            while end < len(rest) and rest[end] != "]":
+                end += 1
+            if end >= len(rest):
+                out.append("\\[")  # unterminated: a literal [
+            else:
+                body = rest[i + 1:end].replace("\\", "\\\\")
+                if body.startswith("!"):
+                    # Negated, and still within one component
+                    body = "^/" + body[1:]
+                elif body.startswith(("^", "[")):
+                    body = "\\" + body
+                out.append("(?!/)[" + body + "]")
+                i = end
+        else:
+            out.append(re.escape(c))
+        i += 1
+    
+    out.append("(?:/.*)?$")
+    return "".join(out)
+
+
+def normalize_path(path: str, cwd: str = None) -> str:
+    """
+    Absolute form of path, resolved against cwd (default: ours) if it is
+    relative, with //, /./ and /../ collapsed so they can't be used to
+    step around a glob. ~ paths are left for the globs to match.
+    """
+    if not path:
+        return path
+    if not path.startswith(("/", "~")):
+        path = posixpath.join(cwd or os.getcwd(), path)
+    return posixpath.normpath(path)
+
+
+class PathPolicy:
+    """
+    Matches paths against a fixed list of sensitive globs. Every glob is
+    compiled once, and all of them are also joined into one alternation
+    so a path that matches none (the common case) costs a single regex
+    search. Verdicts for the most recent cache_size paths are kept in an
+    LRU, since file activity keeps touching the same paths.
+    """
+    
+    def __init__(self, globs: List[str], cache_size: int = 4096):
+        self.globs = list(globs)
+        self.cache_size = cache_size
+        self.patterns = [re.compile(glob_to_regex(glob), re.IGNORECASE) for glob in self.globs]
+        self.combined = re.compile("|".join(f"(?:{p.pattern})" for p in self.patterns), re.IGNORECASE) if self.patterns else None
+        self.cache: "OrderedDict[str, Tuple[str, ...]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+    
+    @classmethod
+    def from_config(cls, config: Dict) -> "PathPolicy":
+        """Build from "sensitive_paths" (and optional "path_policy") in clawdguard.json"""
+        options = config.get("path_policy", {})
+        return cls(config.get("sensitive_paths", []), cache_size=options.get("cache_size", 4096))
+    
+    def __len__(self):
+        return len(self.globs)
+    
+    def match(self, path: str, cwd: str = None) -> Tuple[str, ...]:
+        """
+        The globs path falls under, in config order; empty if none. A
+        relative path is taken relative to cwd (default: our own).
+        """
+        path = normalize_path(path, cwd)
+        verdict = self.cache.get(path)
+        if verdict is not None:
+            self.cache.move_to_end(path)
+            self.hits += 1
+            return verdict
+        
+        self.misses += 1
+        if self.combined is None or not self.combined.search(path):
+            verdict = ()
+        else:
+            verdict = tuple(glob for glob, pattern in zip(self.globs, self.patterns) if pattern.search(path))
+        
+        self.cache[path] = verdict
+        if len(self.cache) > self.cache_size:
+            self.cache.popitem(last=False)
+        return verdict
@@ -5,12 +5,26 @@ Detects threats based on vulnerability database patterns
 """
 
 import re
+import os
+import sys
 import json
+import hashlib
+import threading
 from pathlib import Path
 from typing import Optional, List, Dict, Tuple
 from dataclasses import dataclass
 from enum import Enum
 
+# Add parent to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from core.configcheck import ConfigRule, compile_rules, evaluate
+from core.pathpolicy import PathPolicy
+from core.rulebundle import bundle_path_for, load_bundle, source_digest, write_bundle
+from core.ruleset import Rule, RuleSet
+
+DEFAULT_VULN_DB_PATH = Path(__file__).parent.parent / "database" / "vulns.json"
+
 class ThreatLevel(Enum):
     CRITICAL = "critical"
     HIGH = "high"
@@ -28,18 +42,64 @@ class ThreatMatch:
     source: str
 
 class PatternMatcher:
-    def __init__(self, vuln_db_path: str = None):
-        self.vuln_db_path = vuln_db_path or str(Path(__file__).parent.parent / "database" / "vulns.json")
+    _shared: Dict[str, "PatternMatcher"] = {}
+    _shared_lock = threading.Lock()
+    
+    def __init__(self, vuln_db_path: str = None, use_bundle: bool = True):
+        self.vuln_db_path = vuln_db_path or str(DEFAULT_VULN_DB_PATH)
+        self.use_bundle = use_bundle
+        self.loaded_from = None  # "bundle" or "json"
+        self.source_sha256 = None
         self.vulns = []
         self.exploit_patterns = []
         self.compiled_patterns = {}
+        self.command_rules = RuleSet()
+        self.content_rules = RuleSet()
+        self.config_rules: List[ConfigRule] = []
+        # config path -> (stat signature, content digest, threats)
+        self.config_results: Dict[str, Tuple[Tuple, str, List[ThreatMatch]]] = {}
+        self.path_policy = PathPolicy([])
         self.load_database()
     
+    @classmethod
+    def shared(cls, vuln_db_path: str = None) -> "PatternMatcher":
+        """
+        The process-wide matcher for vuln_db_path, built on first use.
+        Commands that check several things reuse it instead of loading
+        the database again for each.
+        """
+        key = str(Path(vuln_db_path or DEFAULT_VULN_DB_PATH).resolve())
+        with cls._shared_lock:
+            matcher = cls._shared.get(key)
+            if matcher is None:
+                matcher = cls._shared[key] = cls(key)
+            return matcher
+    
     def load_database(self):
-        """Load vulnerability database and compile patterns"""
-        with open(self.vuln_db_path, 'r') as f:
-            db = json.load(f)
+        """
+        Load vulnerability database and compile patterns. If the rule
+        bundle (`clawdguard.py rules compile`) was built from the current
+        vulns.json, its pattern analysis is reused and only the final
+        regex compiles are left to do.
+        """
+        with open(self.vuln_db_path, 'rb') as f:
+            raw = f.read()
+        self.source_sha256 = source_digest(raw)
         
+        bundle, reason = load_bundle(self.vuln_db_path, raw) if self.use_bundle else (None, "disabled")
+        if bundle is not None:
+            self.load_bundle(bundle)
+        else:
+            if reason not in ("missing", "disabled"):
+                print(f"⚠️ Ignoring rule bundle: {reason}. Loading vulns.json; "
+                      f"run `clawdguard.py rules compile` to rebuild it.")
+            self.load_json(json.loads(raw))
+        
+        self.config_rules = compile_rules(self.vulns)
+        self.config_results = {}
+    
+    def load_json(self, db: Dict):
+        self.loaded_from = "json"
         self.vulns = db.get('vulnerabilities', [])
         self.exploit_patterns = db.get('exploit_patterns', [])
         
@@ -58,40 +118,110 @@ class PatternMatcher:
                     exploit['compiled'].append(re.compile(pattern, re.IGNORECASE))
                 except re.error:
                     print(f"Warning: Invalid exploit pattern: {pattern}")
+        
+        self.command_rules = RuleSet(self.build_command_rules())
+        self.content_rules = RuleSet(self.build_vuln_rules('content_scan'))
+    
+    def load_bundle(self, bundle: Dict):
+        """Rebuild from a bundle written by bundle_data(); patterns there are known good"""
+        self.loaded_from = "bundle"
+        self.vulns = bundle["db"]["vulnerabilities"]
+        self.exploit_patterns = bundle["db"]["exploit_patterns"]
+        
+        valid = bundle["valid"]
+        self.compiled_patterns = {
+            vuln_id: re.compile(pattern, re.IGNORECASE) for vuln_id, pattern in valid["vulns"].items()
+        }
+        for exploit, patterns in zip(self.exploit_patterns, valid["exploits"]):
+            exploit['compiled'] = [re.compile(pattern, re.IGNORECASE) for pattern in patterns]
+        
+        rulesets = bundle["rulesets"]
+        self.command_rules = RuleSet([Rule(*fields) for fields in rulesets["command"]["rules"]],
+                                     analysis=rulesets["command"]["analysis"])
+        self.content_rules = RuleSet([Rule(*fields) for fields in rulesets["content"]["rules"]],
+                                     analysis=rulesets["content"]["analysis"])
+    
+    def bundle_data(self) -> Dict:
+        """Everything load_bundle() needs, as marshal-able plain data"""
+        def ruleset_data(ruleset: RuleSet) -> Dict:
+            return {
+                "rules": [(rule.vuln_id, rule.name, rule.description, rule.severity, rule.pattern, rule.source)
+                          for rule in ruleset.rules],
+                "analysis": ruleset.analysis(),
+            }
+        
+        return {
+            "source_sha256": self.source_sha256,
+            "db": {
+                "vulnerabilities": self.vulns,
+                "exploit_patterns": [{key: value for key, value in exploit.items() if key != 'compiled'}
+                                     for exploit in self.exploit_patterns],
+            },
+            "valid": {
+                "vulns": {vuln_id: compiled.pattern for vuln_id, compiled in self.compiled_patterns.items()},
+                "exploits": [[compiled.pattern for compiled in exploit.get('compiled', [])]
+                             for exploit in self.exploit_patterns],
+            },
+            "rulesets": {
+                "command": ruleset_data(self.command_rules),
+                "content": ruleset_data(self.content_rules),
+            },
+        }
+    
+    @classmethod
+    def compile_bundle(cls, vuln_db_path: str = None, bundle_path: Path = None) -> "PatternMatcher":
+        """Build the rule bundle from vulns.json (never from an older bundle)"""
+        matcher = cls(vuln_db_path, use_bundle=False)
+        write_bundle(bundle_path or bundle_path_for(matcher.vuln_db_path), matcher.bundle_data())
+        return matcher
+    
+    def build_vuln_rules(self, detection: str) -> List[Rule]:
+        """Rules for vulnerabilities using the given detection type"""
+        rules = []
+        for vuln in self.vulns:
+            if vuln.get('detection') == detection and vuln['id'] in self.compiled_patterns:
+                rules.append(Rule(
+                    vuln_id=vuln['id'],
+                    name=vuln['name'],
+                    description=vuln['description'],
+                    severity=vuln['severity'],
+                    pattern=vuln['pattern'],
+                    source=vuln.get('source', 'unknown'),
+                    compiled=self.compiled_patterns[vuln['id']]
+                ))
+        return rules
+    
+    def build_command_rules(self) -> List[Rule]:
+        """Exploit patterns followed by command_scan vulns, in scan order"""
+        rules = []
+        for exploit in self.exploit_patterns:
+            for compiled in exploit.get('compiled', []):
+                rules.append(Rule(
+                    vuln_id=f"EXPLOIT-{exploit['name'].upper()}",
+                    name=exploit['name'],
+                    description=f"Detected {exploit['name']} pattern",
+                    severity=exploit['severity'],
+                    pattern=compiled.pattern,
+                    source="exploit_patterns",
+                    compiled=compiled
+                ))
+        return rules + self.build_vuln_rules('command_scan')
     
     def scan_command(self, command: str) -> List[ThreatMatch]:
         """Scan a shell command for threats"""
         threats = []
         
-        # Check exploit patterns
-        for exploit in self.exploit_patterns:
-            for compiled in exploit.get('compiled', []):
-                match = compiled.search(command)
-                if match:
-                    threats.append(ThreatMatch(
-                        level=ThreatLevel(exploit['severity']),
-                        vuln_id=f"EXPLOIT-{exploit['name'].upper()}",
-                        name=exploit['name'],
-                        description=f"Detected {exploit['name']} pattern",
-                        matched_pattern=compiled.pattern,
-                        matched_text=match.group(0),
-                        source="exploit_patterns"
-                    ))
-        
-        # Check vulnerability patterns
-        for vuln in self.vulns:
-            if vuln.get('detection') == 'command_scan' and vuln['id'] in self.compiled_patterns:
-                match = self.compiled_patterns[vuln['id']].search(command)
-                if match:
-                    threats.append(ThreatMatch(
-                        level=ThreatLevel(vuln['severity']),
-                        vuln_id=vuln['id'],
-                        name=vuln['name'],
-                        description=vuln['description'],
-                        matched_pattern=vuln['pattern'],
-                        matched_text=match.group(0),
-                        source=vuln.get('source', 'unknown')
-                    ))
+        # Single pass over the merged exploit + command_scan rules
+        for rule, match in self.command_rules.scan(command):
+            threats.append(ThreatMatch(
+                level=ThreatLevel(rule.severity),
+                vuln_id=rule.vuln_id,
+                name=rule.name,
+                description=rule.description,
+                matched_pattern=rule.pattern,
+                matched_text=match.group(0),
+                source=rule.source
+            ))
         
         return threats
     
@@ -99,85 +229,93 @@ class PatternMatcher:
         """Scan content (web pages, messages) for prompt injection"""
         threats = []
         
-        for vuln in self.vulns:
-            if vuln.get('detection') == 'content_scan' and vuln['id'] in self.compiled_patterns:
-                match = self.compiled_patterns[vuln['id']].search(content)
-                if match:
-                    threats.append(ThreatMatch(
-                        level=ThreatLevel(vuln['severity']),
-                        vuln_id=vuln['id'],
-                        name=vuln['name'],
-                        description=vuln['description'],
-                        matched_pattern=vuln['pattern'],
-                        matched_text=match.group(0)[:100],  # Truncate for safety
-                        source=vuln.get('source', 'unknown')
-                    ))
+        for rule, match in self.content_rules.scan(content):
+            threats.append(ThreatMatch(
+                level=ThreatLevel(rule.severity),
+                vuln_id=rule.vuln_id,
+                name=rule.name,
+                description=rule.description,
+                matched_pattern=rule.pattern,
+                matched_text=match.group(0)[:100],  # Truncate for safety
+                source=rule.source
+            ))
         
         return threats
     
-    def scan_file_path(self, path: str, config: dict = None) -> List[ThreatMatch]:
-        """Check if file path matches sensitive patterns"""
+    def scan_file_path(self, path: str, config: dict = None, cwd: str = None) -> List[ThreatMatch]:
+        """Check if file path (relative paths: relative to cwd) matches sensitive patterns"""
         threats = []
-        config = config or {}
-        sensitive_paths = config.get('sensitive_paths', [])
-        
-        for sensitive in sensitive_paths:
-            # Convert glob to regex
-            pattern = sensitive.replace('.', '\\.').replace('*', '.*')
-            if re.search(pattern, path, re.IGNORECASE):
-                threats.append(ThreatMatch(
-                    level=ThreatLevel.HIGH,
-                    vuln_id="SENSITIVE-PATH",
-                    name="Sensitive File Access",
-                    description=f"Attempt to access sensitive path matching: {sensitive}",
-                    matched_pattern=sensitive,
-                    matched_text=path,
-                    source="config"
-                ))
+        policy = self.get_path_policy(config or {})
+        
+        for sensitive in policy.match(path, cwd):
+            threats.append(ThreatMatch(
+                level=ThreatLevel.HIGH,
+                vuln_id="SENSITIVE-PATH",
+                name="Sensitive File Access",
+                description=f"Attempt to access sensitive path matching: {sensitive}",
+                matched_pattern=sensitive,
+                matched_text=path,
+                source="config"
+            ))
         
         return threats
     
+    def get_path_policy(self, config: dict) -> PathPolicy:
+        """The compiled policy for config's sensitive_paths, rebuilt only when they change"""
+        if self.path_policy.globs != config.get('sensitive_paths', []):
+            self.path_policy = PathPolicy.from_config(config)
+        return self.path_policy
+    
     def check_config(self, config_path: str = "/Users/victor/.clawdbot/clawdbot.json") -> List[ThreatMatch]:
-        """Check Clawdbot config for known misconfigurations"""
-        threats = []
+        """
+        Check Clawdbot config for known misconfigurations. The config is
+        parsed once and each config_check rule is a lookup in it. Results
+        are kept until the file changes (stat first, then content hash,
+        so a touch alone doesn't re-run the rules).
+        """
+        try:
+            st = os.stat(config_path)
+        except FileNotFoundError:
+            return []
+        signature = (st.st_mtime_ns, st.st_size, st.st_ino)
+        
+        cached = self.config_results.get(config_path)
+        if cached and cached[0] == signature:
+            return list(cached[2])
         
         try:
-            with open(config_path, 'r') as f:
-                config_content = f.read()
-            
-            for vuln in self.vulns:
-                if 'config_check' in vuln:
-                    check = vuln['config_check']
-                    
-                    # Check must_not_have
-                    if check.get('must_not_have'):
-                        if check['must_not_have'] in config_content:
-                            threats.append(ThreatMatch(
-                                level=ThreatLevel(vuln['severity']),
-                                vuln_id=vuln['id'],
-                                name=vuln['name'],
-                                description=vuln['description'],
-                                matched_pattern=check['must_not_have'],
-                                matched_text=f"Found in {config_path}",
-                                source=vuln.get('source', 'unknown')
-                            ))
-                    
-                    # Check must_have
-                    if check.get('must_have'):
-                        if check['must_have'] not in config_content:
-                            threats.append(ThreatMatch(
-                                level=ThreatLevel(vuln['severity']),
-                                vuln_id=vuln['id'],
-                                name=vuln['name'],
-                                description=f"Missing required config: {check['must_have']}",
-                                matched_pattern=check['must_have'],
-                                matched_text=f"Not found in {config_path}",
-                                source=vuln.get('source', 'unknown')
-                            ))
+            with open(config_path, 'rb') as f:
+                raw = f.read()
         except FileNotFoundError:
-            pass
+            return []
+        digest = hashlib.sha256(raw).hexdigest()
+        if cached and cached[1] == digest:
+            self.config_results[config_path] = (signature, digest, cached[2])
+            return list(cached[2])
         
-        return threats
+        threats = [self.config_threat(rule, config_path)
+                   for rule in evaluate(self.config_rules, raw.decode('utf-8', errors='replace'))]
+        self.config_results[config_path] = (signature, digest, threats)
+        return list(threats)
+    
+    def config_threat(self, rule: ConfigRule, config_path: str) -> ThreatMatch:
+        vuln = rule.vuln
+        where = ".".join(str(part) for part in rule.path) if rule.path else None
+        if rule.kind == "must_not_have":
+            description = vuln['description']
+            matched_text = f"Found at {where} in {config_path}" if where else f"Found in {config_path}"
+        else:
+            description = f"Missing required config: {rule.text}"
+            matched_text = f"Not found at {where} in {config_path}" if where else f"Not found in {config_path}"
+        return ThreatMatch(
+            level=ThreatLevel(vuln['severity']),
+            vuln_id=vuln['id'],
+            name=vuln['name'],
+            description=description,
+            matched_pattern=rule.text,
+            matched_text=matched_text,
+            source=vuln.get('source', 'unknown')
+        )
 
 
 if __name__ == "__main__":
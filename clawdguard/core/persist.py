@@ -0,0 +1,39 @@
+#!/usr/bin/env python3
+"""
+ClawdGuard - Persistence Helpers
+Crash-safe writes for state files under logs/
+"""
+
+import json
+import os
+import tempfile
+from pathlib import Path
+
+
+def atomic_write_bytes(path: Path, data: bytes):
+    """
+    Write to a temp file in the same directory, fsync it, then rename
+    over the target, so readers (and a restart after a crash) only ever
+    see the old file or the complete new one.
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    
+    fd, tmp_path = tempfile.mkstemp(prefix=f".{path.name}.", suffix=".tmp", dir=path.parent)
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except FileNotFoundError:
+            pass
+        raise
+
+
+def atomic_write_json(path: Path, data, indent: int = None):
+    """atomic_write_bytes() of data serialised as JSON"""
+    atomic_write_bytes(path, json.dumps(data, indent=indent).encode())
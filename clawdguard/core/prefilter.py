@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+"""
+ClawdGuard - Literal Prefilter
+Required-literal extraction and a multi-string index that decides which
+regex rules can possibly match a line before any regex is run
+"""
+
+import re
+from collections import deque
+from typing import Dict, Iterable, List, Optional, Set
+
+try:
+    from re import _parser as sre_parse
+except ImportError:  # Python < 3.11
+    import sre_parse
+
+# Literals shorter than this hit too many benign lines to be worth indexing
+MIN_LITERAL_LENGTH = 3
+
+LITERAL = sre_parse.LITERAL
+SUBPATTERN = sre_parse.SUBPATTERN
+BRANCH = sre_parse.BRANCH
+REPEAT_OPS = {sre_parse.MAX_REPEAT, sre_parse.MIN_REPEAT}
+if hasattr(sre_parse, "POSSESSIVE_REPEAT"):
+    REPEAT_OPS.add(sre_parse.POSSESSIVE_REPEAT)
+ATOMIC_GROUP = getattr(sre_parse, "ATOMIC_GROUP", None)
+
+
+def _better(current: Optional[List[str]], candidate: Optional[List[str]]) -> Optional[List[str]]:
+    """Prefer the literal set whose weakest member is longest"""
+    if not candidate or min(len(lit) for lit in candidate) < MIN_LITERAL_LENGTH:
+        return current
+    if current is None:
+        return candidate
+    key = lambda lits: (min(len(lit) for lit in lits), -len(lits))
+    return candidate if key(candidate) > key(current) else current
+
+
+def required_literals(parsed) -> Optional[List[str]]:
+    """
+    Lowercased literals of which at least one occurs in every match.
+
+    Returns None when no such set exists (e.g. a branch with no literal),
+    in which case the rule has to be run on every line.
+    """
+    best = None
+    run = []
+    
+    for op, av in parsed:
+        if op is LITERAL and av < 128:
+            run.append(chr(av).lower())
+            continue
+        
+        if run:
+            best = _better(best, ["".join(run)])
+            run = []
+        
+        if op is SUBPATTERN:
+            best = _better(best, required_literals(av[-1]))
+        elif op is ATOMIC_GROUP:
+            best = _better(best, required_literals(av))
+        elif op in REPEAT_OPS and av[0] >= 1:
+            best = _better(best, required_literals(av[2]))
+        elif op is BRANCH:
+            alternatives = []
+            for branch in av[1]:
+                branch_literals = required_literals(branch)
+                if branch_literals is None:
+                    alternatives = None
+                    break
+                alternatives.extend(branch_literals)
+            best = _better(best, alternatives)
+    
+    if run:
+        best = _better(best, ["".join(run)])
+    
+    return sorted(set(best)) if best else None
+
+
+def pattern_literals(pattern: str) -> Optional[List[str]]:
+    """required_literals() for a pattern string"""
+    try:
+        return required_literals(sre_parse.parse(pattern, re.IGNORECASE))
+    except (re.error, RecursionError):
+        return None
+
+
+class AhoCorasick:
+    """Classic goto/fail automaton reporting every (overlapping) literal hit"""
+    
+    def __init__(self, literals: Iterable[str]):
+        self.literals = list(literals)
+        self.goto = [{}]
+        self.fail = [0]
+        self.output = [set()]
+        
+        for lit_id, literal in enumerate(self.literals):
+            state = 0
+            for char in literal:
+                if char not in self.goto[state]:
+                    self.goto.append({})
+                    self.fail.append(0)
+                    self.output.append(set())
+                    self.goto[state][char] = len(self.goto) - 1
+                state = self.goto[state][char]
+            self.output[state].add(lit_id)
+        
+        # Breadth-first fail links; outputs inherit along them
+        queue = deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, nxt in self.goto[state].items():
+                queue.append(nxt)
+                fallback = self.fail[state]
+                while fallback and char not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                self.fail[nxt] = self.goto[fallback].get(char, 0)
+                self.output[nxt] |= self.output[self.fail[nxt]]
+    
+    def search(self, text: str) -> Set[int]:
+        """Ids of every literal occurring in text"""
+        goto, fail, output = self.goto, self.fail, self.output
+        found = set()
+        state = 0
+        for char in text:
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if output[state]:
+                found |= output[state]
+        return found
+
+
+def literal_gate(literals: Iterable[str]):
+    """
+    One consuming trie regex that matches wherever any literal occurs.
+
+    A literal that is a prefix of another already satisfies the gate, so
+    longer ones below it are dropped.
+    """
+    trie = {}
+    for literal in literals:
+        node = trie
+        for char in literal:
+            node = node.setdefault(char, {})
+        node[""] = {}
+    
+    def emit(node: Dict) -> str:
+        if "" in node:
+            return ""
+        alternatives = [re.escape(char) + emit(child) for char, child in node.items()]
+        if len(alternatives) == 1:
+            return alternatives[0]
+        return "(?:" + "|".join(alternatives) + ")"
+    
+    return re.compile(emit(trie)) if trie else None
+
+
+class LiteralIndex:
+    """
+    Maps lowercased literals to the rules that require them.
+
+    candidates() runs a C-level trie regex first; only lines containing
+    at least one literal pay for the pure-Python Aho-Corasick walk that
+    works out exactly which rules are in play.
+    """
+    
+    def __init__(self, rule_literals: Dict[int, List[str]]):
+        self.literal_rules = {}
+        for rule_index, literals in rule_literals.items():
+            for literal in literals:
+                self.literal_rules.setdefault(literal, set()).add(rule_index)
+        
+        literals = list(self.literal_rules)
+        self.gate = literal_gate(literals)
+        self.automaton = AhoCorasick(literals)
+    
+    def __len__(self):
+        return len(self.literal_rules)
+    
+    def candidates(self, lowered: str) -> Set[int]:
+        """Rule indices whose required literal occurs in the lowercased text"""
+        if self.gate is None or self.gate.search(lowered) is None:
+            return set()
+        
+        rules = set()
+        for lit_id in self.automaton.search(lowered):
+            rules |= self.literal_rules[self.automaton.literals[lit_id]]
+        return rules
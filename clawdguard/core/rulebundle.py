@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+ClawdGuard - Compiled Rule Bundle
+Versioned, checksummed snapshot of vulns.json with its rule analysis done
+"""
+
+import hashlib
+import marshal
+import struct
+import sys
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+# Add parent to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from core.persist import atomic_write_bytes
+
+BUNDLE_VERSION = 1
+MAGIC = b"CGRB"
+
+# magic, bundle format version, marshal format version, sha256 of the payload
+HEADER = struct.Struct("!4sHH32s")
+
+
+def bundle_path_for(vuln_db_path: str) -> Path:
+    """database/vulns.json -> database/vulns.bundle"""
+    return Path(vuln_db_path).with_suffix(".bundle")
+
+
+def source_digest(raw: bytes) -> str:
+    return hashlib.sha256(raw).hexdigest()
+
+
+def write_bundle(path: Path, data: Dict):
+    """
+    Serialise data (plain dicts/lists/strings/numbers only) with marshal,
+    which loads several times faster than JSON, behind a checksummed header
+    """
+    payload = marshal.dumps(data)
+    header = HEADER.pack(MAGIC, BUNDLE_VERSION, marshal.version, hashlib.sha256(payload).digest())
+    atomic_write_bytes(path, header + payload)
+
+
+def read_bundle(path: Path) -> Tuple[Optional[Dict], str]:
+    """(data, "") for an intact bundle, else (None, why it can't be used)"""
+    try:
+        with open(path, 'rb') as f:
+            blob = f.read()
+    except FileNotFoundError:
+        return None, "missing"
+    
+    if len(blob) < HEADER.size:
+        return None, "truncated"
+    magic, version, marshal_version, checksum = HEADER.unpack_from(blob)
+    if magic != MAGIC:
+        return None, "not a rule bundle"
+    if version != BUNDLE_VERSION or marshal_version != marshal.version:
+        return None, f"built by an incompatible version (format {version}, marshal {marshal_version})"
+    
+    payload = blob[HEADER.size:]
+    if hashlib.sha256(payload).digest() != checksum:
+        return None, "checksum mismatch"
+    try:
+        data = marshal.loads(payload)
+    except (EOFError, ValueError, TypeError):
+        return None, "unreadable"
+    if not isinstance(data, dict):
+        return None, "unreadable"
+    return data, ""
+
+
+def load_bundle(vuln_db_path: str, raw: bytes, path: Path = None) -> Tuple[Optional[Dict], str]:
+    """
+    The bundle for vuln_db_path if it is intact and was compiled from
+    exactly raw (the current contents of vulns.json); otherwise
+    (None, reason) and the caller falls back to the JSON.
+    """
+    data, reason = read_bundle(path or bundle_path_for(vuln_db_path))
+    if data is None:
+        return None, reason
+    if data.get("source_sha256") != source_digest(raw):
+        return None, "stale (vulns.json changed since it was compiled)"
+    return data, ""
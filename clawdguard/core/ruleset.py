@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+"""
+ClawdGuard - Compiled Rule Set
+Merges many regex rules into a single pass over each scanned line
+"""
+
+import re
+from dataclasses import dataclass
+from typing import List, Tuple, Dict, Optional
+
+try:
+    from re import _parser as sre_parse
+except ImportError:  # Python < 3.11
+    import sre_parse
+
+from core.prefilter import LiteralIndex, pattern_literals
+
+LITERAL = sre_parse.LITERAL
+GROUPREF_OPS = {sre_parse.GROUPREF, sre_parse.GROUPREF_EXISTS}
+
+@dataclass
+class Rule:
+    vuln_id: str
+    name: str
+    description: str
+    severity: str
+    pattern: str
+    source: str
+    compiled: re.Pattern = None
+    
+    def __post_init__(self):
+        if self.compiled is None:
+            self.compiled = re.compile(self.pattern, re.IGNORECASE)
+
+
+def parse_pattern(pattern: str):
+    """Parse a regex into sre's op list, or None if it can't be parsed"""
+    try:
+        return sre_parse.parse(pattern, re.IGNORECASE)
+    except (re.error, RecursionError):
+        return None
+
+
+def leading_literal(parsed) -> str:
+    """Lowercased ASCII literal every match of the pattern starts with"""
+    chars = []
+    for op, av in parsed:
+        if op is not LITERAL or av > 127:
+            break
+        chars.append(chr(av).lower())
+    return "".join(chars)
+
+
+def walk_ops(parsed):
+    """Yield every opcode in a parsed pattern, including nested groups"""
+    for op, av in parsed:
+        yield op
+        yield from _walk_args(av)
+
+
+def _walk_args(av):
+    if isinstance(av, sre_parse.SubPattern):
+        yield from walk_ops(av)
+    elif isinstance(av, (list, tuple)):
+        for item in av:
+            yield from _walk_args(item)
+
+
+def uses_backrefs(parsed) -> bool:
+    """True if the pattern refers back to its own groups by number"""
+    return any(op in GROUPREF_OPS for op in walk_ops(parsed))
+
+
+class RuleSet:
+    """
+    All rules merged into one regex, scanned in a single pass.
+
+    Rules are grouped in a radix trie keyed on their leading literal, and
+    each trie edge becomes a lookahead, e.g. (?=c)(?:(?=curl)...|(?=cat)...).
+    sre can then skip positions whose first character starts no rule, and
+    at a candidate position only the rules sharing that prefix are tried.
+    Rules with no leading literal are appended as plain alternatives.
+
+    The combined regex is a gate: a line matching no rule is rejected with
+    one search. Lines that do hit are confirmed against each rule on its
+    own, so every matching rule is reported exactly as the old per-pattern
+    loop did (an alternation only reports one branch per position).
+    
+    In front of that sits a literal prefilter: rules with a required
+    literal are only confirmed on lines containing it, so the >99% of
+    benign lines that contain none never reach a rule regex at all.
+    """
+    
+    def __init__(self, rules: List[Rule] = None, analysis: Dict = None):
+        self.rules = list(rules or [])
+        everything = list(range(len(self.rules)))
+        
+        # Rules with a required literal are dispatched by the literal
+        # index; the rest go through their own merged gate
+        if analysis is None:
+            self.rule_literals = {i: pattern_literals(rule.pattern) for i, rule in enumerate(self.rules)}
+        else:
+            self.rule_literals = analysis["literals"]
+        self.index = LiteralIndex({i: lits for i, lits in self.rule_literals.items() if lits})
+        self.unfiltered = [i for i in everything if not self.rule_literals[i]]
+        
+        if analysis is None:
+            self.combined, self.standalone = self.compile_combined(everything)
+            self.unfiltered_combined, self.unfiltered_standalone = self.compile_combined(self.unfiltered)
+        else:
+            # Gates merged by an earlier run (see core/rulebundle.py); only
+            # the final re.compile is left to do
+            self.combined, self.standalone = self.compile_gate(*analysis["combined"])
+            self.unfiltered_combined, self.unfiltered_standalone = self.compile_gate(*analysis["unfiltered"])
+    
+    def analysis(self) -> Dict:
+        """The parse-derived state __init__ can be rebuilt from, as plain data"""
+        return {
+            "literals": self.rule_literals,
+            "combined": (self.combined.pattern if self.combined else None, self.standalone),
+            "unfiltered": (self.unfiltered_combined.pattern if self.unfiltered_combined else None,
+                           self.unfiltered_standalone),
+        }
+    
+    @staticmethod
+    def compile_gate(pattern: Optional[str], standalone: List[int]) -> Tuple[Optional[re.Pattern], List[int]]:
+        return (re.compile(pattern, re.IGNORECASE) if pattern else None), list(standalone)
+    
+    def compile_combined(self, indices: List[int]) -> Tuple[Optional[re.Pattern], List[int]]:
+        """Merge the given rules into one gate regex; returns (gate, unmergeable)"""
+        trie = {}
+        floating = []
+        standalone = []  # Rules that can't be merged, always run
+        
+        for i in indices:
+            rule = self.rules[i]
+            parsed = parse_pattern(rule.pattern)
+            # Named groups could clash and numbered backrefs would shift
+            # once merged, so those rules are scanned on their own
+            if parsed is None or rule.compiled.groupindex or uses_backrefs(parsed):
+                standalone.append(i)
+                continue
+            
+            branch = f"(?P<_r{i}>{rule.pattern})"
+            prefix = leading_literal(parsed)
+            if not prefix:
+                floating.append(branch)
+                continue
+            
+            node = trie
+            for char in prefix:
+                node = node.setdefault(char, {})
+            node.setdefault("", []).append(branch)
+        
+        branches = self._emit(trie) + floating
+        if not branches:
+            return None, standalone
+        
+        try:
+            return re.compile("|".join(branches), re.IGNORECASE), standalone
+        except re.error:
+            # Inline global flags and the like don't survive being merged
+            return None, list(indices)
+    
+    def _emit(self, node: Dict, prefix: str = "") -> List[str]:
+        """Turn a char trie into lookahead-guarded alternatives"""
+        out = list(node.get("", []))
+        for char, child in node.items():
+            if char == "":
+                continue
+            
+            # Collapse single-child chains into one lookahead (radix edge)
+            edge = prefix + char
+            while len(child) == 1 and "" not in child:
+                (next_char, child), = child.items()
+                edge += next_char
+            
+            # Lookaheads don't consume, so each one re-tests the whole prefix
+            inner = self._emit(child, edge)
+            body = inner[0] if len(inner) == 1 else "(?:" + "|".join(inner) + ")"
+            out.append(f"(?={re.escape(edge)}){body}")
+        return out
+    
+    def __len__(self):
+        return len(self.rules)
+    
+    @staticmethod
+    def _gated(combined, indices: List[int], standalone: List[int], text: str) -> List[int]:
+        if combined is None or combined.search(text) is None:
+            return standalone
+        return indices
+    
+    def candidates(self, text: str) -> List[int]:
+        """Indices of the rules that can possibly match text, in rule order"""
+        if not text.isascii():
+            # Unicode case folding can make a non-ASCII char match an ASCII
+            # literal (e.g. the long s), so only the merged regex is safe
+            return self._gated(self.combined, range(len(self.rules)), self.standalone, text)
+        
+        found = self.index.candidates(text.lower())
+        if self.unfiltered:
+            found.update(self._gated(self.unfiltered_combined, self.unfiltered, self.unfiltered_standalone, text))
+        return sorted(found)
+    
+    def scan(self, text: str) -> List[Tuple[Rule, re.Match]]:
+        """Return (rule, match) for every rule matching text, in rule order"""
+        hits = []
+        for i in self.candidates(text):
+            rule = self.rules[i]
+            match = rule.compiled.search(text)
+            if match:
+                hits.append((rule, match))
+        return hits
@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+"""
+ClawdGuard - Event Store
+Indexed SQLite copy of threats and alerts for reports and range queries
+"""
+
+import json
+import sqlite3
+import threading
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, List, Optional
+
+LOG_DIR = Path(__file__).parent.parent / "logs"
+
+TABLES = {
+    "threats": ["timestamp", "level", "vuln_id", "name", "matched", "context", "repeats", "learning_mode", "action"],
+    "alerts": ["timestamp", "level", "title", "description", "details"],
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS threats (
+    id INTEGER PRIMARY KEY,
+    timestamp TEXT NOT NULL,
+    level TEXT,
+    vuln_id TEXT,
+    name TEXT,
+    matched TEXT,
+    context TEXT,
+    repeats INTEGER DEFAULT 0,
+    learning_mode INTEGER,
+    action TEXT,
+    UNIQUE (timestamp, vuln_id, matched)
+);
+CREATE INDEX IF NOT EXISTS threats_timestamp ON threats (timestamp);
+CREATE INDEX IF NOT EXISTS threats_level ON threats (level, timestamp);
+CREATE INDEX IF NOT EXISTS threats_vuln_id ON threats (vuln_id, timestamp);
+
+CREATE TABLE IF NOT EXISTS alerts (
+    id INTEGER PRIMARY KEY,
+    timestamp TEXT NOT NULL,
+    level TEXT,
+    title TEXT,
+    description TEXT,
+    details TEXT,
+    UNIQUE (timestamp, title)
+);
+CREATE INDEX IF NOT EXISTS alerts_timestamp ON alerts (timestamp);
+CREATE INDEX IF NOT EXISTS alerts_level ON alerts (level, timestamp);
+"""
+
+
+def iso_days_ago(days: float) -> str:
+    """UTC timestamp in the same format the JSONL logs use"""
+    return (datetime.utcnow() - timedelta(days=days)).isoformat() + "Z"
+
+
+class EventStore:
+    """
+    threats.jsonl and alerts.jsonl stay the append-only record (and
+    pending_alerts.jsonl stays Clawdbot's queue); every row written there
+    is also inserted here, in WAL mode so the daemon and CLI commands can
+    read and write at the same time. Rows are unique on their timestamp
+    and identity, so importing a JSONL file twice is harmless.
+    """
+    
+    def __init__(self, path: Path = None):
+        self.path = Path(path or LOG_DIR / "clawdguard.db")
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.created = not self.path.exists()
+        
+        # The async daemon writes alerts from a worker thread
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(str(self.path), timeout=5.0, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+    
+    @classmethod
+    def from_config(cls, config: Dict, log_dir: Path = None) -> Optional["EventStore"]:
+        """
+        Build from the optional "store" section of clawdguard.json. A new
+        database starts with what the JSONL logs already hold, so reports
+        on an existing install don't go blank until `store import`.
+        """
+        options = config.get("store", {})
+        if not options.get("enabled", True):
+            return None
+        try:
+            store = cls(options.get("path"))
+        except sqlite3.Error as e:
+            print(f"Event store unavailable: {e}")
+            return None
+        if store.created:
+            store.import_logs(log_dir or LOG_DIR)
+        return store
+    
+    def insert(self, table: str, records: List[Dict]) -> int:
+        """Insert JSONL-shaped records, skipping ones already stored"""
+        columns = TABLES[table]
+        sql = f"INSERT OR IGNORE INTO {table} ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})"
+        rows = [[record.get(column) for column in columns] for record in records if record.get("timestamp")]
+        with self.lock:
+            try:
+                with self.conn:
+                    before = self.conn.total_changes
+                    self.conn.executemany(sql, rows)
+                    return self.conn.total_changes - before
+            except sqlite3.Error as e:
+                print(f"Event store write failed: {e}")
+                return 0
+    
+    def add_threat(self, record: Dict):
+        self.insert("threats", [record])
+    
+    def add_alert(self, record: Dict):
+        self.insert("alerts", [record])
+    
+    def query(self, table: str, since: str = None, until: str = None, level: str = None,
+              vuln_id: str = None, limit: int = None) -> List[Dict]:
+        """Rows in [since, until), newest first"""
+        clauses, params = [], []
+        if since:
+            clauses.append("timestamp >= ?")
+            params.append(since)
+        if until:
+            clauses.append("timestamp < ?")
+            params.append(until)
+        if level:
+            clauses.append("level = ?")
+            params.append(level)
+        if vuln_id:
+            clauses.append("vuln_id = ?")
+            params.append(vuln_id)
+        
+        sql = f"SELECT * FROM {table}"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += " ORDER BY timestamp DESC"
+        if limit:
+            sql += f" LIMIT {int(limit)}"
+        
+        with self.lock:
+            return [dict(row) for row in self.conn.execute(sql, params)]
+    
+    def recent(self, table: str, limit: int = 10) -> List[Dict]:
+        """Newest rows, returned oldest first like the tail of the JSONL"""
+        return list(reversed(self.query(table, limit=limit)))
+    
+    def counts_by_level(self, table: str, since: str = None) -> Dict[str, int]:
+        sql = f"SELECT level, COUNT(*) FROM {table}"
+        params = []
+        if since:
+            sql += " WHERE timestamp >= ?"
+            params.append(since)
+        sql += " GROUP BY level"
+        with self.lock:
+            return {level: count for level, count in self.conn.execute(sql, params)}
+    
+    def prune(self, days: float) -> Dict[str, int]:
+        """Delete rows older than days; the JSONL files are left alone"""
+        cutoff = iso_days_ago(days)
+        removed = {}
+        with self.lock:
+            with self.conn:
+                for table in TABLES:
+                    removed[table] = self.conn.execute(
+                        f"DELETE FROM {table} WHERE timestamp < ?", (cutoff,)).rowcount
+        return removed
+    
+    def import_jsonl(self, path: Path, table: str, batch_size: int = 1000) -> int:
+        """One-shot import of an existing JSONL log; returns rows added"""
+        added = 0
+        batch = []
+        with open(path, 'r', errors='replace') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                if isinstance(record, dict):
+                    batch.append(record)
+                if len(batch) >= batch_size:
+                    added += self.insert(table, batch)
+                    batch = []
+        if batch:
+            added += self.insert(table, batch)
+        return added
+    
+    def import_logs(self, log_dir: Path = None) -> Dict[str, int]:
+        """Import threats.jsonl and alerts.jsonl from log_dir; rows added per table"""
+        added = {}
+        for table in TABLES:
+            path = Path(log_dir or LOG_DIR) / f"{table}.jsonl"
+            if path.exists():
+                added[table] = self.import_jsonl(path, table)
+        return added
+    
+    def close(self):
+        with self.lock:
+            self.conn.close()
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+ClawdGuard - JSONL Tail Reader
+Reads the last N records of a log by seeking backwards from EOF
+"""
+
+import json
+from pathlib import Path
+from typing import Dict, List
+
+BLOCK_SIZE = 64 * 1024
+
+
+def tail_lines(path: Path, n: int, block_size: int = BLOCK_SIZE) -> List[bytes]:
+    """
+    The last n non-empty lines of path, oldest first. Reads whole blocks
+    backwards from the end until n complete lines are in hand, so the
+    cost depends on n and line length, not on the size of the file.
+    """
+    if n <= 0:
+        return []
+    
+    with open(path, 'rb') as f:
+        pos = f.seek(0, 2)
+        blocks = []
+        newlines = 0
+        while pos > 0:
+            step = min(block_size, pos)
+            pos -= step
+            f.seek(pos)
+            block = f.read(step)
+            blocks.append(block)
+            newlines += block.count(b"\n")
+            
+            # n lines need n+1 newlines before the first one can be complete;
+            # only then is it worth checking how many are non-empty
+            if newlines > n and len(complete_lines(blocks, pos)) >= n:
+                break
+    
+    return complete_lines(blocks, pos)[-n:]
+
+
+def complete_lines(blocks: List[bytes], pos: int) -> List[bytes]:
+    """Non-empty lines in the blocks read so far (newest block last in the list)"""
+    lines = b"".join(reversed(blocks)).split(b"\n")
+    if pos > 0:
+        # Started mid-line
+        lines = lines[1:]
+    return [line for line in lines if line.strip()]
+
+
+def tail_jsonl(path: Path, n: int, block_size: int = BLOCK_SIZE) -> List[Dict]:
+    """The last n records of a JSONL file, oldest first; bad lines are skipped"""
+    try:
+        lines = tail_lines(path, n, block_size)
+    except FileNotFoundError:
+        return []
+    
+    records = []
+    for line in lines:
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError:
+            # e.g. a line still being appended
+            continue
+        if isinstance(record, dict):
+            records.append(record)
+    return records
@@ -10,9 +10,18 @@ import time
 from datetime import datetime, timedelta
 from pathlib import Path
 from typing import Dict, List, Optional
-from collections import defaultdict
 from dataclasses import dataclass, asdict
 import hashlib
+import sys
+
+# Add parent to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from core.config import ConfigService
+from monitors.sink import EventSink
+from monitors.baseline_store import BaselineStore
+from monitors.rates import RateWindow, RateProfile, WINDOWS
+from monitors.pathtrie import PathTrie
 
 @dataclass
 class ActivityEvent:
@@ -27,27 +36,64 @@ class ActivityEvent:
             self.hash = hashlib.md5(content.encode()).hexdigest()[:12]
 
 class ActivityMonitor:
-    def __init__(self, data_dir: str = None):
+    def __init__(self, data_dir: str = None, config_service: ConfigService = None, read_only: bool = False):
         self.data_dir = Path(data_dir or Path(__file__).parent.parent / "logs")
+        self.config_service = config_service or ConfigService.shared()
+        config = self.config
         self.data_dir.mkdir(parents=True, exist_ok=True)
         
         self.baseline_path = self.data_dir / "baseline.json"
         self.activity_log_path = self.data_dir / "activity.jsonl"
         self.stats_path = self.data_dir / "stats.json"
         
-        self.baseline = self.load_baseline()
+        # Events are batched rather than opening the log once per line
+        self.event_sink = EventSink.from_config(self.activity_log_path, config)
+        
+        # Changes since the last save; nothing is written while this is empty
+        self.baseline_store = BaselineStore.from_config(self.baseline_path, config, read_only=read_only)
+        self.pending_delta = self.new_delta()
+        self.baseline_dirty = False
+        
+        self.set_baseline(self.load_baseline())
         self.current_stats = self.load_stats()
     
+    @property
+    def config(self) -> Dict:
+        return self.config_service.get()
+    
+    @property
+    def path_options(self) -> Dict:
+        """
+        Memory cap for the directory trie, and opt-in generalisation
+        (generalise_children, min_depth) of well-populated directories
+        """
+        return self.config.get("path_baseline", {})
+    
     def load_baseline(self) -> Dict:
         """Load learned behavioral baseline"""
-        if self.baseline_path.exists():
-            with open(self.baseline_path, 'r') as f:
-                return json.load(f)
+        baseline = self.baseline_store.load_snapshot()
+        if baseline is None:
+            baseline = self.default_baseline()
+        
+        # Re-apply anything journaled after the snapshot was taken
+        for delta in self.baseline_store.replay():
+            self.apply_delta(delta, baseline)
+        
+        return baseline
+    
+    def set_baseline(self, baseline: Dict):
+        self.baseline = baseline
+        
+        # Online per-hour rate statistics, kept inside the baseline
+        self.rate_profile = RateProfile(self.baseline.setdefault("rate_stats", {}))
+        self.path_trie = self.baseline_path_trie(self.baseline)
+    
+    def default_baseline(self) -> Dict:
         return {
             "created": datetime.utcnow().isoformat(),
             "learning_events": 0,
             "common_commands": {},
-            "common_paths": {},
+            "path_trie": PathTrie().data,
             "hourly_activity": {str(i): 0 for i in range(24)},
             "command_sequences": [],
             "normal_domains": set(),
@@ -57,6 +103,90 @@ class ActivityMonitor:
             }
         }
     
+    @staticmethod
+    def baseline_path_trie(baseline: Dict) -> PathTrie:
+        """The baseline's directory trie, migrating a legacy flat common_paths"""
+        trie = PathTrie(baseline.setdefault("path_trie", {}))
+        for dir_path, count in baseline.pop("common_paths", {}).items():
+            trie.insert(dir_path, count)
+        return trie
+    
+    @staticmethod
+    def new_delta() -> Dict:
+        return {"counts": {}, "paths": {}, "domains": [], "learning_events": 0, "set": {}}
+    
+    def apply_delta(self, delta: Dict, baseline: Dict = None):
+        """Merge a baseline delta (from the journal or a backfill worker)"""
+        baseline = self.baseline if baseline is None else baseline
+        
+        for section, counts in delta.get("counts", {}).items():
+            target = baseline.setdefault(section, {})
+            for key, count in counts.items():
+                target[key] = target.get(key, 0) + count
+        
+        if delta.get("paths"):
+            trie = self.baseline_path_trie(baseline)
+            for dir_path, count in delta["paths"].items():
+                trie.insert(dir_path, count)
+        
+        for domain in delta.get("domains", []):
+            self.add_domain(domain, baseline)
+        
+        # Non-additive values (running statistics) are replaced outright
+        self.deep_update(baseline, delta.get("set", {}))
+        
+        baseline["learning_events"] = baseline.get("learning_events", 0) + delta.get("learning_events", 0)
+    
+    def merge_delta(self, delta: Dict):
+        """Apply a delta produced elsewhere and queue it for the next save"""
+        self.apply_delta(delta)
+        
+        pending = self.pending_delta
+        for section, counts in delta.get("counts", {}).items():
+            target = pending["counts"].setdefault(section, {})
+            for key, count in counts.items():
+                target[key] = target.get(key, 0) + count
+        for dir_path, count in delta.get("paths", {}).items():
+            pending["paths"][dir_path] = pending["paths"].get(dir_path, 0) + count
+        pending["domains"].extend(delta.get("domains", []))
+        pending["learning_events"] += delta.get("learning_events", 0)
+        self.deep_update(pending["set"], delta.get("set", {}))
+        
+        self.baseline_dirty = True
+    
+    @classmethod
+    def deep_update(cls, target: Dict, updates: Dict):
+        for key, value in updates.items():
+            if isinstance(value, dict) and isinstance(target.get(key), dict):
+                cls.deep_update(target[key], value)
+            else:
+                target[key] = value
+    
+    def count(self, section: str, key: str, n: int = 1):
+        """Bump a baseline counter and remember it for the next save"""
+        target = self.baseline.setdefault(section, {})
+        target[key] = target.get(key, 0) + n
+        
+        pending = self.pending_delta["counts"].setdefault(section, {})
+        pending[key] = pending.get(key, 0) + n
+        self.baseline_dirty = True
+    
+    @staticmethod
+    def add_domain(domain: str, baseline: Dict) -> bool:
+        """Add a domain to normal_domains; True if it was new"""
+        if isinstance(baseline.get('normal_domains'), set):
+            if domain in baseline["normal_domains"]:
+                return False
+            baseline["normal_domains"].add(domain)
+            return True
+        
+        if 'normal_domains' not in baseline:
+            baseline['normal_domains'] = []
+        if domain in baseline['normal_domains']:
+            return False
+        baseline['normal_domains'].append(domain)
+        return True
+    
     def load_stats(self) -> Dict:
         """Load current session stats"""
         return {
@@ -65,63 +195,104 @@ class ActivityMonitor:
             "file_read_count": 0,
             "file_write_count": 0,
             "network_count": 0,
-            "minute_buckets": defaultdict(lambda: {"exec": 0, "file": 0, "network": 0})
+            # Sliding 1m/5m/1h windows, constant memory however long we run
+            "rates": {kind: RateWindow() for kind in ("exec", "file", "network")}
         }
     
     def save_baseline(self):
-        """Save baseline to disk"""
-        # Convert sets to lists for JSON
-        baseline_copy = self.baseline.copy()
-        if isinstance(baseline_copy.get('normal_domains'), set):
-            baseline_copy['normal_domains'] = list(baseline_copy['normal_domains'])
+        """Save baseline to disk, if it changed since the last save"""
+        if not self.baseline_dirty or self.baseline_store.read_only:
+            return
         
-        with open(self.baseline_path, 'w') as f:
-            json.dump(baseline_copy, f, indent=2)
+        with self.baseline_store.locked():
+            if self.baseline_store.changed_on_disk():
+                # Another process saved since we loaded: build on what it
+                # wrote instead of overwriting it, then redo our changes
+                self.set_baseline(self.load_baseline())
+                self.apply_delta(self.pending_delta)
+            
+            # Cap the directory trie; pruning isn't a replayable delta, so
+            # it forces a full snapshot
+            pruned = self.path_trie.prune(self.path_options.get("max_nodes", 5000))
+            
+            # Convert sets to lists for JSON
+            baseline_copy = self.baseline.copy()
+            if isinstance(baseline_copy.get('normal_domains'), set):
+                baseline_copy['normal_domains'] = list(baseline_copy['normal_domains'])
+            
+            self.baseline_store.save(baseline_copy, self.pending_delta, snapshot=bool(pruned))
+        self.pending_delta = self.new_delta()
+        self.baseline_dirty = False
     
     def log_event(self, event: ActivityEvent):
         """Log an activity event"""
-        with open(self.activity_log_path, 'a') as f:
-            f.write(json.dumps(asdict(event)) + "\n")
+        self.event_sink.write(asdict(event))
         
         # Update stats
-        minute_key = datetime.utcnow().strftime("%Y-%m-%d-%H-%M")
+        rates = self.current_stats["rates"]
         
         if event.event_type == "exec":
             self.current_stats["exec_count"] += 1
-            self.current_stats["minute_buckets"][minute_key]["exec"] += 1
+            rates["exec"].add()
             
             # Learn command patterns
             cmd = event.details.get("command", "")
             cmd_base = cmd.split()[0] if cmd else ""
-            self.baseline["common_commands"][cmd_base] = self.baseline["common_commands"].get(cmd_base, 0) + 1
-            
+            self.count("common_commands", cmd_base)
+        
         elif event.event_type in ["file_read", "file_write"]:
             self.current_stats["file_read_count" if event.event_type == "file_read" else "file_write_count"] += 1
-            self.current_stats["minute_buckets"][minute_key]["file"] += 1
+            rates["file"].add()
             
             # Learn path patterns
             path = event.details.get("path", "")
             dir_path = str(Path(path).parent)
-            self.baseline["common_paths"][dir_path] = self.baseline["common_paths"].get(dir_path, 0) + 1
-            
+            self.path_trie.insert(dir_path)
+            pending = self.pending_delta["paths"]
+            pending[dir_path] = pending.get(dir_path, 0) + 1
+            self.baseline_dirty = True
+        
         elif event.event_type == "network":
             self.current_stats["network_count"] += 1
-            self.current_stats["minute_buckets"][minute_key]["network"] += 1
+            rates["network"].add()
             
             # Learn domains
             domain = event.details.get("domain", "")
-            if domain and isinstance(self.baseline.get('normal_domains'), set):
-                self.baseline["normal_domains"].add(domain)
-            elif domain:
-                if 'normal_domains' not in self.baseline:
-                    self.baseline['normal_domains'] = []
-                if domain not in self.baseline['normal_domains']:
-                    self.baseline['normal_domains'].append(domain)
+            if domain and self.add_domain(domain, self.baseline):
+                self.pending_delta["domains"].append(domain)
+        
+        # Fold finished minutes into the per-hour rate statistics
+        kind = "file" if event.event_type in ["file_read", "file_write"] else event.event_type
+        if kind in rates:
+            changed = self.rate_profile.record(kind)
+            if changed:
+                self.note_rate_stats(changed)
         
         # Update hourly activity
         hour = str(datetime.utcnow().hour)
-        self.baseline["hourly_activity"][hour] = self.baseline["hourly_activity"].get(hour, 0) + 1
+        self.count("hourly_activity", hour)
         self.baseline["learning_events"] = self.baseline.get("learning_events", 0) + 1
+        self.pending_delta["learning_events"] += 1
+    
+    def note_rate_stats(self, changed: Dict):
+        """Mirror updated rate stats into thresholds and the pending delta"""
+        thresholds = self.baseline.setdefault("thresholds", {})
+        names = {"exec": "exec_per_minute", "file": "file_ops_per_minute", "network": "network_per_minute"}
+        pending = self.pending_delta["set"]
+        
+        for kind, hours in changed.items():
+            pending.setdefault("rate_stats", {}).setdefault(kind, {}).update(hours)
+            if "all" in hours:
+                overall = self.rate_profile.get(kind, "all")
+                threshold = thresholds.setdefault(names[kind], {"max": None})
+                threshold.update({"mean": round(overall.mean, 3), "std": round(overall.std, 3)})
+                pending.setdefault("thresholds", {})[names[kind]] = dict(threshold)
+        
+        self.baseline_dirty = True
+    
+    def flush_events(self):
+        """Write out any buffered activity events"""
+        self.event_sink.flush()
     
     def record_exec(self, command: str, exit_code: int = 0, duration_ms: int = 0):
         """Record a command execution"""
@@ -165,24 +336,37 @@ class ActivityMonitor:
         return event
     
     def check_rate_limits(self, config: Dict) -> List[str]:
-        """Check if current activity exceeds rate limits"""
+        """Check if activity over the sliding windows exceeds rate limits"""
         warnings = []
-        minute_key = datetime.utcnow().strftime("%Y-%m-%d-%H-%M")
-        current = self.current_stats["minute_buckets"].get(minute_key, {"exec": 0, "file": 0, "network": 0})
-        
         limits = config.get("rate_limits", {})
         
-        if current["exec"] > limits.get("exec_per_minute", 30):
-            warnings.append(f"Exec rate limit exceeded: {current['exec']}/min")
+        # (counter, config key prefix, label, default per-minute limit);
+        # 5-minute and hourly limits apply only when configured, e.g.
+        # "exec_per_5_minutes" or "network_requests_per_hour"
+        checks = [
+            ("exec", "exec", "Exec", 30),
+            ("file", "file_writes", "File ops", 20),
+            ("network", "network_requests", "Network", 50)
+        ]
         
-        if current["file"] > limits.get("file_writes_per_minute", 20):
-            warnings.append(f"File ops rate limit exceeded: {current['file']}/min")
-        
-        if current["network"] > limits.get("network_requests_per_minute", 50):
-            warnings.append(f"Network rate limit exceeded: {current['network']}/min")
+        for kind, prefix, label, default in checks:
+            totals = self.current_stats["rates"][kind].totals()
+            for window, (suffix, unit) in WINDOWS.items():
+                limit = limits.get(f"{prefix}_per_{suffix}", default if window == 60 else None)
+                if limit is not None and totals[window] > limit:
+                    warnings.append(f"{label} rate limit exceeded: {totals[window]}/{unit}")
         
         return warnings
     
+    def check_rate_anomalies(self, config: Dict) -> List[str]:
+        """Flag rates far above what the baseline says is normal for this hour"""
+        options = config.get("anomaly_detection", {})
+        return self.rate_profile.anomalies(
+            z_threshold=options.get("z_threshold", 4.0),
+            min_samples=options.get("min_samples", 30),
+            method=options.get("method", "welford")
+        )
+    
     def is_anomalous(self, event: ActivityEvent) -> Optional[str]:
         """Check if an event is anomalous compared to baseline"""
         if self.baseline.get("learning_events", 0) < 100:
@@ -197,7 +381,13 @@ class ActivityMonitor:
         elif event.event_type in ["file_read", "file_write"]:
             path = event.details.get("path", "")
             dir_path = str(Path(path).parent)
-            if dir_path not in self.baseline.get("common_paths", {}):
+            known = self.path_trie.is_known(
+                dir_path,
+                generalise_children=self.path_options.get("generalise_children", 0),
+                min_depth=self.path_options.get("min_depth", 3),
+                trusted_prefixes=self.path_options.get("trusted_prefixes", [])
+            )
+            if not known:
                 return f"Unusual path: {dir_path}"
         
         elif event.event_type == "network":
@@ -223,11 +413,7 @@ class ActivityMonitor:
                 key=lambda x: x[1],
                 reverse=True
             )[:10],
-            "top_paths": sorted(
-                self.baseline.get("common_paths", {}).items(),
-                key=lambda x: x[1],
-                reverse=True
-            )[:10]
+            "top_paths": self.path_trie.top(10)
         }
 
 
@@ -0,0 +1,384 @@
+#!/usr/bin/env python3
+"""
+ClawdGuard - Async Log Watcher
+asyncio daemon: one tailer per log file, a pool of scan workers and an
+alert dispatcher, connected by bounded queues
+"""
+
+import asyncio
+import os
+import signal
+import sys
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+# Add parent to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from core.patterns import ThreatMatch
+from monitors.offsets import FINGERPRINT_BYTES
+from monitors.inotify import Inotify, inotify_available, IN_Q_OVERFLOW, IN_ISDIR
+from monitors.watcher import LogWatcher, LOG_DIR_MASK
+
+@dataclass
+class Batch:
+    path: Path
+    data: bytes
+    done: asyncio.Future
+
+
+def read_batch(f, pos: int, limit: int) -> bytes:
+    """
+    Up to about limit bytes of complete lines from pos. A line longer
+    than limit is returned whole; a trailing partial line is left.
+    """
+    f.seek(pos)
+    data = f.read(limit)
+    if data and not data.endswith(b"\n"):
+        data += f.readline()
+        if not data.endswith(b"\n"):
+            data = data[:data.rfind(b"\n") + 1]
+    return data
+
+
+class AsyncLogWatcher:
+    """
+    Runs a LogWatcher's detection on an asyncio loop.
+
+        tailer (per file) --scan queue--> scan workers --alert queue--> dispatcher
+
+    Tailers read new lines in batches of at most batch_bytes and wait for
+    each batch to be scanned before reading the next, so one huge file
+    never holds more than one worker and never starves the others. Scan
+    workers match in a thread and apply results (baseline, threat log,
+    dedup) back on the loop. Alerts are sent by a single dispatcher, so a
+    slow alert sink only blocks detection once alert_queue is full.
+    
+    Housekeeping saves state and verifies canaries in a thread too;
+    state_lock keeps the loop from changing the baseline and offsets
+    while they are being written. A batch whose scan fails
+    max_batch_failures times in a row is skipped rather than retried
+    forever.
+    """
+    
+    def __init__(self, watcher: LogWatcher, interval: float = 5.0, use_inotify: bool = True,
+                 scan_workers: int = 2, scan_queue: int = 64, alert_queue: int = 1000,
+                 batch_bytes: int = 256 * 1024, max_batch_failures: int = 3):
+        self.watcher = watcher
+        self.interval = interval
+        self.use_inotify = use_inotify and inotify_available()
+        self.scan_workers = scan_workers
+        self.scan_queue_size = scan_queue
+        self.alert_queue_size = alert_queue
+        self.batch_bytes = batch_bytes
+        self.max_batch_failures = max_batch_failures
+        
+        self.tailers: Dict[str, asyncio.Task] = {}
+        self.wakeups: Dict[str, asyncio.Event] = {}
+        self.threats: List[ThreatMatch] = []
+        self.failures: Dict[Tuple[str, int], int] = {}  # (path, offset) -> failed scans
+        self.skipped = 0
+    
+    @classmethod
+    def from_config(cls, watcher: LogWatcher, interval: float = 5.0, use_inotify: bool = True) -> "AsyncLogWatcher":
+        """Build from the optional "async" section of clawdguard.json"""
+        options = watcher.config.get("async", {})
+        return cls(
+            watcher,
+            interval=interval,
+            use_inotify=use_inotify,
+            scan_workers=options.get("scan_workers", 2),
+            scan_queue=options.get("scan_queue", 64),
+            alert_queue=options.get("alert_queue", 1000),
+            batch_bytes=options.get("batch_bytes", 256 * 1024),
+            max_batch_failures=options.get("max_batch_failures", 3)
+        )
+    
+    async def run(self):
+        """Run until SIGINT/SIGTERM, then drain alerts and save state"""
+        loop = asyncio.get_running_loop()
+        self.scan_queue = asyncio.Queue(self.scan_queue_size)
+        self.alert_queue = asyncio.Queue(self.alert_queue_size)
+        self.stop = asyncio.Event()
+        self.state_lock = asyncio.Lock()
+        
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(signum, self.stop.set)
+        
+        inotify = self.start_inotify(loop) if self.use_inotify else None
+        
+        workers = [asyncio.create_task(self.scan_worker()) for _ in range(self.scan_workers)]
+        dispatcher = asyncio.create_task(self.dispatch_alerts())
+        
+        canary = self.watcher.canary_monitor
+        if canary:
+            for alert in self.watcher.canary_alerts(canary.check()):
+                await self.alert_queue.put(alert)
+            if canary.start():
+                loop.add_reader(canary.fileno(), self.on_canary, canary)
+        self.canary = canary
+        
+        housekeeper = asyncio.create_task(self.housekeeping())
+        
+        try:
+            await self.stop.wait()
+        finally:
+            if inotify:
+                loop.remove_reader(inotify.fileno())
+                inotify.close()
+            if canary and canary.active:
+                loop.remove_reader(canary.fileno())
+                canary.close()
+            
+            tasks = [housekeeper, *self.tailers.values(), *workers]
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            
+            # Send what was already decided before going down
+            try:
+                await asyncio.wait_for(self.alert_queue.join(), timeout=self.interval)
+            except asyncio.TimeoutError:
+                print(f"Dropping {self.alert_queue.qsize()} unsent alert(s) on shutdown")
+            dispatcher.cancel()
+            await asyncio.gather(dispatcher, return_exceptions=True)
+            
+            await asyncio.to_thread(self.watcher.save_state)
+    
+    def start_inotify(self, loop) -> Optional[Inotify]:
+        """Wake tailers from inotify on the loop instead of a blocking read"""
+        try:
+            inotify = Inotify()
+        except OSError as e:
+            print(f"inotify unavailable ({e}), falling back to polling")
+            return None
+        try:
+            inotify.add_watch(str(self.watcher.log_dir), LOG_DIR_MASK)
+        except OSError as e:
+            print(f"Cannot watch {self.watcher.log_dir} ({e}), falling back to polling")
+            inotify.close()
+            return None
+        loop.add_reader(inotify.fileno(), self.on_inotify, inotify)
+        return inotify
+    
+    def on_inotify(self, inotify: Inotify):
+        events = inotify.read_events(timeout=0)
+        if any(e.mask & IN_Q_OVERFLOW for e in events):
+            # Events were dropped; wake everything
+            for wakeup in self.wakeups.values():
+                wakeup.set()
+            self.spawn_tailers()
+            return
+        
+        for event in events:
+            if not event.name or event.mask & IN_ISDIR or not self.watcher.is_log_file(event.name):
+                continue
+            path = self.watcher.log_dir / event.name
+            if str(path) in self.wakeups:
+                self.wakeups[str(path)].set()
+            else:
+                self.spawn_tailer(path)
+    
+    def on_canary(self, canary):
+        for alert in self.watcher.canary_alerts(canary.poll()):
+            try:
+                self.alert_queue.put_nowait(alert)
+            except asyncio.QueueFull:
+                # Never drop a tripwire; send it alongside the backlog
+                asyncio.get_running_loop().run_in_executor(None, self.watcher.alert_manager.send_alert, alert)
+    
+    def spawn_tailers(self):
+        if not self.watcher.log_dir.exists():
+            return
+        for path in self.watcher.log_files():
+            if str(path) not in self.tailers:
+                self.spawn_tailer(path)
+    
+    def spawn_tailer(self, path: Path):
+        self.wakeups[str(path)] = asyncio.Event()
+        self.tailers[str(path)] = asyncio.create_task(self.tail(path))
+    
+    async def tail(self, path: Path):
+        """Follow one log file, handing batches of new lines to the scanners"""
+        wakeup = self.wakeups[str(path)]
+        try:
+            while True:
+                try:
+                    await self.catch_up(path)
+                except FileNotFoundError:
+                    # Gone; housekeeping starts a new tailer if it comes back
+                    return
+                except Exception as e:
+                    print(f"Error watching {path}: {e}")
+                
+                try:
+                    await asyncio.wait_for(wakeup.wait(), timeout=self.interval)
+                except asyncio.TimeoutError:
+                    pass
+                wakeup.clear()
+        finally:
+            self.tailers.pop(str(path), None)
+            self.wakeups.pop(str(path), None)
+    
+    async def catch_up(self, path: Path):
+        """Scan everything appended to path since the stored offset"""
+        offsets = self.watcher.offsets
+        with open(path, 'rb') as f:
+            st = os.fstat(f.fileno())
+            head = f.read(FINGERPRINT_BYTES)
+            
+            # Finish the old file before starting on the new one
+            old_key = offsets.previous_key(path, st)
+            if old_key:
+                await self.drain_rotated(path, old_key)
+            
+            await self.feed(path, f, st, head)
+    
+    async def drain_rotated(self, path: Path, old_key: str):
+        """LogWatcher.drain_rotated, with the scanning done by the workers"""
+        rotated = await asyncio.to_thread(self.watcher.find_by_key, path.parent, old_key)
+        if rotated and rotated != path:
+            try:
+                f = await asyncio.to_thread(open, rotated, 'rb')
+            except OSError as e:
+                print(f"Error draining rotated log {rotated}: {e}")
+            else:
+                with f:
+                    st = os.fstat(f.fileno())
+                    head = await asyncio.to_thread(f.read, FINGERPRINT_BYTES)
+                    await self.feed(rotated, f, st, head)
+                return
+        async with self.state_lock:
+            self.watcher.offsets.forget(old_key)
+    
+    async def feed(self, path: Path, f, st: os.stat_result, head: bytes):
+        """Hand everything after the stored offset to the scan workers, a batch at a time"""
+        offsets = self.watcher.offsets
+        pos = offsets.resume(st, head)
+        async with self.state_lock:
+            offsets.update(path, st, head, pos)
+        while True:
+            data = await asyncio.to_thread(read_batch, f, pos, self.batch_bytes)
+            if not data:
+                return
+            
+            batch = Batch(path, data, asyncio.get_running_loop().create_future())
+            await self.scan_queue.put(batch)
+            try:
+                await batch.done
+            except Exception:
+                if not self.give_up(path, pos, len(data)):
+                    raise
+            
+            pos += len(data)
+            async with self.state_lock:
+                offsets.update(path, st, head, pos)
+    
+    def give_up(self, path: Path, pos: int, size: int) -> bool:
+        """Count a failed scan of the batch at pos; True once it should be skipped"""
+        key = (str(path), pos)
+        self.failures[key] = self.failures.get(key, 0) + 1
+        if self.failures[key] < self.max_batch_failures:
+            return False
+        del self.failures[key]
+        self.skipped += 1
+        print(f"Skipping {size} bytes of {path} at offset {pos} after {self.max_batch_failures} failed scans")
+        return True
+    
+    async def scan_worker(self):
+        while True:
+            batch = await self.scan_queue.get()
+            try:
+                results = await asyncio.to_thread(self.scan_batch, batch.data)
+                await self.apply(results)
+                batch.done.set_result(None)
+            except Exception as e:
+                print(f"Error scanning {batch.path}: {e}")
+                batch.done.set_exception(e)
+            finally:
+                self.scan_queue.task_done()
+    
+    def scan_batch(self, data: bytes):
+        """Worker thread: match every line, touching no shared state"""
+        results = []
+        for raw in data.split(b"\n"):
+            line = raw.strip()
+            if line:
+                results.append(self.watcher.scan_line(line))
+        return results
+    
+    async def apply(self, results):
+        """Loop thread: record activity and decide on threats, in line order"""
+        alerts = []
+        async with self.state_lock:
+            for command, hits in results:
+                if command:
+                    self.watcher.activity_monitor.record_exec(command)
+                for threat, context in hits:
+                    alert, should_block = self.watcher.assess_threat(threat, context)
+                    if alert:
+                        alerts.append(alert)
+                    if should_block:
+                        self.threats.append(threat)
+        for alert in alerts:
+            await self.alert_queue.put(alert)
+    
+    async def dispatch_alerts(self):
+        while True:
+            alert = await self.alert_queue.get()
+            try:
+                await asyncio.to_thread(self.watcher.alert_manager.send_alert, alert)
+            except Exception as e:
+                print(f"Error sending alert {alert.title}: {e}")
+            finally:
+                self.alert_queue.task_done()
+    
+    async def housekeeping(self):
+        """Every interval: pick up new files, check rates and canaries, report and save"""
+        while True:
+            self.spawn_tailers()
+            
+            alerts = self.watcher.rate_alerts()
+            if self.canary:
+                alerts += self.watcher.canary_alerts(await self.check_canaries())
+            for alert in alerts:
+                await self.alert_queue.put(alert)
+            await asyncio.to_thread(self.watcher.alert_manager.flush)
+            
+            self.watcher.report(self.threats)
+            self.threats = []
+            
+            async with self.state_lock:
+                await asyncio.to_thread(self.watcher.prune_offsets)
+                await asyncio.to_thread(self.watcher.save_state)
+            
+            await asyncio.sleep(self.interval)
+    
+    async def check_canaries(self) -> List[dict]:
+        """Stat and content checks in a thread, with on_canary paused meanwhile"""
+        loop = asyncio.get_running_loop()
+        active = self.canary.active
+        if active:
+            loop.remove_reader(self.canary.fileno())
+        try:
+            # check() polls inotify itself, so nothing queued meanwhile is lost
+            return await asyncio.to_thread(self.canary.check)
+        finally:
+            if active and self.canary.active:
+                loop.add_reader(self.canary.fileno(), self.on_canary, self.canary)
+
+
+def run_async_daemon(watcher: LogWatcher, interval: float = 5.0, use_inotify: bool = True):
+    """Blocking entry point for `watch --async`"""
+    daemon = AsyncLogWatcher.from_config(watcher, interval=interval, use_inotify=use_inotify)
+    
+    print("🛡️ ClawdGuard Watcher starting (async)...")
+    print(f"   Mode: {'LEARNING' if watcher.is_learning_mode() else 'ENFORCEMENT'}")
+    print(f"   Watching: {watcher.log_dir}")
+    print(f"   Trigger: {'inotify' if daemon.use_inotify else f'polling every {interval}s'}")
+    print(f"   Scan workers: {daemon.scan_workers}")
+    print()
+    
+    asyncio.run(daemon.run())
+    print("\n🛡️ ClawdGuard Watcher stopped")
@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""
+ClawdGuard - Parallel Backfill
+Scans a backlog of exec/session logs across a process pool
+"""
+
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+# Add parent to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from core.patterns import PatternMatcher, ThreatMatch
+from monitors.offsets import FINGERPRINT_BYTES
+from monitors.content import ContentScanner
+from monitors.lineparse import extract_command
+
+DEFAULT_CHUNK_BYTES = 16 * 1024 * 1024
+
+@dataclass
+class Chunk:
+    path: str
+    start: int
+    end: int
+    file_index: int
+
+@dataclass
+class ChunkResult:
+    chunk: Chunk
+    lines: int = 0
+    end: int = 0  # Just past the last complete line consumed
+    hits: List[Tuple[int, ThreatMatch, str]] = field(default_factory=list)  # (offset, threat, context)
+    delta: Dict = field(default_factory=lambda: {"counts": {"common_commands": {}}, "learning_events": 0})
+
+@dataclass
+class BackfillResult:
+    files: int = 0
+    chunks: int = 0
+    lines: int = 0
+    bytes: int = 0
+    seconds: float = 0.0
+    threats: List[ThreatMatch] = field(default_factory=list)
+    
+    @property
+    def lines_per_sec(self) -> float:
+        return self.lines / self.seconds if self.seconds else 0.0
+
+
+_matcher = None
+_content_scanner = None
+
+
+def _init_worker(config: Dict = None):
+    # One matcher per worker process, built once rather than per chunk
+    global _matcher, _content_scanner
+    _matcher = PatternMatcher.shared()
+    _content_scanner = ContentScanner.from_config(_matcher, config or {})
+
+
+def line_start_at_or_after(f, offset: int) -> int:
+    """First line boundary at or after offset"""
+    if offset == 0:
+        return 0
+    f.seek(offset - 1)
+    f.readline()
+    return f.tell()
+
+
+def plan_chunks(files: List[Tuple[Path, int, int]], chunk_bytes: int) -> List[Chunk]:
+    """
+    Split (path, start, end) ranges into chunks of about chunk_bytes whose
+    edges sit on line boundaries, so no line is split between workers.
+    """
+    chunks = []
+    for file_index, (path, start, end) in enumerate(files):
+        if end <= start:
+            continue
+        with open(path, 'rb') as f:
+            edges = [start]
+            for target in range(start + chunk_bytes, end, chunk_bytes):
+                edge = line_start_at_or_after(f, target)
+                if edges[-1] < edge < end:
+                    edges.append(edge)
+            edges.append(end)
+        for lo, hi in zip(edges, edges[1:]):
+            chunks.append(Chunk(str(path), lo, hi, file_index))
+    return chunks
+
+
+def scan_chunk(chunk: Chunk) -> ChunkResult:
+    """Worker: scan complete lines in [start, end) of one file"""
+    global _matcher
+    if _matcher is None:
+        _init_worker()
+    
+    result = ChunkResult(chunk=chunk, end=chunk.start)
+    commands = result.delta["counts"]["common_commands"]
+    
+    with open(chunk.path, 'rb') as f:
+        f.seek(chunk.start)
+        pos = chunk.start
+        while pos < chunk.end:
+            raw = f.readline()
+            if not raw.endswith(b"\n"):
+                break
+            offset, pos = pos, pos + len(raw)
+            result.end = pos
+            
+            line = raw.strip()
+            if not line:
+                continue
+            result.lines += 1
+            
+            command = extract_command(line)
+            if command:
+                for threat in _matcher.scan_command(command):
+                    result.hits.append((offset, threat, line.decode('utf-8', errors='replace')[:200]))
+                
+                # Command counts only: hourly activity and rate profiles
+                # are keyed on when an event is seen, which for a backlog
+                # says nothing about when it happened
+                cmd_base = command.split()[0] if command.split() else ""
+                commands[cmd_base] = commands.get(cmd_base, 0) + 1
+                result.delta["learning_events"] += 1
+            
+            for threat, context in _content_scanner.scan_line(line):
+                result.hits.append((offset, threat, context))
+    
+    return result
+
+
+def backfill(watcher, workers: int = None, chunk_bytes: int = DEFAULT_CHUNK_BYTES) -> BackfillResult:
+    """
+    Scan everything in watcher.log_dir that hasn't been read yet, using a
+    process pool. Results are merged in (file, offset) order, so alerts,
+    threat logs and baseline updates come out the same for any worker
+    count. The baseline learns command counts (common_commands and
+    learning_events) from the backlog, nothing else. Offsets are advanced
+    afterwards so the live watcher carries on from where the backfill
+    stopped.
+    """
+    workers = workers or os.cpu_count() or 1
+    started = time.perf_counter()
+    result = BackfillResult()
+    
+    # Resume from persisted offsets; stop at the size seen now
+    files, stats = [], []
+    for log_file in watcher.log_files():
+        try:
+            with open(log_file, 'rb') as f:
+                st = os.fstat(f.fileno())
+                head = f.read(FINGERPRINT_BYTES)
+        except OSError:
+            continue
+        files.append((log_file, watcher.offsets.resume(st, head), st.st_size))
+        stats.append((st, head))
+    
+    chunks = plan_chunks(files, chunk_bytes)
+    result.files = len(files)
+    result.chunks = len(chunks)
+    result.bytes = sum(end - start for _, start, end in files)
+    
+    if workers > 1 and len(chunks) > 1:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(watcher.config,)) as pool:
+            chunk_results = list(pool.map(scan_chunk, chunks))
+    else:
+        _init_worker(watcher.config)
+        chunk_results = [scan_chunk(chunk) for chunk in chunks]
+    
+    # Chunks come back in plan order, i.e. by file then offset
+    file_ends = {}
+    for chunk_result in chunk_results:
+        result.lines += chunk_result.lines
+        watcher.activity_monitor.merge_delta(chunk_result.delta)
+        for _, threat, line in chunk_result.hits:
+            if watcher.handle_threat(threat, line):
+                result.threats.append(threat)
+        file_ends[chunk_result.chunk.file_index] = chunk_result.end
+    
+    for file_index, end in file_ends.items():
+        st, head = stats[file_index]
+        watcher.offsets.update(files[file_index][0], st, head, end)
+    
+    watcher.save_state()
+    result.seconds = time.perf_counter() - started
+    return result
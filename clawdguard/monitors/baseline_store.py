@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+"""
+ClawdGuard - Baseline Persistence
+Atomic baseline snapshots plus an optional append-only delta journal
+"""
+
+import fcntl
+import json
+import os
+import sys
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterator, Optional, Tuple
+
+# Add parent to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from core.persist import atomic_write_json
+
+class BaselineStore:
+    """
+    Owns baseline.json and, when journaling, baseline.journal.jsonl.
+
+    Without the journal every save is an atomic full snapshot. With it, a
+    save appends just the delta since the previous save, and the journal
+    is folded into a fresh snapshot every compact_every entries (or once
+    it outgrows the snapshot). Each journal line carries a sequence number
+    and the snapshot records the last one it includes, so a crash between
+    writing a snapshot and truncating the journal never double-counts.
+
+    Several processes may save (the daemon, `scan`, backfill). Writers
+    hold an flock on baseline.lock while they save, and check first
+    whether anyone else has written since they last read; if so they
+    reload before adding their own changes. A read-only store (`status`,
+    `report`) never writes or truncates anything.
+    """
+    
+    def __init__(self, snapshot_path: Path, journal: bool = False, compact_every: int = 500,
+                 read_only: bool = False):
+        self.snapshot_path = Path(snapshot_path)
+        self.journal_path = self.snapshot_path.with_suffix(".journal.jsonl")
+        self.lock_path = self.snapshot_path.with_suffix(".lock")
+        self.journal = journal
+        self.compact_every = compact_every
+        self.read_only = read_only
+        
+        self.seq = 0
+        self.snapshot_seq = 0
+        self.journal_entries = 0
+        self.skipped = 0
+        
+        # What the files looked like when we last read or wrote them
+        self.snapshot_signature: Optional[Tuple] = None
+        self.journal_size = 0
+        self.lock_fd = None
+        self.lock_depth = 0
+    
+    @classmethod
+    def from_config(cls, snapshot_path: Path, config: Dict, read_only: bool = False) -> "BaselineStore":
+        """Build from the optional "baseline" section of clawdguard.json"""
+        options = config.get("baseline", {})
+        return cls(
+            snapshot_path,
+            journal=options.get("journal", False),
+            compact_every=options.get("compact_every", 500),
+            read_only=read_only
+        )
+    
+    @contextmanager
+    def locked(self):
+        """Hold the writers' lock; re-entrant within this store"""
+        if self.lock_depth == 0:
+            self.lock_path.parent.mkdir(parents=True, exist_ok=True)
+            self.lock_fd = os.open(self.lock_path, os.O_RDWR | os.O_CREAT, 0o600)
+            fcntl.flock(self.lock_fd, fcntl.LOCK_EX)
+        self.lock_depth += 1
+        try:
+            yield
+        finally:
+            self.lock_depth -= 1
+            if self.lock_depth == 0:
+                os.close(self.lock_fd)
+                self.lock_fd = None
+    
+    def file_signature(self) -> Optional[Tuple]:
+        try:
+            st = os.stat(self.snapshot_path)
+        except FileNotFoundError:
+            return None
+        return (st.st_ino, st.st_mtime_ns, st.st_size)
+    
+    def journal_file_size(self) -> int:
+        try:
+            return self.journal_path.stat().st_size
+        except FileNotFoundError:
+            return 0
+    
+    def changed_on_disk(self) -> bool:
+        """True if another process has saved since we last read or wrote"""
+        return (self.file_signature() != self.snapshot_signature
+                or self.journal_file_size() != self.journal_size)
+    
+    def load_snapshot(self) -> Optional[Dict]:
+        self.snapshot_signature = self.file_signature()
+        if self.snapshot_signature is None:
+            self.seq = self.snapshot_seq = 0
+            return None
+        with open(self.snapshot_path, 'r') as f:
+            snapshot = json.load(f)
+        self.seq = self.snapshot_seq = snapshot.pop("journal_seq", 0)
+        return snapshot
+    
+    def replay(self) -> Iterator[Dict]:
+        """Yield journal deltas newer than the snapshot, in order"""
+        self.journal_entries = 0
+        self.journal_size = 0
+        if not self.journal_path.exists():
+            return
+        
+        good_end = 0
+        torn = False
+        with open(self.journal_path, 'rb') as f:
+            for line in f:
+                if not line.endswith(b"\n"):
+                    # A torn final line: a crash mid-append, or a line
+                    # another process is still writing
+                    torn = True
+                    break
+                good_end += len(line)
+                try:
+                    entry = json.loads(line)
+                    seq, delta = entry["seq"], entry["delta"]
+                except (ValueError, KeyError, TypeError):
+                    # Skip a damaged line; those after it are still good
+                    self.skipped += 1
+                    continue
+                self.journal_entries += 1
+                self.seq = max(self.seq, seq)
+                if seq <= self.snapshot_seq:
+                    # Already folded into the snapshot
+                    continue
+                yield delta
+        self.journal_size = good_end
+        
+        if torn and not self.read_only:
+            self.cut_torn_tail(good_end)
+    
+    def cut_torn_tail(self, good_end: int):
+        """Drop a partial last line so the next append starts on a clean line"""
+        with self.locked():
+            # Writers append under the lock, so a tail that is still
+            # partial now was left by a crash, not a save in progress
+            with open(self.journal_path, 'rb') as f:
+                f.seek(good_end)
+                if b"\n" in f.read():
+                    return
+            os.truncate(self.journal_path, good_end)
+    
+    def save(self, baseline: Dict, delta: Dict, snapshot: bool = False):
+        """Persist one save's worth of changes; snapshot forces compaction"""
+        if self.read_only:
+            raise PermissionError(f"{self.snapshot_path} was opened read-only")
+        
+        with self.locked():
+            if not self.journal:
+                self.write_snapshot(baseline)
+                return
+            
+            if snapshot:
+                self.compact(baseline)
+                return
+            
+            self.seq += 1
+            self.journal_path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.journal_path, 'a') as f:
+                f.write(json.dumps({"seq": self.seq, "delta": delta}) + "\n")
+                self.journal_size = f.tell()
+            self.journal_entries += 1
+            
+            if self.journal_entries >= self.compact_every or self.journal_outgrew_snapshot():
+                self.compact(baseline)
+    
+    def journal_outgrew_snapshot(self) -> bool:
+        try:
+            return self.journal_path.stat().st_size > self.snapshot_path.stat().st_size
+        except FileNotFoundError:
+            # No snapshot yet: take one now
+            return True
+    
+    def write_snapshot(self, baseline: Dict):
+        atomic_write_json(self.snapshot_path, dict(baseline, journal_seq=self.seq), indent=2)
+        self.snapshot_seq = self.seq
+        self.snapshot_signature = self.file_signature()
+    
+    def compact(self, baseline: Dict):
+        """Fold the journal into a fresh snapshot"""
+        self.write_snapshot(baseline)
+        try:
+            os.truncate(self.journal_path, 0)
+        except FileNotFoundError:
+            pass
+        self.journal_entries = 0
+        self.journal_size = 0
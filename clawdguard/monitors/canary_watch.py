@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+"""
+ClawdGuard - Canary Monitor
+Real-time canary tripwire on inotify, with the stat check as fallback
+"""
+
+import os
+import sys
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Set
+
+# Add parent to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from core.canary import CanarySystem
+from monitors.inotify import (
+    Inotify, inotify_available,
+    IN_ACCESS, IN_MODIFY, IN_ATTRIB, IN_CLOSE_WRITE, IN_CLOSE_NOWRITE, IN_OPEN, IN_MOVED_FROM, IN_MOVED_TO,
+    IN_CREATE, IN_DELETE, IN_DELETE_SELF, IN_MOVE_SELF, IN_Q_OVERFLOW, IN_IGNORED, IN_ONLYDIR
+)
+
+# Events on a canary file itself
+CANARY_MASK = IN_OPEN | IN_ACCESS | IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_DELETE_SELF | IN_MOVE_SELF
+
+# Events in a directory holding canaries: a canary removed, or replaced by a new file
+PARENT_MASK = IN_CREATE | IN_MOVED_TO | IN_DELETE | IN_MOVED_FROM | IN_ONLYDIR
+
+# What a burst of events on one canary is reported as, most serious first
+EVENT_TYPES = [
+    ("deleted", IN_DELETE_SELF | IN_MOVE_SELF | IN_DELETE | IN_MOVED_FROM),
+    ("modified", IN_MODIFY | IN_CLOSE_WRITE | IN_ATTRIB | IN_CREATE | IN_MOVED_TO),
+    ("accessed", IN_OPEN | IN_ACCESS),
+]
+
+
+def event_type(mask: int) -> Optional[str]:
+    for name, bits in EVENT_TYPES:
+        if mask & bits:
+            return name
+    return None
+
+
+class CanaryMonitor:
+    """
+    Watches every canary with inotify, so a read is reported as soon as
+    the file is opened rather than whenever the atime happens to be
+    checked (and with relatime, atime often isn't updated at all). Each
+    batch of events gives at most one alert per canary.
+
+    Canaries that can't be watched, or all of them when inotify is not
+    available, are covered by CanarySystem's stat check via check(),
+    which the daemon calls every tick.
+    """
+    
+    def __init__(self, canary: CanarySystem = None):
+        self.canary = canary or CanarySystem()
+        self.inotify: Optional[Inotify] = None
+        self.watches: Dict[int, str] = {}    # wd -> canary path
+        self.parents: Dict[int, Path] = {}   # wd -> directory holding canaries
+        self.missing: Set[str] = set()       # reported deleted, not back yet
+    
+    @property
+    def active(self) -> bool:
+        return self.inotify is not None
+    
+    def fileno(self) -> int:
+        return self.inotify.fileno()
+    
+    def paths(self) -> List[str]:
+        return list(self.canary.state.get("canaries", {}))
+    
+    def start(self) -> bool:
+        """Start watching; False if inotify is unavailable (stat checks only)"""
+        if not inotify_available():
+            return False
+        try:
+            self.inotify = Inotify()
+        except OSError as e:
+            print(f"inotify unavailable for canaries ({e}), checking them every tick instead")
+            return False
+        self.watch_all()
+        return True
+    
+    def close(self):
+        if self.inotify:
+            self.inotify.close()
+            self.inotify = None
+            self.watches.clear()
+            self.parents.clear()
+    
+    def watch_all(self):
+        """Watch every canary not yet watched, and the directories holding them"""
+        watched = set(self.watches.values())
+        watched_dirs = set(self.parents.values())
+        for path in self.paths():
+            parent = Path(path).parent
+            if parent not in watched_dirs:
+                try:
+                    self.parents[self.inotify.add_watch(str(parent), PARENT_MASK)] = parent
+                    watched_dirs.add(parent)
+                except OSError:
+                    # No directory yet; the stat check reports the canary missing
+                    pass
+            if path not in watched:
+                self.watch(path)
+    
+    def watch(self, path: str) -> bool:
+        try:
+            wd = self.inotify.add_watch(path, CANARY_MASK)
+        except OSError:
+            return False
+        self.watches[wd] = path
+        return True
+    
+    def poll(self, own_reads: List[str] = ()) -> List[Dict]:
+        """
+        Read pending events and record one alert per canary touched.
+        own_reads are canaries we just opened ourselves to verify: one
+        open of each, and the reads that follow, aren't reported.
+        """
+        if not self.inotify:
+            return []
+        
+        canaries = self.canary.state.get("canaries", {})
+        masks: Dict[str, int] = {}
+        own_opens = {path: 1 for path in own_reads}
+        for event in self.inotify.read_events(timeout=0):
+            if event.mask & IN_Q_OVERFLOW:
+                # Events were dropped; fall back to the stat check for all
+                return self.check(self.paths())
+            
+            if event.wd in self.parents:
+                if event.mask & IN_IGNORED:
+                    del self.parents[event.wd]
+                    continue
+                path = str(self.parents[event.wd] / event.name)
+                if path not in canaries:
+                    continue
+                if event.mask & (IN_CREATE | IN_MOVED_TO):
+                    # A new file under the canary's name; watch that one instead
+                    self.watch(path)
+            elif event.wd in self.watches:
+                path = self.watches[event.wd]
+                if event.mask & IN_IGNORED:
+                    del self.watches[event.wd]
+                    continue
+                if event.mask & IN_MOVE_SELF:
+                    # Follow the name, not the inode that was moved away
+                    self.inotify.rm_watch(event.wd)
+                if path in own_opens and event.mask & (IN_OPEN | IN_ACCESS | IN_CLOSE_NOWRITE):
+                    if not event.mask & IN_OPEN:
+                        continue
+                    if own_opens[path]:
+                        own_opens[path] -= 1
+                        continue
+                    # A second open while we were verifying is someone else
+            else:
+                continue
+            
+            masks[path] = masks.get(path, 0) | event.mask
+        
+        alerts = []
+        for path, mask in masks.items():
+            kind = event_type(mask)
+            if kind is None or path not in canaries:
+                continue
+            alerts.append({
+                "type": kind,
+                "path": path,
+                "timestamp": datetime.utcnow().isoformat(),
+                "severity": "critical",
+                "source": "inotify"
+            })
+        return self.record(alerts)
+    
+    def check(self, paths: List[str] = None) -> List[Dict]:
+        """
+        Per-tick check: stat for canaries inotify isn't covering (all of
+        them when it isn't running, otherwise those that couldn't be
+        watched), then content verification of every canary whose
+        fingerprint changed. Also picks up canaries added by
+        `canary setup` since the last call.
+        """
+        if self.canary.refresh_state() and self.inotify:
+            self.watch_all()
+        
+        self.missing = {path for path in self.missing if not os.path.exists(path)}
+        if paths is None:
+            watched = set(self.watches.values()) if self.inotify else set()
+            paths = [path for path in self.paths() if path not in watched and path not in self.missing]
+        
+        alerts = self.canary.check_canaries(paths=paths, advance=True) if paths else []
+        for alert in alerts:
+            if alert["type"] == "deleted":
+                self.missing.add(alert["path"])
+        
+        # Report what's already queued before our own reads are mixed in
+        alerts += self.poll()
+        alerts += self.canary.verify_canaries([path for path in self.paths() if path not in self.missing])
+        if self.canary.hashed:
+            alerts += self.poll(own_reads=self.canary.hashed)
+        return alerts
+    
+    def record(self, alerts: List[Dict]) -> List[Dict]:
+        """Log alerts from events, keeping the stat check's baseline in step"""
+        if not alerts:
+            return alerts
+        
+        # Don't save over canaries another process added meanwhile
+        self.canary.refresh_state()
+        canaries = self.canary.state.get("canaries", {})
+        for alert in alerts:
+            if alert["type"] == "deleted":
+                self.missing.add(alert["path"])
+                continue
+            if alert["path"] in canaries:
+                try:
+                    self.canary.advance(alert["path"], os.stat(alert["path"]))
+                except OSError:
+                    pass
+        
+        self.canary.record_alerts(alerts)
+        return alerts
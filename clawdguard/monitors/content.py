@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+"""
+ClawdGuard - Content Scanning
+Routes inbound messages and fetched web content from session JSONL
+through the prompt-injection rules
+"""
+
+import sys
+import threading
+from pathlib import Path
+from typing import Dict, Iterator, List, Tuple
+
+# Add parent to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from core.patterns import PatternMatcher, ThreatMatch, ThreatLevel
+from monitors.lineparse import JsonKey, parse_json
+
+ROLE_KEY = JsonKey("role")
+
+# Characters of surrounding text kept as alert context
+CONTEXT_CHARS = 80
+
+class ContentStream:
+    """
+    Scans one message a chunk at a time. The last overlap characters of
+    each chunk are carried into the next so a phrase split across a chunk
+    edge still matches; each rule is reported at most once per message.
+    """
+    
+    def __init__(self, matcher: PatternMatcher, overlap: int = 256):
+        self.matcher = matcher
+        self.overlap = overlap
+        self.carry = ""
+        self.reported = set()
+    
+    def feed(self, piece: str) -> List[Tuple[ThreatMatch, str]]:
+        """Scan the next chunk, returning (threat, surrounding text) pairs"""
+        text = self.carry + piece
+        found = []
+        for threat in self.matcher.scan_content(text):
+            if threat.vuln_id in self.reported:
+                continue
+            self.reported.add(threat.vuln_id)
+            at = max(text.find(threat.matched_text), 0)
+            found.append((threat, text[max(at - CONTEXT_CHARS, 0):at + len(threat.matched_text) + CONTEXT_CHARS]))
+        self.carry = text[-self.overlap:] if self.overlap else ""
+        return found
+
+
+class ContentScanner:
+    """
+    Picks scannable payloads out of session records and scans them in
+    bounded chunks. Recognised shapes:
+
+        {"type": "message", "message": {"role": "user", "content": [...]}}
+        {"type": "message", "message": {"role": "toolResult", "toolName": "web_fetch", "content": [...]}}
+        {"role": "user", "content": "..."}
+
+    where content is a string or a list of {"type": "text", "text": ...}
+    parts. Inbound roles are always scanned; tool results only for the
+    listed tools.
+    
+    The record is parsed whole, so chunking bounds the regex work per
+    call rather than memory. Every message is scanned end to end, up to
+    max_chars in total; past that the rest is not scanned, and the
+    message is reported as a medium CONTENT-TRUNCATED threat instead of
+    passing silently. tick_bytes is how much of one log LogWatcher scans
+    per tick before moving on, so a burst of multi-MB pages is spread
+    over several ticks instead of stalling the tail loop.
+    
+    One scanner is shared by the tail loop, the async scan workers and
+    the scan server's threads; the counters are kept under a lock.
+    """
+    
+    def __init__(self, matcher: PatternMatcher, enabled: bool = True,
+                 roles: List[str] = None, tool_roles: List[str] = None, tools: List[str] = None,
+                 chunk_chars: int = 64 * 1024, overlap: int = 256, max_chars: int = 1 << 20,
+                 tick_bytes: int = 4 << 20):
+        self.matcher = matcher
+        self.enabled = enabled
+        self.roles = set(roles or ["user"])
+        self.tool_roles = set(tool_roles or ["toolResult", "tool"])
+        self.tools = set(tools or ["web_fetch", "web_search", "browser"])
+        self.chunk_chars = chunk_chars
+        self.overlap = overlap
+        self.max_chars = max_chars
+        self.tick_bytes = tick_bytes
+        
+        self.lock = threading.Lock()
+        self.messages = 0
+        self.truncated = 0
+    
+    @classmethod
+    def from_config(cls, matcher: PatternMatcher, config: Dict) -> "ContentScanner":
+        """Build from the optional "content_scan" section of clawdguard.json"""
+        options = config.get("content_scan", {})
+        return cls(
+            matcher,
+            enabled=options.get("enabled", True),
+            roles=options.get("roles"),
+            tool_roles=options.get("tool_roles"),
+            tools=options.get("tools"),
+            chunk_chars=options.get("chunk_chars", 64 * 1024),
+            overlap=options.get("overlap", 256),
+            max_chars=options.get("max_chars", 1 << 20),
+            tick_bytes=options.get("tick_bytes", 4 << 20)
+        )
+    
+    @staticmethod
+    def text_of(content) -> str:
+        if isinstance(content, str):
+            return content
+        if isinstance(content, list):
+            return "\n".join(part["text"] for part in content
+                             if isinstance(part, dict) and isinstance(part.get("text"), str))
+        return ""
+    
+    def payloads(self, record: Dict) -> Iterator[Tuple[str, str]]:
+        """(source, text) for each part of the record that should be scanned"""
+        message = record.get("message", record)
+        if not isinstance(message, dict):
+            return
+        
+        role = message.get("role")
+        if role in self.roles:
+            source = role
+        elif role in self.tool_roles:
+            tool = message.get("toolName") or message.get("tool") or message.get("name")
+            if tool not in self.tools:
+                return
+            source = tool
+        else:
+            return
+        
+        text = self.text_of(message.get("content"))
+        if text:
+            yield source, text
+    
+    def scan_text(self, text: str, source: str = "content") -> List[Tuple[ThreatMatch, str]]:
+        """Scan one message body, returning (threat, context) pairs"""
+        truncated = len(text) > self.max_chars
+        with self.lock:
+            self.messages += 1
+            self.truncated += truncated
+        
+        found = []
+        stream = ContentStream(self.matcher, self.overlap)
+        end = min(len(text), self.max_chars)
+        for start in range(0, end, self.chunk_chars):
+            for threat, snippet in stream.feed(text[start:min(start + self.chunk_chars, end)]):
+                found.append((threat, f"[{source}] {snippet}"))
+        
+        if truncated:
+            found.append((self.truncation(len(text), source), f"[{source}] {text[:CONTEXT_CHARS]}"))
+        return found
+    
+    def truncation(self, length: int, source: str) -> ThreatMatch:
+        return ThreatMatch(
+            level=ThreatLevel.MEDIUM,
+            vuln_id="CONTENT-TRUNCATED",
+            name="Content Too Large To Scan",
+            description=f"Only the first {self.max_chars} of {length} characters from {source} were scanned",
+            matched_pattern="",
+            matched_text=f"{source}: {length} chars",
+            source="content"
+        )
+    
+    def scan_line(self, line: bytes) -> List[Tuple[ThreatMatch, str]]:
+        """Scan the message payloads of one session JSONL line"""
+        if not self.enabled or not line.startswith(b'{') or not ROLE_KEY.in_line(line):
+            return []
+        record = parse_json(line)
+        if record is None:
+            return []
+        
+        found = []
+        for source, text in self.payloads(record):
+            found.extend(self.scan_text(text, source))
+        return found
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+ClawdGuard - Alert Dedup Cache
+Bounded LRU of recently alerted threats with a re-alert window
+"""
+
+import time
+from collections import OrderedDict
+from typing import Dict, List, Tuple
+
+class DedupCache:
+    """
+    Remembers up to max_entries threat keys, least recently seen evicted
+    first. A key is admitted once, then suppressed until ttl seconds have
+    passed since it was last admitted; suppressed repeats are counted so
+    the next admission can report how often the threat recurred.
+    """
+    
+    def __init__(self, max_entries: int = 10000, ttl: float = 1800.0):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        
+        # key -> [last admitted (monotonic), repeats suppressed since]
+        self.entries: "OrderedDict[str, List]" = OrderedDict()
+        self.suppressed_total = 0
+        self.evicted = 0
+    
+    @classmethod
+    def from_config(cls, config: Dict) -> "DedupCache":
+        """Build from the optional "dedup" section of clawdguard.json"""
+        options = config.get("dedup", {})
+        return cls(
+            max_entries=options.get("max_entries", 10000),
+            ttl=options.get("ttl_minutes", 30) * 60
+        )
+    
+    def __len__(self):
+        return len(self.entries)
+    
+    def __contains__(self, key: str) -> bool:
+        return key in self.entries
+    
+    def admit(self, key: str) -> Tuple[bool, int]:
+        """
+        (True, repeats) if the threat should be handled, where repeats is
+        how many times it was suppressed since last handled; (False, n)
+        while it is still inside its window.
+        """
+        now = time.monotonic()
+        entry = self.entries.get(key)
+        
+        if entry is not None:
+            self.entries.move_to_end(key)
+            if now - entry[0] < self.ttl:
+                entry[1] += 1
+                self.suppressed_total += 1
+                return False, entry[1]
+            repeats = entry[1]
+            entry[0], entry[1] = now, 0
+            return True, repeats
+        
+        self.entries[key] = [now, 0]
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+            self.evicted += 1
+        return True, 0
+    
+    def suppressed(self, n: int = 10) -> List[Tuple[str, int]]:
+        """Keys with the most repeats suppressed in their current window"""
+        counts = [(key, entry[1]) for key, entry in self.entries.items() if entry[1]]
+        return sorted(counts, key=lambda item: item[1], reverse=True)[:n]
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+ClawdGuard - Inotify Bindings
+Minimal ctypes wrapper around Linux inotify for event-driven watching
+"""
+
+import ctypes
+import ctypes.util
+import errno
+import os
+import select
+import struct
+import sys
+from dataclasses import dataclass
+from typing import List, Optional
+
+# Event masks from <sys/inotify.h>
+IN_ACCESS = 0x00000001
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_CLOSE_NOWRITE = 0x00000010
+IN_OPEN = 0x00000020
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_ISDIR = 0x40000000
+
+IN_NONBLOCK = os.O_NONBLOCK
+IN_CLOEXEC = getattr(os, "O_CLOEXEC", 0o2000000)
+
+EVENT_HEADER = struct.Struct("iIII")  # wd, mask, cookie, len
+
+@dataclass
+class InotifyEvent:
+    wd: int
+    mask: int
+    cookie: int
+    name: str
+
+
+def _load_libc():
+    if not sys.platform.startswith("linux"):
+        return None
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        libc.inotify_init1
+        libc.inotify_add_watch
+        libc.inotify_rm_watch
+    except (OSError, AttributeError):
+        return None
+    libc.inotify_add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+    libc.inotify_rm_watch.argtypes = [ctypes.c_int, ctypes.c_int]
+    return libc
+
+
+_libc = _load_libc()
+
+
+def inotify_available() -> bool:
+    """True if this platform exposes inotify"""
+    return _libc is not None
+
+
+class Inotify:
+    """One inotify instance; wait for events with read_events()"""
+    
+    def __init__(self):
+        if _libc is None:
+            raise OSError(errno.ENOSYS, "inotify is not available on this platform")
+        self.fd = _libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            err = ctypes.get_errno()
+            raise OSError(err, f"inotify_init1: {os.strerror(err)}")
+    
+    def fileno(self) -> int:
+        return self.fd
+    
+    def add_watch(self, path: str, mask: int) -> int:
+        """Watch path for mask events, returning the watch descriptor"""
+        wd = _libc.inotify_add_watch(self.fd, os.fsencode(path), mask)
+        if wd < 0:
+            err = ctypes.get_errno()
+            raise OSError(err, f"inotify_add_watch({path}): {os.strerror(err)}")
+        return wd
+    
+    def rm_watch(self, wd: int):
+        _libc.inotify_rm_watch(self.fd, wd)
+    
+    def read_events(self, timeout: Optional[float] = None) -> List[InotifyEvent]:
+        """Block up to timeout seconds, then drain every queued event"""
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return []
+        
+        events = []
+        while True:
+            try:
+                buf = os.read(self.fd, 64 * 1024)
+            except BlockingIOError:
+                break
+            if not buf:
+                break
+            
+            offset = 0
+            while offset + EVENT_HEADER.size <= len(buf):
+                wd, mask, cookie, length = EVENT_HEADER.unpack_from(buf, offset)
+                offset += EVENT_HEADER.size
+                name = buf[offset:offset + length].rstrip(b"\0")
+                offset += length
+                events.append(InotifyEvent(wd, mask, cookie, os.fsdecode(name)))
+        
+        return events
+    
+    def close(self):
+        if self.fd >= 0:
+            os.close(self.fd)
+            self.fd = -1
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc):
+        self.close()
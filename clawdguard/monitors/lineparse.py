@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+ClawdGuard - Log Line Parsing
+Pulls the fields the scanner needs out of raw log lines
+"""
+
+import json
+import re
+from typing import Optional, Union
+
+# Prefer a C JSON parser when one is installed
+try:
+    import orjson
+    JSON_BACKEND = "orjson"
+    json_loads = orjson.loads
+except ImportError:
+    try:
+        import ujson
+        JSON_BACKEND = "ujson"
+        json_loads = ujson.loads
+    except ImportError:
+        JSON_BACKEND = "json"
+        json_loads = json.loads
+
+
+class JsonKey:
+    """
+    A byte-level test for whether a JSON line can hold a key, to skip
+    parsing lines that can't. The key is usually there verbatim; JSON
+    also allows any of its characters as a \\u escape ("comm\\u0061nd"),
+    which is looked for only in lines that have escapes at all.
+    """
+    
+    def __init__(self, name: str):
+        self.literal = f'"{name}"'.encode()
+        self.escaped = re.compile(
+            b'"' + b''.join(b'(?:%s|\\\\u%04x)' % (re.escape(c).encode(), ord(c)) for c in name) + b'"',
+            re.IGNORECASE
+        )
+    
+    def in_line(self, line: bytes) -> bool:
+        return self.literal in line or (b'\\u' in line and self.escaped.search(line) is not None)
+
+
+COMMAND_KEY = JsonKey("command")
+EXEC_PREFIX = re.compile(rb'\[EXEC\]\s*(.+)')
+
+
+def parse_json(line: bytes) -> Optional[dict]:
+    """Parse one JSON object line, or None if it isn't one"""
+    try:
+        data = json_loads(line)
+    except ValueError:
+        return None
+    return data if isinstance(data, dict) else None
+
+
+def extract_command(log_line: Union[bytes, str]) -> Optional[str]:
+    """
+    Pull the command out of one exec log line. Formats:
+
+        {"timestamp":"...","command":"...","exit_code":0}
+        [EXEC] command here
+        anything else is treated as the command itself
+
+    JSON lines without a "command" key anywhere in their bytes can't
+    yield one, so they are skipped without being parsed; session lines
+    carrying large message bodies and tool output mostly take that path.
+    """
+    if isinstance(log_line, str):
+        log_line = log_line.encode('utf-8', errors='surrogatepass')
+    line = log_line.strip()
+    
+    if line.startswith(b'{'):
+        if not COMMAND_KEY.in_line(line):
+            return None
+        data = parse_json(line)
+        if data is None:
+            return None
+        command = data.get('command', '')
+        return command if isinstance(command, str) else None
+    
+    # Try to extract command after common prefixes
+    match = EXEC_PREFIX.search(line)
+    if match:
+        line = match.group(1)
+    return line.decode('utf-8', errors='replace')
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+ClawdGuard - Persistent Log Offsets
+Remembers how far each log file has been read across restarts
+"""
+
+import hashlib
+import json
+import os
+import sys
+from pathlib import Path
+from typing import Dict, Optional
+
+# Add parent to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from core.persist import atomic_write_json
+
+# Leading bytes hashed to tell a reused inode from the file we last read
+FINGERPRINT_BYTES = 64
+
+
+def file_key(st: os.stat_result) -> str:
+    """Identity of a file that survives renames: device + inode"""
+    return f"{st.st_dev}:{st.st_ino}"
+
+
+def fingerprint(head: bytes) -> str:
+    return hashlib.sha1(head).hexdigest()
+
+
+class OffsetStore:
+    """
+    Read offsets keyed by (device, inode) rather than path, so a rotated
+    file keeps its offset under its new name and a new file created at the
+    old path starts from byte 0. Each entry also keeps a fingerprint of
+    the file's first bytes to catch inode reuse and copytruncate.
+    """
+    
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.entries = self.load()
+        self.dirty = False
+    
+    def load(self) -> Dict[str, Dict]:
+        try:
+            with open(self.path, 'r') as f:
+                return json.load(f).get("files", {})
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+    
+    def save(self):
+        """Persist offsets if anything moved since the last save"""
+        if not self.dirty:
+            return
+        atomic_write_json(self.path, {"version": 1, "files": self.entries})
+        self.dirty = False
+    
+    def resume(self, st: os.stat_result, head: bytes) -> int:
+        """
+        Offset to continue reading from, given the file's stat and its
+        first bytes. Returns 0 for unknown, replaced or truncated files.
+        """
+        entry = self.entries.get(file_key(st))
+        if not entry:
+            return 0
+        
+        fp_len = entry.get("fp_len", 0)
+        if len(head) < fp_len or fingerprint(head[:fp_len]) != entry.get("fingerprint"):
+            # Same inode, different content: reused inode or copytruncate
+            # that has already been written past our old offset
+            return 0
+        
+        if st.st_size < entry["offset"]:
+            # Truncated in place (copytruncate)
+            return 0
+        
+        return entry["offset"]
+    
+    def previous_key(self, filepath: Path, st: os.stat_result) -> Optional[str]:
+        """Key of the file that used to live at filepath, if it was rotated away"""
+        current = file_key(st)
+        for key, entry in self.entries.items():
+            if entry["path"] == str(filepath) and key != current:
+                return key
+        return None
+    
+    def update(self, filepath: Path, st: os.stat_result, head: bytes, offset: int):
+        key = file_key(st)
+        head = head[:FINGERPRINT_BYTES]
+        entry = self.entries.get(key)
+        if (entry and entry["offset"] == offset and entry["path"] == str(filepath)
+                and entry.get("fp_len") == len(head)):
+            return
+        
+        self.entries[key] = {
+            "path": str(filepath),
+            "offset": offset,
+            "fp_len": len(head),
+            "fingerprint": fingerprint(head)
+        }
+        self.dirty = True
+    
+    def get(self, key: str) -> Optional[Dict]:
+        return self.entries.get(key)
+    
+    def forget(self, key: str):
+        if self.entries.pop(key, None) is not None:
+            self.dirty = True
+    
+    def prune(self, live_keys):
+        """Drop entries for files that no longer exist under any name"""
+        for key in list(self.entries):
+            if key not in live_keys:
+                self.forget(key)
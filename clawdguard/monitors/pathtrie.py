@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+ClawdGuard - Path Trie
+Prefix tree of directories seen in file activity, with per-node counts
+"""
+
+import heapq
+from pathlib import PurePosixPath
+from typing import Dict, Iterable, List, Tuple
+
+class PathTrie:
+    """
+    Wraps a JSON-serialisable dict so it can live directly in the baseline:
+
+        {"nodes": <node count>, "root": {"n": 0, "e": 0, "k": {"root": {...}}}}
+
+    where for every node "n" counts events anywhere under that prefix,
+    "e" counts events for exactly that directory, "k" holds children by
+    path component and "p" (if present) counts children pruned away.
+    Lookups are O(depth).
+    """
+    
+    def __init__(self, data: Dict = None):
+        self.data = data if data is not None else {}
+        self.data.setdefault("root", self.new_node())
+        self.data.setdefault("nodes", 1)
+    
+    @staticmethod
+    def new_node() -> Dict:
+        return {"n": 0, "e": 0, "k": {}}
+    
+    @staticmethod
+    def components(path: str) -> List[str]:
+        parts = PurePosixPath(path).parts
+        return [part for part in parts if part != "/"]
+    
+    @property
+    def root(self) -> Dict:
+        return self.data["root"]
+    
+    def __len__(self):
+        return self.data["nodes"]
+    
+    def insert(self, path: str, count: int = 1):
+        node = self.root
+        node["n"] += count
+        for part in self.components(path):
+            child = node["k"].get(part)
+            if child is None:
+                child = node["k"][part] = self.new_node()
+                self.data["nodes"] += 1
+            child["n"] += count
+            node = child
+        node["e"] += count
+    
+    def find(self, path: str) -> Tuple[List[Dict], int]:
+        """Nodes along path from the root, and how many components matched"""
+        node = self.root
+        trail = [node]
+        parts = self.components(path)
+        for part in parts:
+            node = node["k"].get(part)
+            if node is None:
+                break
+            trail.append(node)
+        return trail, len(trail) - 1
+    
+    def count(self, path: str) -> int:
+        """Events for exactly this directory"""
+        trail, depth = self.find(path)
+        return trail[-1]["e"] if depth == len(self.components(path)) else 0
+    
+    def is_known(self, path: str, generalise_children: int = 0, min_count: int = 1,
+                 trusted_prefixes: Iterable[str] = (), min_depth: int = 3) -> bool:
+        """
+        A directory is normal if it has been seen itself or if it lies
+        under a trusted prefix. With generalise_children set, it is also
+        normal if one of its ancestors at least min_depth components deep
+        has been seen with that many distinct children, i.e. "anything
+        under /root/clawd/memory" once that dir has fanned out enough.
+        Shallow directories such as /etc or /root never generalise, so
+        a busy home directory doesn't make every new path under it normal.
+        """
+        parts = self.components(path)
+        for prefix in trusted_prefixes:
+            prefix_parts = self.components(prefix)
+            if parts[:len(prefix_parts)] == prefix_parts:
+                return True
+        
+        trail, depth = self.find(path)
+        if depth == len(parts) and trail[-1]["e"] >= min_count:
+            return True
+        
+        if not generalise_children:
+            return False
+        for node in trail[min_depth:]:
+            fan_out = len(node["k"]) + node.get("p", 0)
+            if fan_out >= generalise_children and node["n"] >= min_count:
+                return True
+        return False
+    
+    def items(self) -> Iterable[Tuple[str, int]]:
+        """(directory, exact count) for every directory seen"""
+        stack = [("/", self.root)]
+        while stack:
+            path, node = stack.pop()
+            if node["e"]:
+                yield path, node["e"]
+            for part, child in node["k"].items():
+                stack.append((str(PurePosixPath(path) / part), child))
+    
+    def top(self, n: int = 10) -> List[Tuple[str, int]]:
+        return heapq.nlargest(n, self.items(), key=lambda item: item[1])
+    
+    def prune(self, max_nodes: int) -> int:
+        """
+        Drop the least-seen leaves until at most max_nodes remain. Counts
+        of removed leaves stay folded into their ancestors' "n" and the
+        parent remembers its pruned fan-out, so a pruned area still reads
+        as familiar at the prefix level.
+        Returns the number of nodes removed.
+        """
+        if self.data["nodes"] <= max_nodes:
+            return 0
+        
+        # Heap of (subtree count, tiebreak, parent, name) for current leaves
+        heap = []
+        tiebreak = 0
+        stack = [self.root]
+        parents = {}
+        while stack:
+            node = stack.pop()
+            for part, child in node["k"].items():
+                parents[id(child)] = (node, part)
+                if child["k"]:
+                    stack.append(child)
+                else:
+                    heap.append((child["n"], tiebreak, node, part))
+                    tiebreak += 1
+        heapq.heapify(heap)
+        
+        removed = 0
+        while heap and self.data["nodes"] > max_nodes:
+            _, _, parent, part = heapq.heappop(heap)
+            del parent["k"][part]
+            parent["p"] = parent.get("p", 0) + 1
+            self.data["nodes"] -= 1
+            removed += 1
+            if not parent["k"] and parent is not self.root:
+                grandparent, parent_part = parents[id(parent)]
+                heapq.heappush(heap, (parent["n"], tiebreak, grandparent, parent_part))
+                tiebreak += 1
+        return removed
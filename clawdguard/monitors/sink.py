@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+ClawdGuard - Batched Event Sink
+Buffers JSONL records in memory and appends them in batches
+"""
+
+import atexit
+import json
+import os
+import threading
+import time
+import weakref
+from pathlib import Path
+from typing import Dict, List
+
+FSYNC_POLICIES = ("never", "flush", "interval")
+
+# Sinks with a tail to write at exit; weak, so a sink nobody holds any
+# more (and the monitor that built it) can still be collected
+_open_sinks = weakref.WeakSet()
+
+
+@atexit.register
+def _close_sinks():
+    """Never lose a buffered tail on normal interpreter exit"""
+    for sink in list(_open_sinks):
+        sink.close()
+
+
+class EventSink:
+    """
+    Append-only JSONL writer with a bounded buffer.
+
+    Records are flushed as one write when the buffer reaches max_events or
+    max_bytes, or when flush_interval seconds have passed since the last
+    flush (checked on write and by flush_if_due()). A full buffer flushes
+    synchronously rather than dropping events; only if the write itself
+    fails is the batch dropped (and counted in dropped), so a full disk
+    can't grow the buffer without bound.
+
+    fsync policy:
+        never    - leave it to the OS page cache (default)
+        flush    - fsync after every batch
+        interval - fsync at most every fsync_interval seconds
+    """
+    
+    def __init__(self, path: Path, max_events: int = 1000, max_bytes: int = 1 << 20,
+                 flush_interval: float = 1.0, fsync: str = "never", fsync_interval: float = 5.0):
+        if fsync not in FSYNC_POLICIES:
+            raise ValueError(f"fsync must be one of {FSYNC_POLICIES}, got {fsync!r}")
+        
+        self.path = Path(path)
+        self.max_events = max_events
+        self.max_bytes = max_bytes
+        self.flush_interval = flush_interval
+        self.fsync = fsync
+        self.fsync_interval = fsync_interval
+        
+        self.buffer: List[str] = []
+        self.buffered_bytes = 0
+        self.last_flush = time.monotonic()
+        self.last_fsync = self.last_flush
+        self.lock = threading.Lock()
+        self.dropped = 0
+        _open_sinks.add(self)
+    
+    @classmethod
+    def from_config(cls, path: Path, config: Dict) -> "EventSink":
+        """Build from the optional "activity_log" section of clawdguard.json"""
+        options = config.get("activity_log", {})
+        return cls(
+            path,
+            max_events=options.get("buffer_events", 1000),
+            max_bytes=options.get("buffer_bytes", 1 << 20),
+            flush_interval=options.get("flush_interval", 1.0),
+            fsync=options.get("fsync", "never"),
+            fsync_interval=options.get("fsync_interval", 5.0)
+        )
+    
+    def write(self, record: Dict):
+        """Queue one record, flushing if the buffer is full or stale"""
+        line = json.dumps(record) + "\n"
+        with self.lock:
+            self.buffer.append(line)
+            self.buffered_bytes += len(line)
+            if (len(self.buffer) >= self.max_events or self.buffered_bytes >= self.max_bytes
+                    or time.monotonic() - self.last_flush >= self.flush_interval):
+                self._flush()
+    
+    def flush_if_due(self):
+        """Flush if records have been waiting longer than flush_interval"""
+        with self.lock:
+            if self.buffer and time.monotonic() - self.last_flush >= self.flush_interval:
+                self._flush()
+    
+    def flush(self):
+        with self.lock:
+            self._flush()
+    
+    def _flush(self, sync: bool = False):
+        now = time.monotonic()
+        if not self.buffer:
+            self.last_flush = now
+            return
+        
+        data = "".join(self.buffer)
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.path, 'a') as f:
+                f.write(data)
+                if self.fsync == "flush" or (self.fsync == "interval" and (sync or now - self.last_fsync >= self.fsync_interval)):
+                    f.flush()
+                    os.fsync(f.fileno())
+                    self.last_fsync = now
+        except OSError as e:
+            self.dropped += len(self.buffer)
+            print(f"⚠️ Dropped {len(self.buffer)} activity event(s), cannot write {self.path}: {e}")
+        
+        self.buffer = []
+        self.buffered_bytes = 0
+        self.last_flush = now
+    
+    def close(self):
+        """Flush everything still buffered (safe to call more than once)"""
+        with self.lock:
+            self._flush(sync=True)
+        _open_sinks.discard(self)
@@ -6,40 +6,72 @@ Monitors Clawdbot logs in real-time for threats
 
 import json
 import os
+import select
+import signal
 import sys
 import time
-import re
 from datetime import datetime
 from pathlib import Path
-from typing import Optional, List
+from typing import Dict, Optional, List, Set, Tuple
 import argparse
 
 # Add parent to path for imports
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from core.patterns import PatternMatcher, ThreatMatch, ThreatLevel
-from core.alert import AlertManager, Alert, send_immediate_alert
+from core.alert import AlertManager, Alert
+from core.canary import CanarySystem
+from core.config import ConfigService
 from monitors.activity import ActivityMonitor
+from monitors.canary_watch import CanaryMonitor
+from monitors.content import ContentScanner
+from monitors.dedup import DedupCache
+from monitors.lineparse import extract_command
+from monitors.offsets import OffsetStore, FINGERPRINT_BYTES, file_key
+from monitors.inotify import (
+    Inotify, inotify_available,
+    IN_MODIFY, IN_CLOSE_WRITE, IN_CREATE, IN_MOVED_TO, IN_DELETE_SELF, IN_MOVE_SELF,
+    IN_Q_OVERFLOW, IN_IGNORED, IN_ISDIR, IN_ONLYDIR
+)
+
+LOG_PATTERNS = ("*.log", "*.jsonl")
+
+# Directory events that mean a log file may have new content
+LOG_DIR_MASK = IN_MODIFY | IN_CLOSE_WRITE | IN_CREATE | IN_MOVED_TO | IN_DELETE_SELF | IN_MOVE_SELF | IN_ONLYDIR
+
+# Seconds a last line may go without its newline before it is scanned anyway
+PARTIAL_LINE_TIMEOUT = 30.0
 
 class LogWatcher:
     def __init__(self, log_dir: str = None, config_path: str = None):
         self.log_dir = Path(log_dir or "/Users/victor/.clawdbot/logs")
         self.config_path = config_path or str(Path(__file__).parent.parent / "config" / "clawdguard.json")
         
-        self.config = self.load_config()
-        self.pattern_matcher = PatternMatcher()
-        self.activity_monitor = ActivityMonitor()
-        self.alert_manager = AlertManager(self.config_path)
+        self.config_service = ConfigService.shared(self.config_path)
+        self.pattern_matcher = PatternMatcher.shared()
+        self.content_scanner = ContentScanner.from_config(self.pattern_matcher, self.config)
+        self._activity_monitor: Optional[ActivityMonitor] = None
+        self.alert_manager = AlertManager.shared(self.config_path)
         
-        self.file_positions = {}  # Track read positions
-        self.processed_hashes = set()  # Avoid duplicate alerts
+        # Read positions, persisted so a restart resumes instead of rescanning
+        self.offsets = OffsetStore(Path(__file__).parent.parent / "logs" / "offsets.json")
+        self.dedup = DedupCache.from_config(self.config)  # Avoid duplicate alerts
+        self.behind: Set[Path] = set()  # Logs with lines left over from a busy tick
+        self.partials: Dict[str, Dict] = {}  # device:inode -> unfinished last line
         
-    def load_config(self) -> dict:
-        try:
-            with open(self.config_path, 'r') as f:
-                return json.load(f)
-        except FileNotFoundError:
-            return {}
+        self.canary_monitor = CanaryMonitor(CanarySystem(self.config_path)) if self.config.get("canary_enabled") else None
+    
+    @property
+    def config(self) -> dict:
+        """Current config; edits to clawdguard.json apply without a restart"""
+        return self.config_service.get()
+    
+    @property
+    def activity_monitor(self) -> ActivityMonitor:
+        """Built on first use: loading baseline.json is most of a cold start"""
+        if self._activity_monitor is None:
+            self._activity_monitor = ActivityMonitor(config_service=self.config_service)
+        return self._activity_monitor
     
     def is_learning_mode(self) -> bool:
         """Check if we're still in learning mode"""
@@ -57,11 +89,21 @@ class LogWatcher:
     
     def handle_threat(self, threat: ThreatMatch, context: str = "") -> bool:
         """Handle a detected threat based on mode and severity"""
+        alert, should_block = self.assess_threat(threat, context)
+        if alert:
+            self.alert_manager.send_alert(alert)
+        return should_block
+    
+    def assess_threat(self, threat: ThreatMatch, context: str = "") -> Tuple[Optional[Alert], bool]:
+        """
+        Dedup and log a threat, returning the alert to send (if any) and
+        whether to block. Sending is left to the caller.
+        """
         # Create unique hash to avoid duplicate alerts
         threat_hash = f"{threat.vuln_id}:{threat.matched_text}"
-        if threat_hash in self.processed_hashes:
-            return False
-        self.processed_hashes.add(threat_hash)
+        admitted, repeats = self.dedup.admit(threat_hash)
+        if not admitted:
+            return None, False
         
         learning = self.is_learning_mode()
         
@@ -69,166 +111,468 @@ class LogWatcher:
         log_path = Path(__file__).parent.parent / "logs" / "threats.jsonl"
         log_path.parent.mkdir(parents=True, exist_ok=True)
         
+        record = {
+            "timestamp": datetime.utcnow().isoformat() + "Z",
+            "level": threat.level.value,
+            "vuln_id": threat.vuln_id,
+            "name": threat.name,
+            "matched": threat.matched_text,
+            "context": context[:200],
+            "repeats": repeats,
+            "learning_mode": learning,
+            "action": "logged" if learning else "blocked"
+        }
         with open(log_path, 'a') as f:
-            f.write(json.dumps({
-                "timestamp": datetime.utcnow().isoformat() + "Z",
-                "level": threat.level.value,
-                "vuln_id": threat.vuln_id,
-                "name": threat.name,
-                "matched": threat.matched_text,
-                "context": context[:200],
-                "learning_mode": learning,
-                "action": "logged" if learning else "blocked"
-            }) + "\n")
+            f.write(json.dumps(record) + "\n")
+        
+        if self.alert_manager.store:
+            self.alert_manager.store.add_threat(record)
         
         # In learning mode, only alert for critical
         if learning and threat.level != ThreatLevel.CRITICAL:
             print(f"[LEARNING] Would alert: [{threat.level.value}] {threat.name}")
-            return False
+            return None, False
         
         # Send alert
         alert = Alert(
             level=threat.level.value,
             title=f"🛡️ {threat.name}",
             description=threat.description,
-            details=f"Matched: {threat.matched_text}\nContext: {context[:100]}"
+            details=f"Matched: {threat.matched_text}\nContext: {context[:100]}",
+            key=threat_hash
         )
+        if repeats:
+            alert.details += f"\nRepeated {repeats} more time(s) since last alert"
         
-        self.alert_manager.send_alert(alert)
-        
-        # Return True if we should block (non-learning + high/critical)
-        if not learning and threat.level in [ThreatLevel.CRITICAL, ThreatLevel.HIGH]:
-            return True
-        
-        return False
+        return alert, self.should_block(threat, learning)
     
-    def scan_exec_log(self, log_line: str) -> List[ThreatMatch]:
-        """Scan an exec log line for threats"""
-        threats = []
-        
-        # Try to extract command from log
-        # Format varies, common patterns:
-        # {"timestamp":"...","command":"...","exit_code":0}
-        # [EXEC] command here
+    def should_block(self, threat: ThreatMatch, learning: bool = None) -> bool:
+        """Block if non-learning + high/critical"""
+        if learning is None:
+            learning = self.is_learning_mode()
+        return not learning and threat.level in [ThreatLevel.CRITICAL, ThreatLevel.HIGH]
+    
+    def scan_lines(self, f, budget: int = None, final: bool = False) -> List[ThreatMatch]:
+        """
+        Scan complete lines from the current position of a binary file.
+        A trailing line without its newline is left for the next read,
+        unless final (nothing more will be written to f). Past budget
+        bytes the rest is left too, and the file is marked behind so the
+        daemon comes back to it without sleeping.
+        """
+        all_threats = []
+        pos = start = f.tell()
         
-        try:
-            if log_line.strip().startswith('{'):
-                data = json.loads(log_line)
-                command = data.get('command', '')
-            else:
-                # Try to extract command after common prefixes
-                match = re.search(r'\[EXEC\]\s*(.+)', log_line)
-                if match:
-                    command = match.group(1)
-                else:
-                    command = log_line
+        for raw in f:
+            if not raw.endswith(b"\n") and not final:
+                break
+            if budget is not None and pos - start >= budget:
+                self.behind.add(Path(f.name))
+                break
+            pos += len(raw)
+            
+            line = raw.strip()
+            if not line:
+                continue
             
+            command, hits = self.scan_line(line)
             if command:
-                threats = self.pattern_matcher.scan_command(command)
-                
                 # Record activity for baseline
                 self.activity_monitor.record_exec(command)
-                
-        except json.JSONDecodeError:
+            
+            for threat, context in hits:
+                should_block = self.handle_threat(threat, context)
+                if should_block:
+                    all_threats.append(threat)
+        
+        f.seek(pos)
+        return all_threats
+    
+    def scan_line(self, line: bytes) -> Tuple[Optional[str], List[Tuple[ThreatMatch, str]]]:
+        """
+        The side-effect-free part of scanning one stripped log line: the
+        command it ran (if any) and every (threat, context) it contains.
+        Safe to call from several threads at once.
+        """
+        hits = []
+        command = extract_command(line)
+        if command:
+            threats = self.pattern_matcher.scan_command(command)
+            if threats:
+                # Only decode the line when it's needed as context
+                context = line.decode('utf-8', errors='replace')
+                hits = [(threat, context) for threat in threats]
+        
+        # Inbound messages and fetched pages go through the content rules
+        hits.extend(self.content_scanner.scan_line(line))
+        return command, hits
+    
+    def scan_stalled_line(self, f, filepath: Path) -> List[ThreatMatch]:
+        """
+        Called with f positioned after the last complete line. A trailing
+        line that has sat unchanged for PARTIAL_LINE_TIMEOUT seconds (its
+        writer died, or never ends lines) is scanned for threats once as
+        it stands. The offset stays put: if the line is finished later it
+        is scanned in full again, and dedup absorbs the repeated alert.
+        """
+        pos = f.tell()
+        st = os.fstat(f.fileno())
+        key = file_key(st)
+        if st.st_size <= pos:
+            self.partials.pop(key, None)
+            return []
+        
+        now = time.monotonic()
+        partial = self.partials.get(key)
+        if not partial or (partial["offset"], partial["size"]) != (pos, st.st_size):
+            self.partials[key] = {"path": str(filepath), "offset": pos, "size": st.st_size,
+                                  "since": now, "scanned": False}
+            return []
+        partial["path"] = str(filepath)
+        if partial["scanned"] or now - partial["since"] < PARTIAL_LINE_TIMEOUT:
+            return []
+        
+        partial["scanned"] = True
+        line = f.read(st.st_size - pos).strip()
+        f.seek(pos)
+        if not line:
+            return []
+        
+        threats = []
+        _, hits = self.scan_line(line)
+        for threat, context in hits:
+            if self.handle_threat(threat, context):
+                threats.append(threat)
+        return threats
+    
+    def stalled_files(self) -> List[Path]:
+        """Logs whose unfinished last line is due to be scanned"""
+        now = time.monotonic()
+        return sorted({Path(partial["path"]) for partial in self.partials.values()
+                       if not partial["scanned"] and now - partial["since"] >= PARTIAL_LINE_TIMEOUT})
+    
+    def find_by_key(self, directory: Path, key: str) -> Optional[Path]:
+        """Locate a file in directory by device:inode, e.g. after rotation"""
+        try:
+            for entry in os.scandir(directory):
+                if entry.is_file(follow_symlinks=False) and file_key(entry.stat(follow_symlinks=False)) == key:
+                    return Path(entry.path)
+        except OSError:
             pass
+        return None
+    
+    def drain_rotated(self, filepath: Path, old_key: str) -> List[ThreatMatch]:
+        """
+        Finish reading a log that was renamed away from filepath, last
+        line included even without its newline. Its offset stays under
+        its device:inode with the new name, so if that name is itself a
+        log (foo.jsonl.1, date-named logs) it resumes at the end instead
+        of being rescanned; prune drops it once it's gone.
+        """
+        threats = []
+        rotated = self.find_by_key(filepath.parent, old_key)
+        
+        if rotated and rotated != filepath:
+            try:
+                with open(rotated, 'rb') as f:
+                    st = os.fstat(f.fileno())
+                    head = f.read(FINGERPRINT_BYTES)
+                    f.seek(self.offsets.resume(st, head))
+                    threats = self.scan_lines(f, final=True)
+                    self.offsets.update(rotated, st, head, f.tell())
+                    self.partials.pop(old_key, None)
+                    return threats
+            except OSError as e:
+                print(f"Error draining rotated log {rotated}: {e}")
         
+        # Moved out of the directory or deleted: nothing left to resume
+        self.offsets.forget(old_key)
         return threats
     
     def watch_file(self, filepath: Path) -> List[ThreatMatch]:
         """Watch a single log file for new content"""
         all_threats = []
-        
-        if not filepath.exists():
-            return all_threats
-        
-        # Get current position
-        current_pos = self.file_positions.get(str(filepath), 0)
+        self.behind.discard(filepath)
         
         try:
-            with open(filepath, 'r') as f:
-                # Seek to last position
-                f.seek(current_pos)
+            with open(filepath, 'rb') as f:
+                st = os.fstat(f.fileno())
+                head = f.read(FINGERPRINT_BYTES)
                 
-                for line in f:
-                    line = line.strip()
-                    if not line:
-                        continue
-                    
-                    # Scan for threats
-                    threats = self.scan_exec_log(line)
-                    
-                    for threat in threats:
-                        should_block = self.handle_threat(threat, line)
-                        if should_block:
-                            all_threats.append(threat)
+                # A different inode at this path means the log was rotated:
+                # finish the old file before starting on the new one
+                old_key = self.offsets.previous_key(filepath, st)
+                if old_key:
+                    all_threats.extend(self.drain_rotated(filepath, old_key))
                 
-                # Update position
-                self.file_positions[str(filepath)] = f.tell()
+                # Resume where the last run (or a previous process) stopped
+                f.seek(self.offsets.resume(st, head))
+                all_threats.extend(self.scan_lines(f, self.content_scanner.tick_bytes))
+                if filepath not in self.behind:
+                    all_threats.extend(self.scan_stalled_line(f, filepath))
                 
+                self.offsets.update(filepath, st, head, f.tell())
+        
+        except FileNotFoundError:
+            pass
         except Exception as e:
             print(f"Error watching {filepath}: {e}")
         
         return all_threats
     
+    def is_log_file(self, name: str) -> bool:
+        return any(Path(name).match(pattern) for pattern in LOG_PATTERNS)
+    
+    def watch_files(self, files: List[Path]) -> List[ThreatMatch]:
+        """Scan new content in the given log files"""
+        all_threats = []
+        for log_file in files:
+            threats = self.watch_file(log_file)
+            all_threats.extend(threats)
+        return all_threats
+    
+    def log_files(self) -> List[Path]:
+        """*.log first, then JSONL session logs"""
+        files = []
+        for pattern in LOG_PATTERNS:
+            files.extend(sorted(self.log_dir.glob(pattern)))
+        return files
+    
     def watch_directory(self) -> List[ThreatMatch]:
         """Watch all log files in directory"""
-        all_threats = []
-        
         if not self.log_dir.exists():
-            return all_threats
+            return []
         
-        for log_file in self.log_dir.glob("*.log"):
-            threats = self.watch_file(log_file)
-            all_threats.extend(threats)
+        threats = self.watch_files(self.log_files())
+        self.prune_offsets()
+        return threats
+    
+    def prune_offsets(self):
+        """Forget offsets for files that are gone under every name"""
+        live_keys = set()
+        if self.log_dir.exists():
+            for entry in os.scandir(self.log_dir):
+                try:
+                    live_keys.add(file_key(entry.stat(follow_symlinks=False)))
+                except OSError:
+                    pass
+        self.offsets.prune(live_keys)
+        for key in set(self.partials) - live_keys:
+            del self.partials[key]
+    
+    def run_once(self, files: List[Path] = None, save: bool = True):
+        """Run a single scan cycle, over all logs or just the given files"""
+        # Rescanned below if still there (the event loop passes them in)
+        self.behind.clear()
+        threats = self.watch_directory() if files is None else self.watch_files(files)
         
-        # Also check JSONL session logs
-        for jsonl_file in self.log_dir.glob("*.jsonl"):
-            threats = self.watch_file(jsonl_file)
-            all_threats.extend(threats)
+        for alert in self.rate_alerts():
+            self.alert_manager.send_alert(alert)
         
-        return all_threats
-    
-    def run_once(self):
-        """Run a single scan cycle"""
-        threats = self.watch_directory()
+        # Digest of coalesced repeats, and the daily digest when due
+        self.alert_manager.flush()
+        
+        # Save baseline and read offsets periodically
+        if save:
+            if files is not None:
+                # Only a full directory scan prunes on its own
+                self.prune_offsets()
+            self.save_state()
+        elif self._activity_monitor:
+            self.activity_monitor.event_sink.flush_if_due()
         
-        # Check rate limits
+        return threats
+    
+    def rate_alerts(self) -> List[Alert]:
+        """Check rate limits and rates unusual for this time of day"""
         warnings = self.activity_monitor.check_rate_limits(self.config)
+        warnings += self.activity_monitor.check_rate_anomalies(self.config)
+        
+        alerts = []
         for warning in warnings:
             print(f"⚠️ Rate limit warning: {warning}")
             if not self.is_learning_mode():
-                send_immediate_alert(
+                alerts.append(Alert(
                     level="high",
                     title="Rate Limit Exceeded",
                     description=warning,
                     details="Unusual activity volume detected"
-                )
-        
-        # Save baseline periodically
-        self.activity_monitor.save_baseline()
-        
-        return threats
+                ))
+        return alerts
+    
+    def save_state(self):
+        """Persist activity, baseline and read offsets together"""
+        if self._activity_monitor:
+            self.activity_monitor.flush_events()
+            self.activity_monitor.save_baseline()
+        self.offsets.save()
+    
+    def report(self, threats: List[ThreatMatch]):
+        if threats:
+            print(f"[{datetime.utcnow().isoformat()}] Detected {len(threats)} threat(s)")
+    
+    def start_canaries(self) -> bool:
+        """
+        Stat-check canaries for anything touched while we were down, then
+        watch them live. False if they are left to the per-tick stat check.
+        """
+        if not self.canary_monitor:
+            return False
+        self.send_canary_alerts(self.canary_monitor.check())
+        return self.canary_monitor.start()
+    
+    def check_canaries(self):
+        """Per-tick stat check of canaries inotify isn't covering"""
+        if self.canary_monitor:
+            self.send_canary_alerts(self.canary_monitor.check())
+    
+    def send_canary_alerts(self, records: List[dict]):
+        for alert in self.canary_alerts(records):
+            self.alert_manager.send_alert(alert)
+    
+    def canary_alerts(self, records: List[dict]) -> List[Alert]:
+        """Canary trips alert in learning mode too; nothing legitimate reads them"""
+        alerts = []
+        for record in records:
+            print(f"🍯 Canary {record['type']}: {record['path']}")
+            alerts.append(Alert(
+                level=record["severity"],
+                title="🍯 Canary File Triggered!",
+                description=f"Canary file was {record['type']}",
+                details=f"Path: {record['path']}",
+                key=f"canary:{record['path']}",
+                urgent=True
+            ))
+        return alerts
     
-    def run_daemon(self, interval: float = 5.0):
-        """Run as a daemon, scanning periodically"""
+    def wait(self, timeout: float, inotify: Inotify = None) -> bool:
+        """
+        Sleep up to timeout, alerting on canary events the moment they
+        arrive. True as soon as inotify (if given) has log events to read.
+        """
+        deadline = time.monotonic() + timeout
+        canary = self.canary_monitor if self.canary_monitor and self.canary_monitor.active else None
+        fds = [source.fileno() for source in (inotify, canary) if source]
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            if not fds:
+                time.sleep(remaining)
+                return False
+            
+            ready, _, _ = select.select(fds, [], [], remaining)
+            if canary and canary.fileno() in ready:
+                self.send_canary_alerts(canary.poll())
+            if inotify and inotify.fileno() in ready:
+                return True
+    
+    def run_daemon(self, interval: float = 5.0, use_inotify: bool = True):
+        """Run as a daemon, event-driven where inotify exists, else polling"""
+        event_driven = use_inotify and inotify_available()
+        
         print(f"🛡️ ClawdGuard Watcher starting...")
         print(f"   Mode: {'LEARNING' if self.is_learning_mode() else 'ENFORCEMENT'}")
         print(f"   Watching: {self.log_dir}")
-        print(f"   Interval: {interval}s")
+        print(f"   Trigger: {'inotify' if event_driven else f'polling every {interval}s'}")
+        if self.canary_monitor:
+            live = self.start_canaries()
+            print(f"   Canaries: {'inotify' if live else f'stat check every {interval}s'}")
         print()
         
+        # systemd stops us with SIGTERM; unwind like Ctrl-C so buffered
+        # events, baseline and offsets are written before exit
+        signal.signal(signal.SIGTERM, self.handle_sigterm)
+        
         try:
+            if event_driven:
+                self.run_event_loop(interval)
+            self.run_poll_loop(interval)
+        
+        except KeyboardInterrupt:
+            print("\n🛡️ ClawdGuard Watcher stopped")
+            self.save_state()
+        
+        finally:
+            if self.canary_monitor:
+                self.canary_monitor.close()
+    
+    def handle_sigterm(self, signum, frame):
+        raise KeyboardInterrupt
+    
+    def run_poll_loop(self, interval: float):
+        """Re-scan the whole directory every interval seconds"""
+        while True:
+            self.report(self.run_once())
+            self.check_canaries()
+            if not self.behind:
+                self.wait(interval)
+    
+    def run_event_loop(self, interval: float):
+        """
+        Sleep in inotify until a log file changes, then read only that file.
+        Returns if the directory can't be (or stops being) watched, so the
+        caller can fall back to polling.
+        """
+        try:
+            inotify = Inotify()
+        except OSError as e:
+            print(f"inotify unavailable ({e}), falling back to polling")
+            return
+        
+        with inotify:
+            try:
+                inotify.add_watch(str(self.log_dir), LOG_DIR_MASK)
+            except OSError as e:
+                print(f"Cannot watch {self.log_dir} ({e}), falling back to polling")
+                return
+            
+            # Catch up on everything written before we started
+            self.report(self.run_once())
+            last_save = time.monotonic()
+            unsaved = False
+            
             while True:
-                threats = self.run_once()
+                self.check_canaries()
+                if self.behind:
+                    # A busy log still has lines left over: carry on without sleeping
+                    events = inotify.read_events(timeout=0)
+                else:
+                    events = inotify.read_events(timeout=0) if self.wait(interval, inotify) else []
+                save_due = time.monotonic() - last_save >= interval
                 
-                if threats:
-                    print(f"[{datetime.utcnow().isoformat()}] Detected {len(threats)} threat(s)")
+                if not events and not self.behind:
+                    # Idle: scan last lines left unfinished too long, flush
+                    # pending digests, save and prune
+                    stalled = self.stalled_files()
+                    if stalled:
+                        self.report(self.watch_files(stalled))
+                    self.alert_manager.flush()
+                    if unsaved:
+                        self.prune_offsets()
+                        self.save_state()
+                        last_save, unsaved = time.monotonic(), False
+                    continue
                 
-                time.sleep(interval)
+                if any(e.mask & (IN_DELETE_SELF | IN_MOVE_SELF | IN_IGNORED) for e in events):
+                    print(f"{self.log_dir} went away, falling back to polling")
+                    return
                 
-        except KeyboardInterrupt:
-            print("\n🛡️ ClawdGuard Watcher stopped")
-            self.activity_monitor.save_baseline()
+                if any(e.mask & IN_Q_OVERFLOW for e in events):
+                    # Events were dropped; only a full rescan is safe
+                    changed = None
+                else:
+                    names = {e.name for e in events if e.name and not e.mask & IN_ISDIR}
+                    changed = [self.log_dir / name for name in sorted(names) if self.is_log_file(name)]
+                    changed += sorted(self.behind.difference(changed))
+                    if not changed:
+                        continue
+                
+                self.report(self.run_once(changed, save=save_due))
+                if save_due:
+                    last_save, unsaved = time.monotonic(), False
+                else:
+                    unsaved = True
 
 
 def main():
@@ -237,6 +581,8 @@ def main():
     parser.add_argument("--config", help="Config file path")
     parser.add_argument("--interval", type=float, default=5.0, help="Scan interval in seconds")
     parser.add_argument("--once", action="store_true", help="Run once and exit")
+    parser.add_argument("--poll", action="store_true", help="Poll every interval instead of using inotify")
+    parser.add_argument("--async", dest="use_async", action="store_true", help="Run the asyncio daemon")
     
     args = parser.parse_args()
     
@@ -245,8 +591,11 @@ def main():
     if args.once:
         threats = watcher.run_once()
         print(f"Scan complete. Found {len(threats)} actionable threat(s).")
+    elif args.use_async:
+        from monitors.async_watcher import run_async_daemon
+        run_async_daemon(watcher, interval=args.interval, use_inotify=not args.poll)
     else:
-        watcher.run_daemon(interval=args.interval)
+        watcher.run_daemon(interval=args.interval, use_inotify=not args.poll)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,9 @@
+"""
+ClawdGuard - Test Setup
+Puts the clawdguard directory on sys.path, as the scripts do for themselves
+"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
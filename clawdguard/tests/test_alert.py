@@ -0,0 +1,114 @@
+"""
+ClawdGuard - Alert Coalescing Tests
+Coalescing windows, token buckets, urgent alerts and the daily digest
+"""
+
+import json
+from datetime import datetime, timedelta
+
+import pytest
+
+from core.alert import Alert, AlertManager
+from core.coalesce import AlertCoalescer, TokenBucket
+
+
+def test_bucket_allows_a_burst_then_refills_at_its_rate():
+    bucket = TokenBucket(rate_per_minute=6, burst=3)
+    start = bucket.last
+    assert [bucket.take(start) for _ in range(4)] == [True, True, True, False]
+    assert not bucket.take(start + 9)
+    assert bucket.take(start + 10)
+    
+    # Never more than burst, however long it was idle
+    bucket.refill(start + 3600)
+    assert bucket.tokens == 3
+
+
+def test_repeats_inside_a_window_are_counted_not_sent():
+    coalescer = AlertCoalescer(window=60)
+    assert coalescer.offer("high", "EXPLOIT-X:id_rsa", "first", now=0)
+    assert not coalescer.offer("high", "EXPLOIT-X:id_rsa", "again", "d1", now=10)
+    assert not coalescer.offer("high", "EXPLOIT-X:id_rsa", "again", "d2", now=20)
+    
+    # Different key, or the same key at another level, is its own group
+    assert coalescer.offer("high", "EXPLOIT-Y:id_rsa", now=20)
+    assert coalescer.offer("critical", "EXPLOIT-X:id_rsa", now=20)
+    
+    assert coalescer.due(now=59) == []
+    [group] = coalescer.due(now=60)
+    assert (group.key, group.suppressed, group.descriptions, group.details) == ("EXPLOIT-X:id_rsa", 2, ["again"], ["d1", "d2"])
+    
+    # Still absorbing until the digest has gone out
+    assert not coalescer.offer("high", "EXPLOIT-X:id_rsa", now=70)
+    coalescer.reported([group])
+    assert coalescer.offer("high", "EXPLOIT-X:id_rsa", now=71)
+
+
+def test_quiet_groups_expire_with_their_window():
+    coalescer = AlertCoalescer(window=60)
+    coalescer.offer("high", "a", now=0)
+    coalescer.offer("high", "b", now=30)
+    coalescer.expire(now=60)
+    assert list(coalescer.groups) == [("high", "b")]
+    assert coalescer.offer("high", "a", now=61)
+
+
+@pytest.fixture
+def manager(tmp_path):
+    config = tmp_path / "clawdguard.json"
+    config.write_text(json.dumps({
+        "mode": "enforcement",
+        "store": {"enabled": False},
+        "threat_levels": {"critical": {"alert": "immediate"}, "high": {"alert": "immediate"},
+                          "low": {"alert": "daily"}},
+        "alerting": {"coalesce_window": 300, "channels": {"whatsapp": {"rate_per_minute": 1, "burst": 2}}}
+    }))
+    m = AlertManager(str(config))
+    m.alert_log_path = tmp_path / "alerts.jsonl"
+    m.digest_state_path = tmp_path / "digest_state.json"
+    m.sent = []
+    m.send_whatsapp = lambda alert, target=None: m.sent.append(alert) or True
+    return m
+
+
+def alert(level="high", key="EXPLOIT-X:id_rsa", urgent=False):
+    return Alert(level=level, title=f"{level} alert", description="d", details="", key=key, urgent=urgent)
+
+
+def test_critical_and_urgent_alerts_bypass_coalescing_and_rate(manager):
+    for _ in range(5):
+        manager.send_alert(alert("critical"))
+        manager.send_alert(alert("high", key="canary:/srv/keys", urgent=True))
+    assert len(manager.sent) == 10
+    assert manager.coalescer.groups == {}
+    assert manager.buckets["whatsapp"].tokens == 2
+
+
+def test_repeats_and_rate_limited_alerts_are_held_for_the_digest(manager):
+    for _ in range(3):
+        manager.send_alert(alert(key="a"))
+    manager.send_alert(alert(key="b"))
+    manager.send_alert(alert(key="c"))  # out of tokens
+    assert [a.key for a in manager.sent] == ["a", "b"]
+    
+    manager.flush(force=True)
+    digest = manager.sent[-1]
+    assert digest.title == "🛡️ 3 repeated alert(s) held back"
+    # Only the quiet group is left, until its window closes
+    assert list(manager.coalescer.groups) == [("high", "b")]
+
+
+def test_first_daily_digest_waits_a_full_interval(manager):
+    manager.log_alert(alert("low"))
+    assert manager.send_daily_digest() is None
+    assert manager.sent == []
+    started = json.loads(manager.digest_state_path.read_text())["last_digest"]
+    
+    # Still inside the interval
+    assert manager.send_daily_digest() is None
+    
+    # A full interval later, everything since the clock started is sent
+    manager._last_digest = (datetime.fromisoformat(started.rstrip("Z")) - timedelta(days=1)).isoformat() + "Z"
+    digest = manager.send_daily_digest()
+    assert digest.title == "📋 ClawdGuard daily digest"
+    assert manager.sent == [digest]
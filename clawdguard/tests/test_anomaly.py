@@ -0,0 +1,104 @@
+"""
+ClawdGuard - Rate Anomaly Tests
+Online Welford/EWMA statistics and per-hour z-scores
+"""
+
+import random
+import statistics
+
+import pytest
+
+from monitors.rates import RateProfile, RunningStats
+
+
+def test_welford_matches_the_textbook_figures():
+    rng = random.Random(3)
+    xs = [rng.gauss(20, 4) for _ in range(500)]
+    stats = RunningStats()
+    for x in xs:
+        stats.update(x)
+    assert stats.n == 500
+    assert stats.mean == pytest.approx(statistics.mean(xs))
+    assert stats.std == pytest.approx(statistics.stdev(xs))
+
+
+def test_ewma_follows_a_level_shift_the_long_run_mean_doesnt():
+    stats = RunningStats(alpha=0.1)
+    for _ in range(200):
+        stats.update(10)
+    assert (stats.ewma, stats.ewstd) == (10, 0)
+    for _ in range(100):
+        stats.update(50)
+    assert stats.ewma == pytest.approx(50, abs=0.01)
+    assert stats.mean == pytest.approx(10 + 40 / 3)
+    assert stats.z_score(50, "ewma", min_std=1.0) < 1 < stats.z_score(50, "welford")
+
+
+def test_round_trip_through_the_baseline_keeps_updating_the_same():
+    a, b = RunningStats(), None
+    for i, x in enumerate([3, 7, 1, 9, 4, 4, 8]):
+        a.update(x)
+        if i == 3:
+            b = RunningStats.from_dict(a.to_dict())
+        elif b:
+            b.update(x)
+    assert b.to_dict() == pytest.approx(a.to_dict())
+
+
+def test_flat_history_needs_min_std():
+    stats = RunningStats()
+    for _ in range(50):
+        stats.update(2)
+    assert stats.z_score(100) == 0.0
+    assert stats.z_score(6, min_std=1.0) == 4.0
+
+
+def replay(profile, kind, per_hour, days):
+    """per_hour[hour] events in every minute of that hour, day after day"""
+    for day in range(days):
+        for hour, count in sorted(per_hour.items()):
+            for minute in range(60):
+                for _ in range(count):
+                    profile.record(kind, minute=(day * 24 + hour) * 60 + minute)
+
+
+def test_minutes_fold_into_their_hour_and_all():
+    stats = {}
+    profile = RateProfile(stats)
+    for _ in range(3):
+        profile.record("exec", minute=5 * 60)  # 05:00
+    assert stats == {}
+    changed = profile.record("exec", minute=5 * 60 + 1)
+    assert set(changed["exec"]) == {"5", "all"}
+    assert profile.get("exec", "5").mean == 3
+    assert profile.current_count("exec", 5 * 60 + 1) == 1
+
+
+def test_idle_minutes_count_as_zero_up_to_the_cap():
+    stats = {}
+    profile = RateProfile(stats, max_idle_fill=10)
+    profile.record("exec", minute=0)
+    profile.record("exec", minute=1000)
+    overall = profile.get("exec", "all")
+    assert overall.n == 1 + 10
+    assert overall.mean == pytest.approx(1 / 11)
+
+
+def test_rates_are_judged_against_their_own_hour():
+    profile = RateProfile({})
+    # Quiet nights, busy mornings
+    replay(profile, "exec", {3: 1, 9: 20}, days=2)
+    
+    busy_morning = (2 * 24 + 9) * 60
+    for _ in range(22):
+        profile.record("exec", minute=busy_morning)
+    assert profile.anomalies(minute=busy_morning) == []
+    
+    busy_night = (3 * 24 + 3) * 60
+    for _ in range(22):
+        profile.record("exec", minute=busy_night)
+    [found] = profile.anomalies(minute=busy_night)
+    assert found.startswith("Unusual exec rate: 22/min") and "at 3:00 UTC" in found
+    
+    # Too little history for that hour: no verdict
+    assert profile.anomalies(minute=busy_night, min_samples=10000) == []
@@ -0,0 +1,156 @@
+"""
+ClawdGuard - Baseline Store Tests
+Journal replay across torn lines, duplicate sequence numbers, compaction
+and several writers
+"""
+
+import json
+
+from core.config import ConfigService
+from monitors.activity import ActivityMonitor
+from monitors.baseline_store import BaselineStore
+
+
+def delta(n):
+    return {"counts": {"common_commands": {"ls": n}}}
+
+
+def entry(seq, n):
+    return json.dumps({"seq": seq, "delta": delta(n)}) + "\n"
+
+
+def store(tmp_path, **options):
+    s = BaselineStore(tmp_path / "baseline.json", journal=True, **options)
+    if not s.snapshot_path.exists():
+        # Big enough that these short journals never outgrow it
+        s.snapshot_path.write_text(json.dumps({"pad": "x" * 4096, "journal_seq": 0}))
+    return s
+
+
+def replayed(s):
+    s.load_snapshot()
+    return [d["counts"]["common_commands"]["ls"] for d in s.replay()]
+
+
+def test_torn_tail_is_left_alone_read_only(tmp_path):
+    s = store(tmp_path, read_only=True)
+    s.journal_path.write_text(entry(1, 1) + entry(2, 2) + '{"seq": 3, "del')
+    before = s.journal_path.read_bytes()
+    
+    assert replayed(s) == [1, 2]
+    assert s.journal_path.read_bytes() == before
+
+
+def test_torn_tail_is_cut_by_a_writer(tmp_path):
+    s = store(tmp_path)
+    s.journal_path.write_text(entry(1, 1) + '{"seq": 2, "del')
+    
+    assert replayed(s) == [1]
+    assert s.journal_path.read_text() == entry(1, 1)
+    
+    s.save({}, delta(5))
+    assert replayed(store(tmp_path)) == [1, 5]
+
+
+def test_damaged_line_is_skipped_not_the_rest(tmp_path):
+    s = store(tmp_path)
+    s.journal_path.write_text(entry(1, 1) + "garbage{\n" + '{"seq": 2}\n' + entry(3, 3))
+    
+    assert replayed(s) == [1, 3]
+    assert s.skipped == 2
+    assert s.seq == 3
+
+
+def test_duplicate_seq_entries_both_apply(tmp_path):
+    # As left by two writers before saves were locked
+    s = store(tmp_path)
+    s.journal_path.write_text(entry(1, 1) + entry(2, 2) + entry(2, 3))
+    
+    assert replayed(s) == [1, 2, 3]
+    s.save({}, delta(4))
+    assert json.loads(s.journal_path.read_text().splitlines()[-1])["seq"] == 3
+
+
+def test_compaction_folds_the_journal(tmp_path):
+    s = store(tmp_path, compact_every=3)
+    s.load_snapshot()
+    list(s.replay())
+    for n in (1, 2):
+        s.save({"total": n}, delta(n))
+    assert replayed(store(tmp_path)) == [1, 2]
+    
+    s.save({"total": 3}, delta(3))
+    assert s.journal_path.read_text() == ""
+    fresh = store(tmp_path)
+    assert fresh.load_snapshot() == {"total": 3}
+    assert list(fresh.replay()) == []
+    assert fresh.seq == 3
+
+
+def test_crash_between_snapshot_and_truncate_does_not_double_count(tmp_path):
+    s = store(tmp_path)
+    s.journal_path.write_text(entry(1, 1) + entry(2, 2))
+    s.snapshot_path.write_text(json.dumps({"pad": "x" * 4096, "journal_seq": 2}))
+    
+    assert replayed(s) == []
+    s.save({}, delta(4))
+    assert replayed(store(tmp_path)) == [4]
+
+
+def test_read_only_store_refuses_to_save(tmp_path):
+    s = BaselineStore(tmp_path / "baseline.json", journal=True, read_only=True)
+    try:
+        s.save({}, delta(1))
+    except PermissionError:
+        pass
+    else:
+        raise AssertionError("read-only store saved")
+    assert not s.journal_path.exists()
+
+
+def monitor(tmp_path, journal):
+    config = tmp_path / "clawdguard.json"
+    config.write_text(json.dumps({"baseline": {"journal": journal}, "activity_log": {"buffer_events": 1}}))
+    return ActivityMonitor(data_dir=str(tmp_path / "logs"), config_service=ConfigService(str(config)))
+
+
+def commands(m):
+    return m.baseline["common_commands"]
+
+
+def test_two_writers_keep_each_others_changes(tmp_path):
+    for journal in (True, False):
+        root = tmp_path / str(journal)
+        root.mkdir()
+        daemon, scan = monitor(root, journal), monitor(root, journal)
+        
+        daemon.record_exec("ls -la")
+        daemon.save_baseline()
+        scan.record_exec("git status")
+        scan.save_baseline()
+        daemon.record_exec("ls")
+        daemon.save_baseline()
+        
+        assert commands(monitor(root, journal)) == {"ls": 2, "git": 1}
+        if journal:
+            seqs = [json.loads(line)["seq"] for line in daemon.baseline_store.journal_path.read_text().splitlines()]
+            # The first save found no snapshot and took one
+            assert seqs == [2, 3]
+
+
+def test_status_reader_never_writes(tmp_path):
+    writer = monitor(tmp_path, True)
+    writer.record_exec("ls")
+    writer.save_baseline()
+    journal = writer.baseline_store.journal_path
+    with open(journal, "a") as f:
+        f.write('{"seq": 2, "delta": {"cou')
+    before = journal.read_bytes()
+    
+    config = tmp_path / "clawdguard.json"
+    reader = ActivityMonitor(data_dir=str(tmp_path / "logs"), config_service=ConfigService(str(config)), read_only=True)
+    reader.record_exec("whoami")
+    reader.save_baseline()
+    
+    assert journal.read_bytes() == before
+    assert commands(reader) == {"ls": 1, "whoami": 1}
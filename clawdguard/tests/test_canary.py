@@ -0,0 +1,86 @@
+"""
+ClawdGuard - Canary Verification Tests
+Content checks must not hide someone else's access to a canary
+"""
+
+import os
+import time
+
+import pytest
+
+import core.canary
+from core.canary import CanarySystem, file_fingerprint
+
+
+@pytest.fixture
+def canary(tmp_path, monkeypatch):
+    # As on a filesystem (or for a file) where O_NOATIME isn't available,
+    # so verifying a canary bumps its atime
+    monkeypatch.setattr(core.canary, "O_NOATIME", 0)
+    real_hash_file = core.canary.hash_file
+    
+    def hash_file_touching_atime(path, legacy=False):
+        result = real_hash_file(path, legacy)
+        st = os.stat(path)
+        os.utime(path, ns=(time.time_ns(), st.st_mtime_ns))
+        return result
+    monkeypatch.setattr(core.canary, "hash_file", hash_file_touching_atime)
+    
+    config = tmp_path / "clawdguard.json"
+    config.write_text("{}")
+    system = CanarySystem(str(config))
+    system.state_path = tmp_path / "canary_state.json"
+    system.alerts_path = tmp_path / "canary_alerts.jsonl"
+    system.state = {"canaries": {}, "alert_count": 0}
+    
+    path = tmp_path / "api_keys.txt"
+    system.create_canary(str(path))
+    
+    # Recorded well in the past, so any later access is visible
+    then = time.time() - 3600
+    os.utime(path, (then, then))
+    state = system.state["canaries"][str(path)]
+    st = path.stat()
+    state.update(initial_atime=st.st_atime, initial_mtime=st.st_mtime, fingerprint=file_fingerprint(st))
+    return system, path
+
+
+def kinds(alerts):
+    return sorted(alert["type"] for alert in alerts)
+
+
+def test_own_read_is_not_an_access(canary):
+    system, path = canary
+    os.chmod(path, 0o600)  # ctime changes, forcing a re-hash
+    
+    assert system.verify_canaries() == []
+    assert system.hashed == [str(path)]
+    assert system.check_canaries() == []
+
+
+def test_read_then_touch_is_still_reported(canary):
+    system, path = canary
+    state = system.state["canaries"][str(path)]
+    recorded = state["initial_atime"]
+    
+    # Read by someone else, then touched to force our re-hash
+    st = path.stat()
+    os.utime(path, ns=(time.time_ns(), st.st_mtime_ns))
+    os.chmod(path, 0o600)
+    
+    assert system.verify_canaries() == []
+    assert state["initial_atime"] == recorded
+    assert kinds(system.check_canaries()) == ["accessed"]
+
+
+def test_verify_never_absorbs_a_modification(canary):
+    system, path = canary
+    state = system.state["canaries"][str(path)]
+    recorded = state["initial_mtime"]
+    
+    with open(path, "a") as f:
+        f.write("# edited\n")
+    
+    assert kinds(system.verify_canaries()) == ["tampered"]
+    assert state["initial_mtime"] == recorded
+    assert "modified" in kinds(system.check_canaries())
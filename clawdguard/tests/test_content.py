@@ -0,0 +1,128 @@
+"""
+ClawdGuard - Content Scanning Tests
+Chunk overlap, the scan window and the per-tick budget of the tail loop
+"""
+
+import json
+import threading
+
+import pytest
+
+from core.patterns import PatternMatcher
+from monitors.content import ContentScanner
+from monitors.offsets import OffsetStore
+from monitors.watcher import LogWatcher
+
+INJECTION = "ignore previous"
+
+
+@pytest.fixture(scope="module")
+def matcher():
+    return PatternMatcher()
+
+
+def ids(found):
+    return [threat.vuln_id for threat, _ in found]
+
+
+def test_phrase_split_across_chunks_is_found_once(matcher):
+    scanner = ContentScanner(matcher, chunk_chars=100, overlap=32)
+    for split in range(1, len(INJECTION)):
+        # Every split point of the phrase across the first chunk edge
+        text = "x" * (100 - split) + INJECTION + " and again " + INJECTION + "y" * 300
+        found = scanner.scan_text(text, "web_fetch")
+        assert ids(found) == ["OCLAW-2026-004"], split
+        assert found[0][1].startswith("[web_fetch] ")
+        assert INJECTION in found[0][1]
+
+
+def test_no_overlap_misses_a_split_phrase(matcher):
+    text = "x" * 95 + INJECTION + "y" * 100
+    assert ids(ContentScanner(matcher, chunk_chars=100, overlap=0).scan_text(text)) == []
+    assert ids(ContentScanner(matcher, chunk_chars=100, overlap=32).scan_text(text)) == ["OCLAW-2026-004"]
+
+
+def test_past_max_chars_is_reported_not_scanned(matcher):
+    scanner = ContentScanner(matcher, chunk_chars=64, max_chars=1000)
+    text = "x" * 1000 + INJECTION
+    
+    found = scanner.scan_text(text, "web_fetch")
+    assert ids(found) == ["CONTENT-TRUNCATED"]
+    threat, context = found[0]
+    assert threat.level.value == "medium"
+    assert threat.matched_text == f"web_fetch: {len(text)} chars"
+    assert context == "[web_fetch] " + "x" * 80
+    assert (scanner.messages, scanner.truncated) == (1, 1)
+    
+    # Up to the limit is still scanned in full
+    assert ids(scanner.scan_text("x" * (1000 - len(INJECTION)) + INJECTION)) == ["OCLAW-2026-004"]
+    assert (scanner.messages, scanner.truncated) == (2, 1)
+
+
+def test_scan_line_picks_inbound_and_fetched_payloads(matcher):
+    scanner = ContentScanner(matcher)
+    
+    def scan(record):
+        return ids(scanner.scan_line(json.dumps(record).encode()))
+    
+    assert scan({"role": "user", "content": INJECTION}) == ["OCLAW-2026-004"]
+    assert scan({"type": "message", "message": {"role": "toolResult", "toolName": "web_fetch",
+                                                "content": [{"type": "text", "text": INJECTION}]}}) == ["OCLAW-2026-004"]
+    assert scan({"type": "message", "message": {"role": "toolResult", "toolName": "read",
+                                                "content": INJECTION}}) == []
+    assert scan({"role": "assistant", "content": INJECTION}) == []
+    
+    # A \\u-escaped key is the same key to the parser
+    line = json.dumps({"role": "user", "content": INJECTION}).replace('"role"', '"r\\u006fle"')
+    assert ids(scanner.scan_line(line.encode())) == ["OCLAW-2026-004"]
+
+
+def test_counters_are_exact_across_threads(matcher):
+    scanner = ContentScanner(matcher, max_chars=10)
+    
+    def work():
+        for _ in range(200):
+            scanner.scan_text("short")
+            scanner.scan_text("much too long")
+    
+    threads = [threading.Thread(target=work) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert (scanner.messages, scanner.truncated) == (3200, 1600)
+
+
+class Recorder:
+    """Stands in for ActivityMonitor: remembers which commands were scanned"""
+    
+    def __init__(self):
+        self.commands = []
+    
+    def record_exec(self, command, *args):
+        self.commands.append(command)
+
+
+def test_tail_loop_scans_a_budget_per_tick(tmp_path):
+    config = tmp_path / "clawdguard.json"
+    config.write_text(json.dumps({"mode": "learning", "store": {"enabled": False},
+                                  "content_scan": {"tick_bytes": 1000}}))
+    logs = tmp_path / "logs"
+    logs.mkdir()
+    w = LogWatcher(log_dir=str(logs), config_path=str(config))
+    w.offsets = OffsetStore(tmp_path / "offsets.json")
+    w._activity_monitor = Recorder()
+    
+    log = logs / "session.jsonl"
+    lines = [json.dumps({"command": f"echo {i}", "pad": "x" * 80}) + "\n" for i in range(30)]
+    log.write_text("".join(lines))
+    per_tick = -(-1000 // len(lines[0]))
+    
+    ticks = 0
+    while True:
+        w.watch_file(log)
+        ticks += 1
+        if log not in w.behind:
+            break
+    assert w.activity_monitor.commands == [f"echo {i}" for i in range(30)]
+    assert ticks == -(-30 // per_tick)
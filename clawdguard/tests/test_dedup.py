@@ -0,0 +1,62 @@
+"""
+ClawdGuard - Dedup Cache Tests
+LRU eviction, the re-alert window and repeat counts
+"""
+
+import pytest
+
+import monitors.dedup
+from monitors.dedup import DedupCache
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(monitors.dedup.time, "monotonic", lambda: now[0])
+    return now
+
+
+def test_repeats_inside_the_window_are_suppressed_and_counted(clock):
+    cache = DedupCache(ttl=60)
+    assert cache.admit("EXPLOIT-X:id_rsa") == (True, 0)
+    clock[0] += 10
+    assert cache.admit("EXPLOIT-X:id_rsa") == (False, 1)
+    clock[0] += 40
+    assert cache.admit("EXPLOIT-X:id_rsa") == (False, 2)
+    assert cache.suppressed() == [("EXPLOIT-X:id_rsa", 2)]
+    
+    # The window runs from the last admission, not the last sighting
+    clock[0] += 10
+    assert cache.admit("EXPLOIT-X:id_rsa") == (True, 2)
+    assert cache.admit("EXPLOIT-X:id_rsa") == (False, 1)
+    assert cache.suppressed_total == 3
+
+
+def test_least_recently_seen_is_evicted_first(clock):
+    cache = DedupCache(max_entries=3, ttl=60)
+    for key in ("a", "b", "c"):
+        cache.admit(key)
+    cache.admit("a")  # a suppressed repeat still counts as a use
+    cache.admit("d")
+    assert list(cache.entries) == ["c", "a", "d"]
+    assert "b" not in cache and len(cache) == 3
+    assert cache.evicted == 1
+    
+    # Forgotten, so admitted again at once
+    assert cache.admit("b") == (True, 0)
+    assert "c" not in cache
+
+
+def test_suppressed_lists_the_noisiest_first(clock):
+    cache = DedupCache(ttl=60)
+    for key, repeats in (("quiet", 0), ("some", 2), ("loud", 5)):
+        for _ in range(repeats + 1):
+            cache.admit(key)
+    assert cache.suppressed() == [("loud", 5), ("some", 2)]
+    assert cache.suppressed(1) == [("loud", 5)]
+
+
+def test_from_config():
+    cache = DedupCache.from_config({"dedup": {"max_entries": 5, "ttl_minutes": 2}})
+    assert (cache.max_entries, cache.ttl) == (5, 120)
+    assert (DedupCache.from_config({}).max_entries, DedupCache.from_config({}).ttl) == (10000, 1800)
@@ -0,0 +1,108 @@
+"""
+ClawdGuard - Path Policy Tests
+Compiled sensitive_paths against the substring matching they replaced
+"""
+
+import os
+import re
+
+import pytest
+
+from core.pathpolicy import PathPolicy, glob_to_regex
+
+HOME = os.path.expanduser("~")
+
+# Entries as people write them in sensitive_paths
+SENSITIVE_PATHS = [
+    "credentials", ".env", ".ssh", "id_rsa", "/etc/shadow", "/root/.aws",
+    "~/.gnupg", "*.pem", "*.env", "/root/.ssh/*", "**/secrets/*.json", "key[0-9].txt",
+]
+
+PATHS = [
+    "/root/.aws/credentials", "/root/.aws/credentials_backup", "/srv/mycredentials.txt",
+    "/app/.env", "/app/.env.local", "/app/prod.env", "/app/prod.env.bak",
+    "/root/.ssh/id_rsa", "/root/.ssh/id_rsa.pub", "/home/u/.ssh/known_hosts",
+    "/etc/shadow", "/etc/shadow-", "/etc/passwd", "/root/.aws/config",
+    f"{HOME}/.gnupg/pubring.kbx", "/srv/tls/server.pem", "/srv/tls/server.pem.bak",
+    "/srv/app/secrets/db.json", "/srv/app/secrets/nested/db.json",
+    "/srv/key1.txt", "/srv/key/.txt", "/srv/readme.md",
+]
+
+
+def substring_match(glob, path):
+    """How scan_file_path matched a sensitive_paths entry before PathPolicy"""
+    return bool(re.search(glob.replace('.', '\\.').replace('*', '.*'), path, re.IGNORECASE))
+
+
+def policy_match(glob, path):
+    return glob in PathPolicy([glob]).match(path)
+
+
+# ~ now also stands for the expanded home directory
+PLAIN_CHANGES = {
+    ("~/.gnupg", f"{HOME}/.gnupg/pubring.kbx"): True,
+}
+
+
+@pytest.mark.parametrize("glob", [g for g in SENSITIVE_PATHS if not any(c in g for c in "*?[")])
+def test_plain_entries_match_as_substrings_like_before(glob):
+    for path in PATHS:
+        expected = PLAIN_CHANGES.get((glob, path), substring_match(glob, path))
+        assert policy_match(glob, path) == expected, path
+
+
+# Wildcard entries are real globs now; every path where that differs from
+# the old ".*" substring search is listed here
+WILDCARD_CHANGES = {
+    ("*.pem", "/srv/tls/server.pem.bak"): False,
+    ("*.env", "/app/.env.local"): False,
+    ("*.env", "/app/prod.env.bak"): False,
+    ("**/secrets/*.json", "/srv/app/secrets/nested/db.json"): False,
+}
+
+
+def test_listed_changes_are_real_changes():
+    for (glob, path), now in {**PLAIN_CHANGES, **WILDCARD_CHANGES}.items():
+        assert substring_match(glob, path) != now
+
+
+@pytest.mark.parametrize("glob", [g for g in SENSITIVE_PATHS if any(c in g for c in "*?[")])
+def test_wildcard_entries_differ_only_where_listed(glob):
+    for path in PATHS:
+        expected = WILDCARD_CHANGES.get((glob, path), substring_match(glob, path))
+        assert policy_match(glob, path) == expected, path
+
+
+@pytest.mark.parametrize("glob,path,expected", [
+    ("/root/.ssh/*", "/root/.ssh/id_rsa", True),
+    ("/root/.ssh/*", "/root/.sshx/id_rsa", False),
+    ("*.pem", "/srv/keys.pem/inner", True),
+    ("**/secrets/*.json", "/srv/secrets/a.json", True),
+    ("**/secrets/*.json", "/srv/secrets/a/b.json", False),
+    ("key[!0-9].txt", "/srv/keyA.txt", True),
+    ("key[!0-9].txt", "/srv/key/.txt", False),
+    ("a[/]b", "/x/a/b", False),
+    ("[]]x", "/srv/]x", True),
+    ("[^]x", "/srv/^x", True),
+    ("open[bracket", "/srv/open[bracket", True),
+    ("~/.gnupg/*", f"{HOME}/.gnupg/trustdb.gpg", True),
+    ("~/.gnupg/*", "~/.gnupg/trustdb.gpg", True),
+])
+def test_glob_semantics(glob, path, expected):
+    assert policy_match(glob, path) == expected
+    assert bool(re.search(glob_to_regex(glob), path, re.IGNORECASE)) == expected
+
+
+def test_relative_paths_resolve_against_cwd():
+    policy = PathPolicy(["/root/.ssh/*", "/etc/shadow"])
+    assert policy.match(".ssh/id_rsa", cwd="/root") == ("/root/.ssh/*",)
+    assert policy.match("../../etc/shadow", cwd="/srv/app") == ("/etc/shadow",)
+    assert policy.match(".ssh/id_rsa", cwd="/home/u") == ()
+
+
+def test_verdicts_are_cached():
+    policy = PathPolicy(["credentials"], cache_size=2)
+    for path in ("/a/credentials", "/a/credentials", "/b", "/c", "/a/credentials"):
+        policy.match(path)
+    assert (policy.hits, policy.misses) == (1, 4)
+    assert len(policy.cache) == 2
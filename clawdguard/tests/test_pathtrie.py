@@ -0,0 +1,91 @@
+"""
+ClawdGuard - Path Trie Tests
+Lookups, generalisation and pruning of the directory baseline
+"""
+
+import json
+
+from monitors.pathtrie import PathTrie
+
+
+def trie_of(*paths):
+    trie = PathTrie()
+    for path in paths:
+        trie.insert(path)
+    return trie
+
+
+def node_count(node):
+    return 1 + sum(node_count(child) for child in node["k"].values())
+
+
+def test_counts_exact_dirs_and_prefixes():
+    trie = trie_of("/root/clawd", "/root/clawd", "/root/clawd/memory", "/tmp")
+    assert trie.count("/root/clawd") == 2
+    assert trie.count("/root") == 0
+    assert trie.count("/root/clawd/memory/x") == 0
+    trail, depth = trie.find("/root/clawd/other")
+    assert depth == 2 and trail[-1]["n"] == 3
+    assert len(trie) == node_count(trie.root) == 5
+    assert sorted(trie.items()) == [("/root/clawd", 2), ("/root/clawd/memory", 1), ("/tmp", 1)]
+    assert trie.top(1) == [("/root/clawd", 2)]
+
+
+def test_lives_in_the_baseline_as_plain_json():
+    trie = trie_of("/srv/app/logs", "/srv/app/data")
+    data = json.loads(json.dumps(trie.data))
+    assert PathTrie(data).count("/srv/app/logs") == 1
+    assert len(PathTrie(data)) == len(trie)
+
+
+def test_known_seen_or_trusted():
+    trie = trie_of("/root/clawd/memory")
+    assert trie.is_known("/root/clawd/memory")
+    assert not trie.is_known("/root/clawd")
+    assert not trie.is_known("/root/clawd/memory", min_count=2)
+    assert trie.is_known("/opt/tools/bin", trusted_prefixes=["/opt/tools"])
+    assert not trie.is_known("/opt/toolsx", trusted_prefixes=["/opt/tools"])
+
+
+def test_generalises_only_below_min_depth():
+    trie = trie_of(*[f"/root/clawd/memory/day{i}" for i in range(5)], *[f"/root/dir{i}" for i in range(5)])
+    assert trie.is_known("/root/clawd/memory/day99", generalise_children=5)
+    assert not trie.is_known("/root/clawd/memory/day99", generalise_children=6)
+    # /root fanned out too, but it is too shallow to stand for "anything under"
+    assert not trie.is_known("/root/new", generalise_children=5)
+    assert trie.is_known("/root/new", generalise_children=5, min_depth=1)
+
+
+def test_prune_drops_the_least_seen_leaves_first():
+    trie = PathTrie()
+    trie.insert("/a/hot", 50)
+    trie.insert("/a/warm", 5)
+    trie.insert("/a/cold", 1)
+    trie.insert("/b/cold/deeper", 1)
+    assert len(trie) == 8
+    
+    # Both cold leaves, then /b/cold once it is a leaf itself
+    assert trie.prune(5) == 3
+    assert len(trie) == node_count(trie.root) == 5
+    assert trie.count("/a/hot") == 50 and trie.count("/a/warm") == 5
+    assert trie.find("/a/cold")[1] == 1
+    assert trie.find("/b/cold")[1] == 1
+    assert trie.prune(5) == 0
+
+
+def test_pruned_leaves_still_count_at_the_prefix():
+    trie = trie_of(*[f"/root/clawd/memory/day{i}" for i in range(6)], "/root/clawd/memory/day0")
+    trie.prune(len(trie) - 4)
+    memory = trie.find("/root/clawd/memory")[0][-1]
+    assert memory["n"] == 7
+    assert memory["p"] == 4 and len(memory["k"]) == 2
+    # Fan-out includes what was pruned, so generalisation survives pruning
+    assert trie.is_known("/root/clawd/memory/day42", generalise_children=6)
+
+
+def test_emptied_parents_are_pruned_in_turn():
+    trie = trie_of("/x/y/z")
+    trie.insert("/keep", 10)
+    assert trie.prune(2) == 3
+    assert list(trie.root["k"]) == ["keep"]
+    assert trie.root["p"] == 1
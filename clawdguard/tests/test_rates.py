@@ -0,0 +1,61 @@
+"""
+ClawdGuard - Rate Window Tests
+Ring-buffer totals against a plain list of event times
+"""
+
+import random
+
+from monitors.rates import RateWindow, WINDOWS
+
+
+def naive_total(events, window, second):
+    return sum(n for at, n in events if second - window < at <= second)
+
+
+def test_totals_match_a_naive_count():
+    rng = random.Random(7)
+    rates = RateWindow()
+    events = []
+    second = 1000
+    for _ in range(3000):
+        # Mostly small steps, sometimes a long gap
+        second += rng.choice([0, 0, 1, 1, 2, 5, 30, 200, 4000])
+        n = rng.randint(1, 3)
+        rates.add(n, second)
+        events.append((second, n))
+        for window in WINDOWS:
+            assert rates.total(window, second) == naive_total(events, window, second), (window, second)
+
+
+def test_events_leave_each_window_on_time():
+    rates = RateWindow()
+    rates.add(5, second=100)
+    assert rates.totals(159) == {60: 5, 300: 5, 3600: 5}
+    assert rates.totals(160) == {60: 0, 300: 5, 3600: 5}
+    assert rates.totals(400) == {60: 0, 300: 0, 3600: 5}
+    assert rates.totals(3700) == {60: 0, 300: 0, 3600: 0}
+
+
+def test_slots_are_reused_not_grown():
+    rates = RateWindow(windows=(10, 60))
+    for second in range(0, 600):
+        rates.add(second=second)
+    assert len(rates.counts) == 60
+    assert (rates.total(10, 599), rates.total(60, 599)) == (10, 60)
+
+
+def test_a_gap_longer_than_the_ring_clears_it():
+    rates = RateWindow(windows=(60,))
+    rates.add(3, second=10)
+    rates.add(2, second=10 + 60)
+    assert rates.total(60, 70) == 2
+    assert sum(rates.counts) == 2
+
+
+def test_late_events_count_in_the_current_second():
+    rates = RateWindow(windows=(60,))
+    rates.add(second=100)
+    rates.add(second=90)  # the clock never runs backwards
+    assert rates.head == 100
+    assert rates.total(60, 159) == 2
+    assert rates.total(60, 160) == 0
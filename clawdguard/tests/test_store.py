@@ -0,0 +1,98 @@
+"""
+ClawdGuard - Event Store Tests
+Schema, JSONL import, range queries and retention pruning
+"""
+
+import json
+import sqlite3
+
+from core.store import EventStore, iso_days_ago
+
+
+def threat(timestamp, level="high", vuln_id="EXPLOIT-X", matched="cat ~/.ssh/id_"):
+    return {"timestamp": timestamp, "level": level, "vuln_id": vuln_id, "name": vuln_id.lower(),
+            "matched": matched, "context": "...", "repeats": 0, "learning_mode": True, "action": "logged"}
+
+
+def alert(timestamp, level="high", title="Alert"):
+    return {"timestamp": timestamp, "level": level, "title": title, "description": "d", "details": ""}
+
+
+def write_jsonl(path, records, junk=False):
+    with open(path, "w") as f:
+        for record in records:
+            f.write(json.dumps(record) + "\n")
+        if junk:
+            f.write("not json\n[1, 2]\n")
+
+
+def test_schema_and_indexes(tmp_path):
+    store = EventStore(tmp_path / "events.db")
+    conn = sqlite3.connect(tmp_path / "events.db")
+    tables = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    indexes = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+    assert {"threats", "alerts"} <= tables
+    assert {"threats_timestamp", "threats_level", "threats_vuln_id", "alerts_timestamp", "alerts_level"} <= indexes
+    assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    store.close()
+
+
+def test_import_is_idempotent_and_skips_junk(tmp_path):
+    log = tmp_path / "threats.jsonl"
+    write_jsonl(log, [threat(f"2026-10-0{i}T00:00:00Z") for i in range(1, 6)] + [{"level": "high"}], junk=True)
+    store = EventStore(tmp_path / "events.db")
+    
+    assert store.import_jsonl(log, "threats", batch_size=2) == 5
+    assert store.import_jsonl(log, "threats") == 0
+    assert len(store.query("threats")) == 5
+
+
+def test_query_ranges_and_filters(tmp_path):
+    store = EventStore(tmp_path / "events.db")
+    store.insert("threats", [
+        threat("2026-10-01T00:00:00Z", level="high"),
+        threat("2026-10-02T00:00:00Z", level="critical", vuln_id="EXPLOIT-Y"),
+        threat("2026-10-03T00:00:00Z", level="high"),
+    ])
+    
+    rows = store.query("threats", since="2026-10-02T00:00:00Z")
+    assert [row["timestamp"][:10] for row in rows] == ["2026-10-03", "2026-10-02"]
+    assert len(store.query("threats", until="2026-10-02T00:00:00Z")) == 1
+    assert len(store.query("threats", level="high")) == 2
+    assert [row["vuln_id"] for row in store.query("threats", vuln_id="EXPLOIT-Y")] == ["EXPLOIT-Y"]
+    assert [row["timestamp"][:10] for row in store.recent("threats", 2)] == ["2026-10-02", "2026-10-03"]
+    assert store.counts_by_level("threats") == {"high": 2, "critical": 1}
+    assert store.counts_by_level("threats", since="2026-10-03T00:00:00Z") == {"high": 1}
+
+
+def test_prune_drops_only_old_rows(tmp_path):
+    store = EventStore(tmp_path / "events.db")
+    store.insert("threats", [threat(iso_days_ago(100)), threat(iso_days_ago(1))])
+    store.insert("alerts", [alert(iso_days_ago(100)), alert(iso_days_ago(1))])
+    
+    assert store.prune(90) == {"threats": 1, "alerts": 1}
+    assert len(store.query("threats")) == 1
+    assert len(store.query("alerts")) == 1
+
+
+def test_new_database_imports_existing_logs(tmp_path):
+    logs = tmp_path / "logs"
+    logs.mkdir()
+    write_jsonl(logs / "threats.jsonl", [threat("2026-10-01T00:00:00Z")])
+    write_jsonl(logs / "alerts.jsonl", [alert("2026-10-01T00:00:00Z"), alert("2026-10-02T00:00:00Z")])
+    config = {"store": {"path": str(tmp_path / "events.db")}}
+    
+    store = EventStore.from_config(config, log_dir=logs)
+    assert store.created
+    assert (len(store.recent("threats")), len(store.recent("alerts"))) == (1, 2)
+    store.close()
+    
+    # An existing database is left to `store import`
+    write_jsonl(logs / "threats.jsonl", [threat("2026-10-01T00:00:00Z"), threat("2026-10-05T00:00:00Z")])
+    store = EventStore.from_config(config, log_dir=logs)
+    assert not store.created
+    assert len(store.recent("threats")) == 1
+
+
+def test_disabled_store(tmp_path):
+    assert EventStore.from_config({"store": {"enabled": False}}) is None
@@ -0,0 +1,75 @@
+"""
+ClawdGuard - Tail Reader Tests
+Reading the newest JSONL records backwards from EOF
+"""
+
+import json
+
+import pytest
+
+from core.canary import CanarySystem
+from core.tail import tail_jsonl, tail_lines
+
+
+def records(n, width=0):
+    return [{"i": i, "pad": "x" * (width + i % 7)} for i in range(n)]
+
+
+def write(path, items, trailing_newline=True, blank_every=0):
+    lines = []
+    for i, item in enumerate(items):
+        lines.append(json.dumps(item))
+        if blank_every and i % blank_every == 0:
+            lines.append("")
+    path.write_text("\n".join(lines) + ("\n" if trailing_newline else ""))
+
+
+@pytest.mark.parametrize("block_size", [1, 7, 64, 1 << 16])
+@pytest.mark.parametrize("trailing_newline", [True, False])
+def test_matches_reading_forwards(tmp_path, block_size, trailing_newline):
+    log = tmp_path / "log.jsonl"
+    items = records(50, width=20)
+    write(log, items, trailing_newline=trailing_newline, blank_every=3)
+    
+    for n in (0, 1, 5, 49, 50, 80):
+        assert tail_jsonl(log, n, block_size=block_size) == (items[-n:] if n else [])
+
+
+def test_lines_longer_than_a_block(tmp_path):
+    log = tmp_path / "log.jsonl"
+    items = [{"i": i, "pad": "y" * 5000} for i in range(4)]
+    write(log, items)
+    assert tail_jsonl(log, 2, block_size=1024) == items[-2:]
+
+
+def test_bad_and_partial_lines_are_skipped(tmp_path):
+    log = tmp_path / "log.jsonl"
+    log.write_text('{"i": 0}\nnot json\n[1, 2]\n{"i": 1}\n{"i": 2, "par')
+    assert tail_jsonl(log, 5, block_size=4) == [{"i": 0}, {"i": 1}]
+    assert tail_lines(log, 2, block_size=4) == [b'{"i": 1}', b'{"i": 2, "par']
+
+
+def test_missing_file(tmp_path):
+    assert tail_jsonl(tmp_path / "nope.jsonl", 5) == []
+
+
+def test_canary_status_shows_unmigrated_alerts(tmp_path):
+    config = tmp_path / "clawdguard.json"
+    config.write_text("{}")
+    canary = CanarySystem(str(config))
+    canary.state_path = tmp_path / "canary_state.json"
+    canary.alerts_path = tmp_path / "canary_alerts.jsonl"
+    
+    legacy = [{"path": "/root/.aws/credentials_backup", "n": i} for i in range(3)]
+    canary.state_path.write_text(json.dumps({"canaries": {}, "alert_count": 0, "alerts": legacy}))
+    canary.state = canary.load_state()
+    
+    status = canary.get_status()
+    assert status["recent_alerts"] == legacy
+    assert status["total_alerts"] == 3
+    
+    # Nothing was written by reading; a save moves them to the log
+    assert not canary.alerts_path.exists()
+    canary.save_state()
+    assert canary.get_status()["recent_alerts"] == legacy
+    assert "alerts" not in json.loads(canary.state_path.read_text())